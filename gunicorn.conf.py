@@ -0,0 +1,63 @@
+"""
+gunicorn settings, read automatically from the working directory (Procfile,
+``manage.py loadtest``). Command-line flags override them.
+
+The app is imported once in the master and workers are forked from it
+(preload), so Django setup and module imports are paid once and their memory
+is shared copy-on-write. Workers are recycled after ``max_requests`` to
+bound slow memory growth.
+"""
+import math
+import os
+
+
+def available_cpus():
+    """
+    CPUs this process may use: its affinity mask, lowered to a cgroup v2 CPU
+    quota when one is set. multiprocessing.cpu_count() reports the host's
+    cores, which inside a container can be far more than its share.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+# One uvicorn (ASGI) worker per available core: each runs an event loop, and
+# sync views run on per-request threads. Settings read WEB_CONCURRENCY for the
+# connection budget check, so publish the derived value.
+os.environ.setdefault('WEB_CONCURRENCY', str(available_cpus()))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ['WEB_CONCURRENCY'])
+worker_class = 'uvicorn.workers.UvicornWorker'
+threads = int(os.environ.get('GUNICORN_THREADS', 1))  # sync/gthread workers only (loadtest --wsgi)
+preload_app = True
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))  # PDF/Excel exports of large journals
+graceful_timeout = 30
+keepalive = 5
+
+
+def pre_fork(server, worker):
+    # Connections opened while preloading must not be shared with workers
+    from django.db import connections
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    # Threads do not survive fork: give this worker its own log listener
+    from journal.log import restart_listeners
+    restart_listeners()
+
+
+def child_exit(server, worker):
+    # Fold the exited worker's metrics snapshot into the shared totals
+    from journal import metrics
+    metrics.absorb_exited(worker.pid)
@@ -1,9 +1,212 @@
+import heapq
+import os
+from functools import cmp_to_key
+from itertools import islice
+
+from django.conf import settings
 from django.contrib import admin
-from .models import Trade, WeeklyReview, MonthlyReview
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.db.models import F, Model, OrderBy
+from django.http import FileResponse, Http404, QueryDict
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from . import sharding
+from .models import Trade, WeeklyReview, MonthlyReview, SlowQuery, ProfileCapture, BatchRun
+
+
+ALL_SHARDS = 'all'
+
+
+def _attribute_path(obj, lookup):
+    for name in lookup.split('__'):
+        obj = getattr(obj, name, None)
+        if obj is None:
+            break
+    # Related objects sort by primary key (none of ours set Meta.ordering)
+    return obj.pk if isinstance(obj, Model) else obj
+
+
+class AllShardsQuerySet:
+    """
+    Read-only stand-in for a QuerySet listing one model across every shard,
+    for the changelist's "All shards" choice. Chained calls (filters,
+    search, ordering) apply to each shard's queryset, counts add up, and a
+    slice merges the first rows of every shard in the queryset's ordering,
+    so a page reads at most ``stop`` rows per shard.
+    """
+
+    def __init__(self, querysets):
+        self._querysets = list(querysets)
+
+    @property
+    def model(self):
+        return self._querysets[0].model
+
+    @property
+    def query(self):
+        # The changelist reads ordering and select_related from here
+        return self._querysets[0].query
+
+    @property
+    def ordered(self):
+        return self._querysets[0].ordered
+
+    def _chain(self, method, *args, **kwargs):
+        return AllShardsQuerySet(getattr(queryset, method)(*args, **kwargs) for queryset in self._querysets)
+
+    def all(self):
+        return self._chain('all')
+
+    _clone = all
+
+    def filter(self, *args, **kwargs):
+        return self._chain('filter', *args, **kwargs)
+
+    def exclude(self, *args, **kwargs):
+        return self._chain('exclude', *args, **kwargs)
+
+    def order_by(self, *ordering):
+        return self._chain('order_by', *ordering)
+
+    def select_related(self, *fields):
+        return self._chain('select_related', *fields)
+
+    def distinct(self, *fields):
+        return self._chain('distinct', *fields)
+
+    def using(self, alias):
+        """The queryset of one shard"""
+        return next(queryset for queryset in self._querysets if queryset.db == alias)
+
+    def count(self):
+        return sum(queryset.count() for queryset in self._querysets)
+
+    def exists(self):
+        return any(queryset.exists() for queryset in self._querysets)
+
+    def _sort_key(self):
+        """Key reproducing the queryset's ordering on model instances"""
+        order = []
+        for part in self.query.order_by:
+            if isinstance(part, str):
+                order.append((part.lstrip('-'), part.startswith('-')))
+            elif isinstance(part, OrderBy) and isinstance(part.expression, F):
+                order.append((part.expression.name, part.descending))
+            elif isinstance(part, F):
+                order.append((part.name, False))
+
+        def compare(a, b):
+            for lookup, descending in order:
+                x, y = _attribute_path(a, lookup), _attribute_path(b, lookup)
+                if x == y:
+                    continue
+                # NULLs sort first ascending, as on SQLite and MySQL
+                result = -1 if x is None else 1 if y is None else (x > y) - (x < y)
+                return -result if descending else result
+            return 0
+        return cmp_to_key(compare)
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            return self[item:item + 1][0]
+        start, stop = item.start or 0, item.stop
+        shards = [queryset if stop is None else queryset[:stop] for queryset in self._querysets]
+        return list(islice(heapq.merge(*shards, key=self._sort_key()), start, stop))
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __len__(self):
+        return self.count()
+
+
+class ShardFilter(admin.SimpleListFilter):
+    """Pick the shard to list, or all of them; only shown when JOURNAL_SHARD_URLS is set"""
+    title = 'shard'
+    parameter_name = 'shard'
+
+    def lookups(self, request, model_admin):
+        model = model_admin.model
+        counts = [(alias, model._base_manager.using(alias).count()) for alias in sharding.shard_aliases()]
+        return [(ALL_SHARDS, f'All shards ({sum(count for _, count in counts)})')] + [
+            (alias, f'{alias} ({count})') for alias, count in counts
+        ]
+
+    def has_output(self):
+        return sharding.sharding_enabled()
+
+    def choices(self, changelist):
+        # No unfiltered choice: a plain changelist queryset reads one
+        # database, so "All shards" is an explicit merged listing
+        current = self.value() or 'default'
+        for alias, title in self.lookup_choices:
+            yield {
+                'selected': alias == current,
+                'query_string': changelist.get_query_string({self.parameter_name: alias}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        if self.value() == ALL_SHARDS:
+            return queryset  # already merged by ShardedAdminMixin.get_queryset
+        return queryset.using(self.value() or 'default')
+
+
+class ShardedChangeList(ChangeList):
+    def url_for_result(self, result):
+        # Primary keys repeat across shards: send the row's shard along
+        return f'{super().url_for_result(result)}?shard={result._state.db}'
+
+
+class ShardedAdminMixin:
+    """Per-shard or merged changelists; change/delete views find the object on any shard"""
+
+    def _lists_all_shards(self, request):
+        return sharding.sharding_enabled() and request.GET.get('shard') == ALL_SHARDS
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self._lists_all_shards(request):
+            return AllShardsQuerySet(queryset.using(alias) for alias in sharding.shard_aliases())
+        return queryset
+
+    def get_changelist(self, request, **kwargs):
+        return ShardedChangeList
+
+    def get_actions(self, request):
+        # Bulk actions select rows by primary key, which is ambiguous across shards
+        if self._lists_all_shards(request):
+            return {}
+        return super().get_actions(request)
+
+    def get_list_filter(self, request):
+        return [ShardFilter, *super().get_list_filter(request)]
+
+    def get_object(self, request, object_id, from_field=None):
+        queryset = self.get_queryset(request)
+        field = queryset.model._meta.pk if from_field is None else queryset.model._meta.get_field(from_field)
+        try:
+            object_id = field.to_python(object_id)
+        except ValidationError:
+            return None
+        # Primary keys repeat across shards: prefer the shard the changelist
+        # was showing (carried over in _changelist_filters, or on the row's
+        # link when listing all shards)
+        filters = QueryDict(request.GET.get('_changelist_filters', ''))
+        shard = request.GET.get('shard') or filters.get('shard')
+        aliases = [shard] if shard in sharding.shard_aliases() else sharding.shard_aliases()
+        for alias in aliases:
+            obj = queryset.using(alias).filter(**{field.name: object_id}).first()
+            if obj is not None:
+                return obj
+        return None
 
 
 @admin.register(Trade)
-class TradeAdmin(admin.ModelAdmin):
+class TradeAdmin(ShardedAdminMixin, admin.ModelAdmin):
     list_display = ['symbol', 'trade_type', 'date', 'profit_loss', 'percentage_gain_loss', 'setup_type', 'user']
     list_filter = ['trade_type', 'setup_type', 'date', 'user']
     search_fields = ['symbol', 'user__username']
@@ -38,7 +241,7 @@ class TradeAdmin(admin.ModelAdmin):
 
 
 @admin.register(WeeklyReview)
-class WeeklyReviewAdmin(admin.ModelAdmin):
+class WeeklyReviewAdmin(ShardedAdminMixin, admin.ModelAdmin):
     list_display = ['week_start_date', 'week_end_date', 'total_trades', 'total_pnl', 'user']
     list_filter = ['week_start_date', 'user']
     search_fields = ['user__username']
@@ -46,8 +249,82 @@ class WeeklyReviewAdmin(admin.ModelAdmin):
 
 
 @admin.register(MonthlyReview)
-class MonthlyReviewAdmin(admin.ModelAdmin):
+class MonthlyReviewAdmin(ShardedAdminMixin, admin.ModelAdmin):
     list_display = ['month', 'total_trades', 'total_pnl', 'max_drawdown', 'user']
     list_filter = ['month', 'user']
     search_fields = ['user__username']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['short_shape', 'view', 'count', 'avg_duration_ms', 'max_duration', 'last_seen']
+    list_filter = ['view', 'database']
+    search_fields = ['shape', 'view']
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+    fieldsets = (
+        ('Query', {
+            'fields': ('shape', 'example_sql', 'params_shape', 'view', 'database')
+        }),
+        ('Plan', {
+            'fields': ('explain',)
+        }),
+        ('Timings (ms)', {
+            'fields': ('count', 'total_duration', 'max_duration', 'last_duration')
+        }),
+        ('Timestamps', {
+            'fields': ('first_seen', 'last_seen', 'fingerprint'),
+            'classes': ('collapse',)
+        }),
+    )
+
+    @admin.display(description='Query')
+    def short_shape(self, obj):
+        return obj.shape[:120]
+
+    @admin.display(description='Avg (ms)')
+    def avg_duration_ms(self, obj):
+        return round(obj.avg_duration, 1)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ProfileCapture)
+class ProfileCaptureAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'method', 'path', 'view', 'status_code', 'duration', 'peak_memory', 'user', 'download']
+    list_filter = ['view', 'user']
+    search_fields = ['path', 'view']
+    readonly_fields = [field.name for field in ProfileCapture._meta.fields] + ['download']
+    fields = ['created_at', 'user', 'method', 'path', 'view', 'status_code', 'duration', 'peak_memory', 'download', 'summary']
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                 name='journal_profilecapture_download'),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        capture = get_object_or_404(ProfileCapture, pk=pk)
+        file_path = os.path.join(settings.PROFILE_DIR, os.path.basename(capture.prof_file))
+        if not os.path.exists(file_path):
+            raise Http404('Profile file no longer exists')
+        return FileResponse(open(file_path, 'rb'), as_attachment=True, filename=capture.prof_file)
+
+    @admin.display(description='.prof')
+    def download(self, obj):
+        url = reverse('admin:journal_profilecapture_download', args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.prof_file)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(BatchRun)
+class BatchRunAdmin(admin.ModelAdmin):
+    list_display = ['job', 'started_at', 'finished_at', 'duration', 'rows_processed', 'rows_changed']
+    list_filter = ['job']
+    readonly_fields = [field.name for field in BatchRun._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
@@ -1,6 +1,61 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class JournalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'journal'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+
+        if getattr(settings, 'SQLITE_TUNING', True):
+            from django.core.signals import request_finished
+            from django.db.backends.signals import connection_created
+            from . import sqlite
+
+            connection_created.connect(sqlite.configure_connection, dispatch_uid='journal_sqlite_pragmas')
+            request_finished.connect(sqlite.optimize_if_due, dispatch_uid='journal_sqlite_optimize')
+
+        from django.core.handlers.asgi import ASGIHandler
+        from django.core.signals import request_finished
+        from . import concurrency
+
+        request_finished.connect(
+            concurrency.close_request_connections, sender=ASGIHandler, dispatch_uid='journal_asgi_connections',
+        )
+
+        from django.db.models.signals import post_delete, post_save
+        from . import caching, goals, live, review_stats
+        from .models import MarketCondition, Trade, TradingPsychology
+
+        post_save.connect(live.trade_changed, sender=Trade, dispatch_uid='journal_live_save')
+        post_delete.connect(live.trade_changed, sender=Trade, dispatch_uid='journal_live_delete')
+        for model in (Trade, TradingPsychology, MarketCondition):
+            label = model._meta.model_name
+            post_save.connect(caching.user_data_changed, sender=model, dispatch_uid=f'journal_cache_save_{label}')
+            post_delete.connect(caching.user_data_changed, sender=model, dispatch_uid=f'journal_cache_delete_{label}')
+        post_save.connect(review_stats.trade_saved, sender=Trade, dispatch_uid='journal_reviews_save')
+        post_delete.connect(review_stats.trade_deleted, sender=Trade, dispatch_uid='journal_reviews_delete')
+        post_save.connect(goals.trade_saved, sender=Trade, dispatch_uid='journal_goals_save')
+        post_delete.connect(goals.trade_deleted, sender=Trade, dispatch_uid='journal_goals_delete')
+
+        from . import metrics
+        from .models import BatchRun
+
+        metrics.register_gauge(
+            'journal_batch_last_success_timestamp_seconds', 'When each batch job last completed',
+            BatchRun.last_finished, labelnames=['job'],
+        )
+        metrics.register_gauge(
+            'journal_stale_reviews', 'Reviews waiting for their metrics to be refreshed',
+            review_stats.stale_backlog, labelnames=['period'],
+        )
+
+        from . import sharding
+        if sharding.sharding_enabled():
+            from django.contrib.auth.models import User
+            from django.db.models.signals import pre_delete, pre_save
+
+            pre_save.connect(sharding.ensure_user_before_save, dispatch_uid='journal_shard_user')
+            pre_delete.connect(sharding.delete_user_shard_data, sender=User, dispatch_uid='journal_shard_delete')
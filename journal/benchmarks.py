@@ -0,0 +1,119 @@
+"""
+Micro-benchmarks for the analytics classmethods, dashboard and exports.
+
+Each case is timed against a synthetic user at several data sizes. Results
+are plain dicts so they can be dumped to JSON and compared across releases.
+"""
+import platform
+import random
+import statistics
+import time
+
+import django
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from . import views
+from .models import Trade
+from .seed import build_trades, seed_user
+
+
+def _call_view(view):
+    """Return a callable that renders ``view`` for a user and consumes the body"""
+    factory = RequestFactory()
+
+    def run(user):
+        request = factory.get('/')
+        request.user = user
+        request.session = {}
+        response = view(request)
+        if response.streaming:
+            return sum(len(chunk) for chunk in response.streaming_content)
+        return len(response.content)
+
+    return run
+
+
+def _insert_trades(user, count=200):
+    """Write path: bulk-insert ``count`` trades (index maintenance cost)"""
+    Trade.objects.bulk_create(build_trades(user, count, random.Random(count)))
+
+
+CASES = {
+    'get_dashboard_stats': Trade.get_dashboard_stats,
+    'get_current_win_streak': Trade.get_current_win_streak,
+    'get_current_loss_streak': Trade.get_current_loss_streak,
+    'get_max_win_streak': Trade.get_max_win_streak,
+    'get_max_loss_streak': Trade.get_max_loss_streak,
+    'get_sharpe_ratio': Trade.get_sharpe_ratio,
+    'get_maximum_drawdown': Trade.get_maximum_drawdown,
+    'get_portfolio_heatmap_data': Trade.get_portfolio_heatmap_data,
+    'get_confidence_vs_performance_data': Trade.get_confidence_vs_performance_data,
+    'view_dashboard': _call_view(views.dashboard),
+    'export_csv': _call_view(views.export_trades_csv),
+    'export_pdf': _call_view(views.export_trades_pdf),
+    'export_excel': _call_view(views.export_trades_excel),
+    'insert_trades_200': _insert_trades,
+}
+
+
+def time_case(func, user, repeat):
+    """Run ``func(user)`` ``repeat`` times after one warm-up; return timing summary in ms"""
+    func(user)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(user)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'runs': repeat,
+        'min_ms': round(min(samples), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.mean(samples), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def run(sizes, repeat=5, cases=None, seed_value=42, log=None):
+    """
+    Seed one throwaway user per size, time every case against it and roll
+    everything back afterwards. Returns a JSON-serializable report.
+    """
+    selected = {name: CASES[name] for name in (cases or CASES)}
+    results = []
+
+    with transaction.atomic():
+        for size in sizes:
+            user = User.objects.create(username=f'__bench_{size}')
+            seed_user(user, size, random.Random(seed_value))
+            for name, func in selected.items():
+                timing = time_case(func, user, repeat)
+                results.append({'case': name, 'size': size, **timing})
+                if log:
+                    log(f"{name:<36} n={size:<7} median={timing['median_ms']:.2f}ms")
+        transaction.set_rollback(True)
+
+    return {
+        'meta': {
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'sizes': list(sizes),
+            'repeat': repeat,
+            'seed': seed_value,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current):
+    """Yield (case, size, baseline_ms, current_ms, change_pct) for matching entries"""
+    previous = {(r['case'], r['size']): r['median_ms'] for r in baseline['results']}
+    for result in current['results']:
+        key = (result['case'], result['size'])
+        if key in previous and previous[key] > 0:
+            change = (result['median_ms'] - previous[key]) / previous[key] * 100
+            yield key[0], key[1], previous[key], result['median_ms'], change
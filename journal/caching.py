@@ -0,0 +1,63 @@
+"""
+Per-user cache for derived analytics.
+
+Entries are keyed by the user's data version, which is bumped when one of
+their trades (or daily psychology / market records) is saved or deleted,
+once the transaction commits. A write therefore orphans every cached result
+for that user at once, without tracking which keys exist. Entries also
+expire after ANALYTICS_CACHE_SECONDS, which bounds staleness for writes that
+skip signals (bulk_create, backfills) and, with the per-process default
+cache, for writes made in other workers.
+"""
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from . import metrics
+
+
+_MISSING = object()
+
+
+def _version_key(user_id):
+    return f'journal:version:{user_id}'
+
+
+def user_version(user_id):
+    """The user's current data version"""
+    key = _version_key(user_id)
+    # Start from the clock rather than 1, so a version evicted from the cache
+    # cannot come back as a value that older entries are still stored under
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def bump_version(user_id):
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:  # not cached yet (or evicted)
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def cached(user_id, name, compute):
+    """``compute()``, cached for ``user_id`` until their trades change"""
+    # The version is read before computing: a write that commits meanwhile
+    # bumps it, so the possibly stale result is stored under the old key
+    key = f'journal:{name}:{user_id}:{user_version(user_id)}'
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        metrics.analytics_cache.inc(result='hit')
+        return value
+    metrics.analytics_cache.inc(result='miss')
+    value = compute()
+    cache.set(key, value, getattr(settings, 'ANALYTICS_CACHE_SECONDS', 300))
+    return value
+
+
+# Signal receivers, connected in JournalConfig.ready()
+def user_data_changed(sender, instance, using, **kwargs):
+    transaction.on_commit(partial(bump_version, instance.user_id), using=using)
@@ -0,0 +1,118 @@
+"""
+Chart series for the dashboard.
+
+The dashboard fetches these series after page load instead of embedding them
+in the HTML. Long series are reduced server-side with Largest-Triangle-Three-
+Buckets (LTTB) so a multi-year equity curve keeps its visual shape while only
+shipping as many points as the client asked for.
+"""
+from django.db.models import Sum
+
+from .models import Trade
+
+
+DEFAULT_POINTS = 1000
+MIN_POINTS = 10
+MAX_POINTS = 5000
+
+
+def parse_point_budget(value):
+    """Clamp the client-requested point budget to a sane range"""
+    try:
+        points = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_POINTS
+    return max(MIN_POINTS, min(points, MAX_POINTS))
+
+
+def lttb(points, threshold):
+    """
+    Downsample (x, y, label) tuples to ``threshold`` points using
+    Largest-Triangle-Three-Buckets. First and last points are always kept.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # index of the previously selected point
+
+    for i in range(threshold - 2):
+        # Average of the next bucket acts as the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_count = next_end - next_start
+        avg_x = sum(points[j][0] for j in range(next_start, next_end)) / next_count
+        avg_y = sum(points[j][1] for j in range(next_start, next_end)) / next_count
+
+        # Pick the point in the current bucket forming the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = points[a][0], points[a][1]
+        max_area = -1
+        selected = start
+        for j in range(start, end):
+            area = abs(
+                (ax - avg_x) * (points[j][1] - ay)
+                - (ax - points[j][0]) * (avg_y - ay)
+            )
+            if area > max_area:
+                max_area = area
+                selected = j
+
+        sampled.append(points[selected])
+        a = selected
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def _serialize(points, total, threshold):
+    """Convert (x, y, label) tuples into a compact JSON-friendly payload"""
+    sampled = lttb(points, threshold)
+    return {
+        'labels': [p[2] for p in sampled],
+        'values': [round(p[1], 2) for p in sampled],
+        'total_points': total,
+        'returned_points': len(sampled),
+    }
+
+
+def _ordered_pnl(user):
+    """Trade-by-trade (date, profit_loss) in chronological order"""
+    return Trade.objects.filter(user=user).order_by('date', 'created_at', 'id').values_list('date', 'profit_loss')
+
+
+def equity_curve(user, threshold=DEFAULT_POINTS):
+    """Cumulative P&L after every trade"""
+    points = []
+    cumulative = 0
+    for i, (date, pnl) in enumerate(_ordered_pnl(user)):
+        cumulative += pnl
+        points.append((i, cumulative, date.isoformat()))
+    return _serialize(points, len(points), threshold)
+
+
+def drawdown_curve(user, threshold=DEFAULT_POINTS):
+    """Distance below the running equity peak after every trade (<= 0)"""
+    points = []
+    cumulative = 0
+    peak = 0
+    for i, (date, pnl) in enumerate(_ordered_pnl(user)):
+        cumulative += pnl
+        peak = max(peak, cumulative)
+        points.append((i, cumulative - peak, date.isoformat()))
+    return _serialize(points, len(points), threshold)
+
+
+def daily_pnl(user, threshold=DEFAULT_POINTS):
+    """Net P&L per trading day"""
+    daily = Trade.objects.filter(user=user).values('date').annotate(
+        total_pnl=Sum('profit_loss')
+    ).order_by('date')
+    points = [
+        (i, row['total_pnl'] or 0, row['date'].isoformat())
+        for i, row in enumerate(daily)
+    ]
+    return _serialize(points, len(points), threshold)
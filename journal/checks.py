@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def check_connection_budget(app_configs, **kwargs):
+    """
+    Persistent connections: one per gunicorn thread and aggregate-pool thread
+    per database must fit the server limit
+    """
+    limit = getattr(settings, 'DB_MAX_CONNECTIONS', 0)
+    if not limit:
+        return []
+    threads = getattr(settings, 'WEB_CONCURRENCY', 1) * (
+        getattr(settings, 'GUNICORN_THREADS', 1) + getattr(settings, 'AGGREGATE_WORKERS', 0)
+    )
+    needed = threads * len(settings.DATABASES)
+    if needed <= limit:
+        return []
+    return [Warning(
+        f'{threads} gunicorn and aggregate-pool threads x {len(settings.DATABASES)} database(s) can hold '
+        f'{needed} persistent connections, above DB_MAX_CONNECTIONS={limit}.',
+        hint='Lower WEB_CONCURRENCY/GUNICORN_THREADS/AGGREGATE_WORKERS, set DB_CONN_MAX_AGE=0, '
+             'or connect through a pooler.',
+        id='journal.W001',
+    )]
@@ -0,0 +1,115 @@
+"""
+Run independent ORM queries concurrently from async views.
+
+``gather(*calls)`` runs each zero-argument callable on a shared, bounded
+thread pool (AGGREGATE_WORKERS threads per process) and returns their results
+in order, so a page built from a dozen independent aggregates waits for the
+slowest one rather than for their sum. Each pool thread uses its own
+database connection, managed like a request thread's: broken connections
+are closed before and after every call and CONN_MAX_AGE is honoured, except
+that CONN_MAX_AGE=0 does not close a pool connection after each call (that
+would reconnect a dozen times per page); the pool size bounds them instead.
+
+Under ASGI, Django 4.2 runs each request's sync code on a thread of its
+own, so a request connection kept open for CONN_MAX_AGE could never be
+reused and would be stranded when the thread exits.
+``close_request_connections`` closes them as the request finishes, leaving
+CONN_MAX_AGE in force for the pool, WSGI workers and management commands.
+
+Context variables (shard, replica routing, trace, Server-Timing) are copied
+into the workers, and the execute_wrappers the middleware installed on the
+request thread's connections (query budget, metrics, slow-query capture,
+tracing) are installed on the worker's connections for the duration of the
+call, so concurrent queries are still counted, timed and traced. While a
+staff request is being profiled each call also runs under its own profiler
+(journal.profiling.run_profiled).
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.db import connections
+
+from .profiling import run_profiled
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    """The process-wide aggregate pool, created on first use (after any fork)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'AGGREGATE_WORKERS', 4),
+                    thread_name_prefix='journal-aggregate',
+                )
+    return _executor
+
+
+def _request_wrappers():
+    """execute_wrappers active on this thread's connections, per alias"""
+    return {alias: list(connections[alias].execute_wrappers) for alias in connections}
+
+
+def _close_old_connections():
+    """close_old_connections() for pool threads, keeping CONN_MAX_AGE=0 connections"""
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is not None and conn.settings_dict['CONN_MAX_AGE'] == 0:
+            conn.close_at = None
+        conn.close_if_unusable_or_obsolete()
+
+
+def close_request_connections(sender, **kwargs):
+    """request_finished receiver for ASGIHandler: close the request thread's connections"""
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+
+
+def _in_worker(call, wrappers):
+    def run():
+        _close_old_connections()
+        try:
+            with ExitStack() as stack:
+                for alias, alias_wrappers in wrappers.items():
+                    for wrapper in alias_wrappers:
+                        stack.enter_context(connections[alias].execute_wrapper(wrapper))
+                return run_profiled(call)
+        finally:
+            _close_old_connections()
+    return run
+
+
+async def gather(*calls):
+    """Run the callables concurrently on the aggregate pool; results in call order"""
+    wrappers = await sync_to_async(_request_wrappers)()
+    pool = executor()
+    return await asyncio.gather(*(
+        sync_to_async(_in_worker(call, wrappers), thread_sensitive=False, executor=pool)()
+        for call in calls
+    ))
+
+
+def async_login_required(view):
+    """
+    ``login_required`` for ``async def`` views (Django 4.2's decorator only
+    wraps sync views). The session and user are loaded on the request's
+    sync thread, so ``request.user`` is safe to read in the view afterwards.
+    """
+    check = login_required(lambda request, *args, **kwargs: None)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        redirect = await sync_to_async(check)(request, *args, **kwargs)
+        if redirect is not None:
+            return redirect
+        return await view(request, *args, **kwargs)
+    return wrapper
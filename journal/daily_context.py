@@ -0,0 +1,163 @@
+"""
+How the trader's state and the market relate to results, day by day.
+
+``TradingPsychology`` and ``MarketCondition`` hold one row per user per day.
+``analyze(user)`` loads both (two narrow queries), indexes them by date,
+and joins them in one pass with the user's per-day P&L, which comes from a
+single grouped query over the recorded date range. From the joined days it
+computes Pearson correlations of each 1-10 score with daily P&L and win rate,
+and win rate / P&L conditional on emotion, stress band, market condition,
+volatility band and sentiment.
+
+Only days with both a record and at least one trade count. Results are
+cached per user (journal.caching) until a trade or record changes.
+"""
+import statistics
+from functools import partial
+
+from django.db.models import Count, Q, Sum
+
+from . import caching
+from .models import MarketCondition, Trade, TradingPsychology
+
+
+MIN_DAYS = 5  # fewer joined days than this: no correlation is shown
+
+PSYCHOLOGY_SCORES = (
+    ('pre_trade_confidence', 'Pre-trade confidence'),
+    ('stress_level', 'Stress level'),
+    ('sleep_quality', 'Sleep quality'),
+    ('focus_level', 'Focus level'),
+)
+MARKET_SCORES = (
+    ('volatility_level', 'Volatility level'),
+)
+# (highest score in band, label) for 1-10 scores
+SCORE_BANDS = ((3, 'Low (1-3)'), (6, 'Medium (4-6)'), (10, 'High (7-10)'))
+
+
+def _band(score):
+    for upper, label in SCORE_BANDS:
+        if score <= upper:
+            return label
+    return SCORE_BANDS[-1][1]
+
+
+def joined_days(user):
+    """
+    [{date, pnl, trades, wins, psychology, market}] for each day with a trade
+    and a psychology or market record (the missing one is None)
+    """
+    psychology = {
+        row['date']: row
+        for row in TradingPsychology.objects.filter(user=user).values(
+            'date', 'pre_trade_emotion', *(field for field, _ in PSYCHOLOGY_SCORES)
+        )
+    }
+    market = {
+        row['date']: row
+        for row in MarketCondition.objects.filter(user=user).values(
+            'date', 'market_condition', 'sentiment', *(field for field, _ in MARKET_SCORES)
+        )
+    }
+    recorded = psychology.keys() | market.keys()
+    if not recorded:
+        return []
+    daily_pnl = Trade.objects.filter(user=user, date__range=(min(recorded), max(recorded))).values('date').annotate(
+        trades=Count('id'),
+        wins=Count('id', filter=Q(profit_loss__gt=0)),
+        pnl=Sum('profit_loss'),
+    ).order_by('date')
+    return [
+        {**day, 'psychology': psychology.get(day['date']), 'market': market.get(day['date'])}
+        for day in daily_pnl if day['date'] in recorded
+    ]
+
+
+def correlations(days, source, scores):
+    """Pearson r of each score against daily P&L and daily win rate"""
+    days = [day for day in days if day[source] is not None]
+    pnl = [day['pnl'] for day in days]
+    win_rate = [day['wins'] / day['trades'] for day in days]
+    results = []
+    for field, label in scores:
+        values = [day[source][field] for day in days]
+        results.append({
+            'label': label,
+            'days': len(days),
+            'pnl_r': _pearson(values, pnl),
+            'win_rate_r': _pearson(values, win_rate),
+        })
+    return results
+
+
+def _pearson(x, y):
+    if len(x) < MIN_DAYS:
+        return None
+    try:
+        return round(statistics.correlation(x, y), 2)
+    except statistics.StatisticsError:  # a constant series
+        return None
+
+
+def conditional(days, source, key, labels=None, order=None):
+    """Days, trades, win rate and P&L grouped by ``key(record)``"""
+    groups = {}
+    for day in days:
+        record = day[source]
+        if record is None:
+            continue
+        group = groups.setdefault(key(record), {'days': 0, 'trades': 0, 'wins': 0, 'pnl': 0})
+        group['days'] += 1
+        group['trades'] += day['trades']
+        group['wins'] += day['wins']
+        group['pnl'] += day['pnl']
+    ordered = order if order is not None else sorted(groups, key=lambda value: -groups[value]['pnl'])
+    labels = labels or {}
+    return [
+        {
+            'label': labels.get(value, value),
+            'days': groups[value]['days'],
+            'trades': groups[value]['trades'],
+            'win_rate': round(groups[value]['wins'] / groups[value]['trades'] * 100, 1),
+            'total_pnl': round(groups[value]['pnl'], 2),
+            'avg_daily_pnl': round(groups[value]['pnl'] / groups[value]['days'], 2),
+        }
+        for value in ordered if value in groups
+    ]
+
+
+def _analyze(user):
+    days = joined_days(user)
+    bands = [label for _, label in SCORE_BANDS]
+    emotions = dict(TradingPsychology.EMOTION_CHOICES)
+    return {
+        'psychology': {
+            'days': sum(day['psychology'] is not None for day in days),
+            'correlations': correlations(days, 'psychology', PSYCHOLOGY_SCORES),
+            'sections': [
+                ('Win Rate by Pre-Trade Emotion', 'Emotion',
+                 conditional(days, 'psychology', lambda record: record['pre_trade_emotion'], emotions)),
+                ('Win Rate by Stress Level', 'Stress',
+                 conditional(days, 'psychology', lambda record: _band(record['stress_level']), order=bands)),
+            ],
+        },
+        'market': {
+            'days': sum(day['market'] is not None for day in days),
+            'correlations': correlations(days, 'market', MARKET_SCORES),
+            'sections': [
+                ('Win Rate by Market Condition', 'Condition',
+                 conditional(days, 'market', lambda record: record['market_condition'],
+                             dict(MarketCondition.CONDITION_CHOICES))),
+                ('Win Rate by Volatility', 'Volatility',
+                 conditional(days, 'market', lambda record: _band(record['volatility_level']), order=bands)),
+                ('Win Rate by Market Sentiment', 'Sentiment',
+                 conditional(days, 'market', lambda record: record['sentiment'], emotions)),
+            ],
+        },
+    }
+
+
+def analyze(user):
+    """Psychology and market-condition statistics for ``user`` (cached)"""
+    return caching.cached(user.pk, 'daily_context', partial(_analyze, user))
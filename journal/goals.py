@@ -0,0 +1,86 @@
+"""
+Progress of trading goals that can be measured from trades.
+
+PROFIT (total P&L), WIN_RATE (% of winning trades) and TRADE_COUNT goals get
+their ``current_value`` and ``is_achieved`` from the user's trades between
+the goal's start and end dates. ``evaluate(goals)`` handles any number of
+one user's goals with a single aggregate query: each goal contributes its
+own conditional aggregates (filtered to its window) over a scan of the
+union of the windows. Only goals whose values changed are written.
+
+Trade writes re-evaluate the user's goals whose window contains the
+affected dates, and goal create/edit evaluates the goal being saved;
+``manage.py evaluate_goals`` sweeps all active goals. Other goal types are
+not measured.
+"""
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Trade, TradingGoal
+
+
+MEASURED_TYPES = ('PROFIT', 'WIN_RATE', 'TRADE_COUNT')
+
+
+def measured(goals):
+    return goals.filter(goal_type__in=MEASURED_TYPES)
+
+
+def evaluate(goals, using=None):
+    """
+    Recompute ``current_value`` and ``is_achieved`` for ``goals`` (measured
+    goals of one user) and write those that changed. Returns the number written.
+    """
+    goals = [goal for goal in goals if goal.goal_type in MEASURED_TYPES]
+    if not goals:
+        return 0
+    aggregates = {}
+    for goal in goals:
+        window = Q(date__gte=goal.start_date, date__lte=goal.end_date)
+        aggregates[f'trades_{goal.pk}'] = Count('id', filter=window)
+        aggregates[f'wins_{goal.pk}'] = Count('id', filter=window & Q(profit_loss__gt=0))
+        aggregates[f'pnl_{goal.pk}'] = Sum('profit_loss', filter=window)
+    trades = Trade.objects.using(using) if using else Trade.objects
+    totals = trades.filter(
+        user_id=goals[0].user_id,
+        date__gte=min(goal.start_date for goal in goals),
+        date__lte=max(goal.end_date for goal in goals),
+    ).aggregate(**aggregates)
+
+    now = timezone.now()
+    changed = []
+    for goal in goals:
+        count, wins = totals[f'trades_{goal.pk}'], totals[f'wins_{goal.pk}']
+        if goal.goal_type == 'PROFIT':
+            value = round(totals[f'pnl_{goal.pk}'] or 0, 2)
+        elif goal.goal_type == 'WIN_RATE':
+            value = round(wins / count * 100, 2) if count else 0
+        else:
+            value = count
+        achieved = count > 0 and value >= goal.target_value
+        if value != goal.current_value or achieved != goal.is_achieved:
+            goal.current_value, goal.is_achieved, goal.updated_at = value, achieved, now
+            changed.append(goal)
+    if changed:
+        manager = TradingGoal.objects.using(using) if using else TradingGoal.objects
+        manager.bulk_update(changed, ['current_value', 'is_achieved', 'updated_at'])
+    return len(changed)
+
+
+def evaluate_for_dates(user_id, dates, using=None):
+    """Re-evaluate the user's active measured goals whose window contains any of ``dates``"""
+    in_window = Q()
+    for day in dates:
+        in_window |= Q(start_date__lte=day, end_date__gte=day)
+    manager = TradingGoal.objects.using(using) if using else TradingGoal.objects
+    return evaluate(list(measured(manager.filter(in_window, user_id=user_id, is_active=True))), using=using)
+
+
+# Signal receivers, connected in JournalConfig.ready()
+def trade_saved(sender, instance, raw=False, using=None, **kwargs):
+    if not raw and instance.affected_dates:
+        evaluate_for_dates(instance.user_id, instance.affected_dates, using=using)
+
+
+def trade_deleted(sender, instance, using, **kwargs):
+    evaluate_for_dates(instance.user_id, {Trade._meta.get_field('date').to_python(instance.date)}, using=using)
@@ -0,0 +1,211 @@
+"""
+Request and SQL instrumentation helpers.
+
+``QueryRecorder`` is a ``connection.execute_wrapper`` callable that records
+every query with its normalized shape and duration. It backs the per-view
+query budgets (``query_budget`` / ``assert_query_budget``) and N+1 detection.
+
+``RequestTimings`` accumulates per-request phase durations (DB, template
+render, report builders) for the Server-Timing header; ``timed`` phases are
+also recorded as trace spans.
+"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.db import connections
+
+from .tracing import span
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w."])-?\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def sql_shape(sql):
+    """
+    Normalize SQL so queries differing only in literal values compare equal,
+    e.g. ``... WHERE "id" = 42`` and ``... WHERE "id" = 43``.
+    """
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+@dataclass
+class RecordedQuery:
+    sql: str
+    shape: str
+    duration: float  # seconds
+    many: bool
+
+
+class QueryRecorder:
+    """execute_wrapper that records every query run through it"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(RecordedQuery(sql, sql_shape(sql), time.perf_counter() - start, many))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(query.duration for query in self.queries)
+
+    def shapes(self):
+        """Counter of query shape -> executions"""
+        return Counter(query.shape for query in self.queries)
+
+    def repeated(self, threshold):
+        """Shapes executed at least ``threshold`` times (likely N+1 patterns)"""
+        return [(shape, count) for shape, count in self.shapes().most_common() if count >= threshold]
+
+
+@contextmanager
+def instrument_connections(wrapper):
+    """Install ``wrapper`` as an execute_wrapper on every configured database"""
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(wrapper))
+        yield wrapper
+
+
+@contextmanager
+def record_queries(using='default'):
+    """Record every query issued on ``using`` inside the block"""
+    recorder = QueryRecorder()
+    with connections[using].execute_wrapper(recorder):
+        yield recorder
+
+
+def query_budget(max_queries):
+    """
+    Declare the maximum number of queries a view may run. Checked by
+    ``QueryBudgetMiddleware`` and ``assert_view_query_budget``.
+    Apply it inside ``@login_required`` so the attribute is carried over.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block or view ran more queries than its declared budget"""
+
+
+def format_violation(label, recorder, budget, repeat_threshold):
+    lines = [f'{label} ran {recorder.count} queries (budget {budget})']
+    for shape, count in recorder.repeated(repeat_threshold):
+        lines.append(f'  N+1 suspect x{count}: {shape[:200]}')
+    return '\n'.join(lines)
+
+
+@contextmanager
+def assert_query_budget(max_queries, repeat_threshold=None, label='Block', using='default'):
+    """
+    Test helper: fail if the block runs more than ``max_queries`` queries, or
+    (when ``repeat_threshold`` is given) repeats one SQL shape that many times.
+    """
+    with record_queries(using) as recorder:
+        yield recorder
+    repeated = recorder.repeated(repeat_threshold) if repeat_threshold else []
+    if recorder.count > max_queries or repeated:
+        raise QueryBudgetExceeded(format_violation(label, recorder, max_queries, repeat_threshold or recorder.count + 1))
+
+
+def assert_view_query_budget(client, url, repeat_threshold=None, **extra):
+    """
+    Test helper: GET ``url`` with a Django test ``client`` and fail if the
+    resolved view exceeds the budget declared with ``@query_budget``.
+    """
+    from django.urls import resolve
+
+    view = resolve(url.split('?')[0]).func
+    budget = getattr(view, 'query_budget', None)
+    if budget is None:
+        raise AssertionError(f'{url} resolves to a view without a declared @query_budget')
+    with assert_query_budget(budget, repeat_threshold, label=url):
+        response = client.get(url, **extra)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    return response
+
+
+@dataclass
+class RequestTimings:
+    """Phase durations (seconds) collected while one request is handled"""
+    db_time: float = 0.0
+    db_queries: int = 0
+    phases: dict = field(default_factory=lambda: defaultdict(float))
+    # Aggregate-pool threads (journal.concurrency) add to the same totals
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def __call__(self, execute, sql, params, many, context):
+        # Lightweight execute_wrapper: totals only, no per-query records
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.db_time += duration
+                self.db_queries += 1
+
+
+_current_timings = ContextVar('journal_request_timings', default=None)
+
+
+def current_timings():
+    """Timings of the request being handled, or None outside sampled requests"""
+    return _current_timings.get()
+
+
+@contextmanager
+def collect_timings():
+    """Collect RequestTimings for everything run inside the block"""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        with instrument_connections(timings):
+            yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Attribute the block's wall time (excluding SQL run inside it) to
+    ``phase`` in the current request's Server-Timing breakdown, and record
+    it as a span when the request is traced.
+    """
+    with span(phase):
+        timings = _current_timings.get()
+        if timings is None:
+            yield
+            return
+        db_before = timings.db_time
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings.phases[phase] += (time.perf_counter() - start) - (timings.db_time - db_before)
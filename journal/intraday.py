@@ -0,0 +1,104 @@
+"""
+When trades make money: performance by entry time, weekday and holding time.
+
+Each breakdown is a single grouped query; the bucket is computed in the
+database from ``entry_time``, ``date`` and the stored ``holding_minutes``, so
+only one row per bucket comes back. Rows carry sums rather than averages so
+that buckets can be merged afterwards (half-hours into hours) without
+another query.
+
+Expectancy is the average P&L per trade, i.e. win rate x average win minus
+loss rate x average loss.
+"""
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+
+
+WEEKDAYS = {1: 'Monday', 2: 'Tuesday', 3: 'Wednesday', 4: 'Thursday', 5: 'Friday', 6: 'Saturday', 7: 'Sunday'}
+
+# (upper bound in minutes, label); the last bucket is open-ended
+HOLDING_BUCKETS = (
+    (15, 'Under 15 min'),
+    (60, '15-60 min'),
+    (120, '1-2 hours'),
+    (240, '2-4 hours'),
+    (None, '4 hours or more'),
+)
+
+
+def _grouped(user_trades, bucket):
+    return (
+        user_trades.annotate(bucket=bucket)
+        .values('bucket')
+        .annotate(
+            trades=Count('id'),
+            wins=Count('id', filter=Q(profit_loss__gt=0)),
+            total_pnl=Sum('profit_loss'),
+            r_total=Sum('r_multiple'),
+            r_trades=Count('r_multiple'),
+        )
+        .order_by('bucket')
+    )
+
+
+def _row(label, trades, wins, total_pnl, r_total, r_trades):
+    return {
+        'label': label,
+        'trades': trades,
+        'win_rate': round(wins / trades * 100, 1) if trades else 0,
+        'total_pnl': round(total_pnl or 0, 2),
+        'expectancy': round((total_pnl or 0) / trades, 2) if trades else 0,
+        'avg_r': round(r_total / r_trades, 2) if r_trades else None,
+        # Kept for merging
+        'wins': wins,
+        'r_total': r_total or 0,
+        'r_trades': r_trades,
+    }
+
+
+def _merge(label, rows):
+    return _row(label, *(sum(row[field] for row in rows) for field in ('trades', 'wins', 'total_pnl', 'r_total', 'r_trades')))
+
+
+def by_entry_time(user_trades):
+    """Half-hour entry buckets ('09:00', '09:30', ...) in time order"""
+    half_hour = ExtractHour('entry_time') * 60 + Case(
+        When(entry_time__minute__gte=30, then=Value(30)), default=Value(0), output_field=IntegerField(),
+    )
+    return [
+        _row(f"{row['bucket'] // 60:02d}:{row['bucket'] % 60:02d}", row['trades'], row['wins'], row['total_pnl'], row['r_total'], row['r_trades'])
+        for row in _grouped(user_trades, half_hour)
+    ]
+
+
+def by_entry_hour(half_hours):
+    """Hourly buckets merged from ``by_entry_time`` rows"""
+    hours = {}
+    for row in half_hours:
+        hours.setdefault(row['label'][:2], []).append(row)
+    return [_merge(f'{hour}:00', rows) for hour, rows in hours.items()]
+
+
+def by_weekday(user_trades):
+    return [
+        _row(WEEKDAYS[row['bucket']], row['trades'], row['wins'], row['total_pnl'], row['r_total'], row['r_trades'])
+        for row in _grouped(user_trades, ExtractIsoWeekDay('date'))
+    ]
+
+
+def by_holding_time(user_trades):
+    """HOLDING_BUCKETS in order, then trades whose holding time is unknown"""
+    bucket = Case(
+        *(
+            When(holding_minutes__lt=upper, then=Value(index))
+            for index, (upper, _) in enumerate(HOLDING_BUCKETS) if upper is not None
+        ),
+        When(holding_minutes__isnull=False, then=Value(len(HOLDING_BUCKETS) - 1)),
+        default=Value(len(HOLDING_BUCKETS)),
+        output_field=IntegerField(),
+    )
+    labels = [label for _, label in HOLDING_BUCKETS] + ['Unknown (no exit time)']
+    return [
+        _row(labels[row['bucket']], row['trades'], row['wins'], row['total_pnl'], row['r_total'], row['r_trades'])
+        for row in _grouped(user_trades, bucket)
+    ]
@@ -0,0 +1,130 @@
+"""
+Live dashboard figures over Server-Sent Events.
+
+The open dashboard subscribes to ``live_dashboard`` (ASGI only). The stream
+sends the headline figures once, then only the ones that changed, when the
+user's trades change: a trade written in this process wakes the stream as
+soon as its transaction commits; writes handled by other worker processes
+are picked up by a cheap re-check every LIVE_POLL_SECONDS. Each check is
+one aggregate query plus a short scan for the current streak (the same
+``stats.TradeStats`` streak rules as the dashboard), instead of the
+full dashboard recomputation and page reload.
+
+A stream ends after LIVE_STREAM_SECONDS and the browser reconnects on its
+own, so a connection dropped by the client does not keep a stream alive.
+"""
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from . import sharding
+from . import stats as trade_stats
+from .concurrency import gather
+from .models import Trade
+
+
+RETRY_MS = 3000  # EventSource reconnect delay after a stream ends
+
+_subscribers = {}  # user_id -> {(loop, asyncio.Event)}
+_subscribers_lock = threading.Lock()
+
+
+def snapshot(user):
+    """The dashboard figures the stream keeps current"""
+    today = timezone.now().date()
+    with sharding.user_shard(user):
+        user_trades = Trade.objects.filter(user=user)
+        stats = user_trades.aggregate(
+            total_trades=Count('id'),
+            winning_trades=Count('id', filter=Q(profit_loss__gt=0)),
+            total_pnl=Sum('profit_loss'),
+            today_pnl=Sum('profit_loss', filter=Q(date=today)),
+            today_trades_count=Count('id', filter=Q(date=today)),
+            last_trade_date=Max('date'),
+        )
+        # Only the trades of the current streak, fetched in chunks
+        recent = trade_stats.latest_run(user_trades)
+    total_trades = stats['total_trades']
+    return {
+        'total_trades': total_trades,
+        'win_rate': round(stats['winning_trades'] / total_trades * 100, 1) if total_trades else 0,
+        'total_pnl': round(stats['total_pnl'] or 0, 2),
+        'today_pnl': round(stats['today_pnl'] or 0, 2),
+        'today_trades_count': stats['today_trades_count'],
+        'current_win_streak': recent.current_win_streak,
+        'current_loss_streak': recent.current_loss_streak,
+        'last_trade_date': stats['last_trade_date'].isoformat() if stats['last_trade_date'] else None,
+    }
+
+
+def changes(previous, current):
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+
+def format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+@contextmanager
+def subscribe(user_id):
+    """An asyncio.Event set whenever ``user_id``'s trades change in this process"""
+    entry = (asyncio.get_running_loop(), asyncio.Event())
+    with _subscribers_lock:
+        _subscribers.setdefault(user_id, set()).add(entry)
+    try:
+        yield entry[1]
+    finally:
+        with _subscribers_lock:
+            entries = _subscribers.get(user_id)
+            entries.discard(entry)
+            if not entries:
+                del _subscribers[user_id]
+
+
+def notify(user_id):
+    with _subscribers_lock:
+        entries = list(_subscribers.get(user_id, ()))
+    for loop, event in entries:
+        loop.call_soon_threadsafe(event.set)
+
+
+async def stream(user):
+    """Async iterator of SSE messages for ``user``'s dashboard"""
+    # Queries run on the aggregate pool; the request thread's connection is
+    # not needed for the life of the stream
+    await sync_to_async(connections.close_all)()
+    poll = getattr(settings, 'LIVE_POLL_SECONDS', 15)
+    deadline = time.monotonic() + getattr(settings, 'LIVE_STREAM_SECONDS', 300)
+    sent = {}
+    with subscribe(user.pk) as changed:
+        yield f'retry: {RETRY_MS}\n\n'
+        while True:
+            changed.clear()
+            current, = await gather(partial(snapshot, user))
+            delta = changes(sent, current)
+            if delta:
+                sent = current
+                yield format_event('stats', delta)
+            else:
+                yield ': keep-alive\n\n'
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=min(poll, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+
+# Signal receivers, connected in JournalConfig.ready()
+def trade_changed(sender, instance, using, **kwargs):
+    transaction.on_commit(partial(notify, instance.user_id), using=using)
@@ -0,0 +1,244 @@
+"""
+HTTP load-test harness.
+
+Logs virtual users in and drives a weighted mix of journal routes at a fixed
+concurrency, then reports p50/p95/p99 latency and throughput per route. Only
+uses the standard library so it can run against any deployment:
+
+    python -m journal.loadtest --base-url http://127.0.0.1:8000 --users trader1,trader2
+
+``manage.py loadtest`` wraps this with seeding and a local gunicorn server.
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import date
+
+
+ROUTES = {
+    'dashboard': '/dashboard/',
+    'trade_list': '/trades/',
+    'trade_create': '/trades/add/',
+    'analytics': '/analytics/',
+    'export_csv': '/export/csv/',
+    'export_pdf': '/export/pdf/',
+    'export_excel': '/export/excel/',
+}
+
+DEFAULT_MIX = 'dashboard=5,trade_list=3,trade_create=1,analytics=2,export_csv=1,export_pdf=1,export_excel=1'
+
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects as responses instead of following them"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def parse_mix(spec):
+    """Parse ``route=weight,...`` into a dict, validating route names"""
+    mix = {}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ROUTES:
+            raise ValueError(f"Unknown route '{name}'. Available: {', '.join(ROUTES)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, math.ceil(pct / 100 * len(samples)) - 1))
+    return samples[rank]
+
+
+class VirtualUser:
+    """One logged-in browser session"""
+
+    def __init__(self, base_url, username, password, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect()
+        )
+
+    def request(self, path, data=None):
+        """Issue a request; returns (status, body bytes). Redirects are not followed."""
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def csrf_token(self, html):
+        match = CSRF_INPUT.search(html.decode('utf-8', 'ignore'))
+        if match:
+            return match.group(1)
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def login(self):
+        _, html = self.request('/login/')
+        status, _ = self.request('/login/', {
+            'csrfmiddlewaretoken': self.csrf_token(html),
+            'username': self.username,
+            'password': self.password,
+        })
+        if status != 302:
+            raise RuntimeError(f'Login failed for {self.username} (HTTP {status})')
+
+    def create_trade(self, rng):
+        _, html = self.request(ROUTES['trade_create'])
+        entry = round(rng.uniform(90, 110), 2)
+        exit_price = round(entry + rng.uniform(-3, 4), 2)
+        quantity = rng.choice([1, 5, 10, 25])
+        return self.request(ROUTES['trade_create'], {
+            'csrfmiddlewaretoken': self.csrf_token(html),
+            'date': date.today().isoformat(),
+            'symbol': rng.choice(['LOADA', 'LOADB', 'LOADC']),
+            'trade_type': 'LONG',
+            'trade_status': 'CLOSED',
+            'entry_time': '09:45',
+            'exit_time': '10:30',
+            'entry_price': entry,
+            'exit_price': exit_price,
+            'quantity': quantity,
+            'stop_loss': round(entry - 2, 2),
+            'target_price': round(entry + 4, 2),
+            'risk_per_trade': 1.0,
+            'exit_reason': 'Load test',
+            'profit_loss': round((exit_price - entry) * quantity, 2),
+            'percentage_gain_loss': round((exit_price - entry) / entry * 100, 2),
+            'setup_type': 'BREAKOUT',
+            'confidence_level': rng.randint(1, 10),
+        })
+
+    def hit(self, route, rng):
+        if route == 'trade_create':
+            return self.create_trade(rng)
+        return self.request(ROUTES[route])
+
+
+def run(base_url, credentials, concurrency=10, duration=30, mix=None, seed=None, log=None):
+    """
+    Run ``concurrency`` virtual users for ``duration`` seconds. ``credentials``
+    is a list of (username, password) pairs assigned round-robin.
+    """
+    mix = mix or parse_mix(DEFAULT_MIX)
+    routes, weights = zip(*mix.items())
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = [None]
+
+    def start_clock():
+        deadline[0] = time.monotonic() + duration
+
+    ready = threading.Barrier(concurrency + 1, action=start_clock)
+
+    def worker(index):
+        rng = random.Random(None if seed is None else seed + index)
+        username, password = credentials[index % len(credentials)]
+        user = VirtualUser(base_url, username, password)
+        try:
+            user.login()
+        finally:
+            ready.wait()
+        while time.monotonic() < deadline[0]:
+            route = rng.choices(routes, weights=weights)[0]
+            start = time.perf_counter()
+            try:
+                status, _ = user.hit(route, rng)
+            except OSError:
+                status = 0
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies[route].append(elapsed)
+                if status == 0 or status >= 400:
+                    errors[route] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    if log:
+        log(f'{concurrency} virtual users logged in; running for {duration}s...')
+    started = deadline[0] - duration
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    report = {'concurrency': concurrency, 'duration_s': round(elapsed, 2), 'routes': {}}
+    total = 0
+    for route in routes:
+        samples = sorted(latencies[route])
+        total += len(samples)
+        report['routes'][route] = {
+            'requests': len(samples),
+            'errors': errors[route],
+            'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0,
+            'p50_ms': round(percentile(samples, 50), 2),
+            'p95_ms': round(percentile(samples, 95), 2),
+            'p99_ms': round(percentile(samples, 99), 2),
+        }
+    report['total_requests'] = total
+    report['throughput_rps'] = round(total / elapsed, 2) if elapsed else 0
+    return report
+
+
+def format_report(report):
+    lines = [f"{'route':<14}{'reqs':>8}{'errs':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for route, stats in report['routes'].items():
+        lines.append(
+            f"{route:<14}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput_rps']:>9.2f}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+    lines.append(f"total: {report['total_requests']} requests, {report['throughput_rps']:.2f} req/s over {report['duration_s']}s")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', default='trader1', help='Comma-separated usernames to log in as')
+    parser.add_argument('--password', default='trader123')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Weighted route mix, e.g. dashboard=5,trade_list=3')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help='Write JSON report to this file')
+    args = parser.parse_args(argv)
+
+    credentials = [(name.strip(), args.password) for name in args.users.split(',') if name.strip()]
+    report = run(args.base_url, credentials, args.concurrency, args.duration, parse_mix(args.mix), args.seed, log=print)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Logging building blocks referenced from ``settings.LOGGING``.
+
+Request threads only put records on an in-memory queue
+(``QueueListenerHandler``); a background ``QueueListener`` thread formats
+them (``JsonFormatter``) and writes them to the real handlers. When the
+queue is full records are dropped rather than blocking the request.
+``SamplingFilter`` keeps a fraction of low-severity records from noisy
+loggers such as ``django.db.backends``.
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra=`` fields"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Pass ``rate`` of records below ``min_level``; always pass the rest"""
+
+    def __init__(self, rate=1.0, min_level='WARNING'):
+        super().__init__()
+        self.rate = float(rate)
+        self.min_level = logging.getLevelName(min_level) if isinstance(min_level, str) else min_level
+
+    def filter(self, record):
+        return record.levelno >= self.min_level or random.random() < self.rate
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    QueueHandler that owns the QueueListener draining it. ``handlers`` are
+    the downstream handlers, given in LOGGING as ``cfg://handlers.<name>``.
+    """
+
+    def __init__(self, handlers, queue_size=10000, respect_handler_level=True):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        # Index access makes dictConfig resolve the cfg:// references
+        handlers = [handlers[i] for i in range(len(handlers))]
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=respect_handler_level)
+        self.listener.start()
+        self._running = True
+        _handlers.append(self)
+        atexit.register(self.stop)
+
+    def restart(self):
+        """New queue and listener thread, for a forked child process"""
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.listener = QueueListener(
+            self.queue, *self.listener.handlers, respect_handler_level=self.listener.respect_handler_level,
+        )
+        self.listener.start()
+        self._running = True
+
+    def stop(self):
+        """Flush queued records and stop the listener thread"""
+        if self._running:
+            self._running = False
+            self.listener.stop()
+
+    def prepare(self, record):
+        # Like QueueHandler.prepare, but leave formatting to the listener's
+        # handlers; only the message and traceback text are rendered here
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handlers = []  # every QueueListenerHandler created by dictConfig
+
+
+def restart_listeners():
+    """
+    Call in a process forked after logging was configured (gunicorn
+    ``post_fork`` with preload): the parent's listener threads do not exist
+    in the child, so its records would sit in the queue forever.
+    """
+    for handler in _handlers:
+        handler.restart()
+
+
+def parse_levels(value):
+    """``"django.db.backends=DEBUG,journal=INFO"`` -> {logger: level}"""
+    levels = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, level = item.partition('=')
+        levels[name.strip()] = level.strip().upper()
+    return levels
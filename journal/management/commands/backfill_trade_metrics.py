@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from journal import sharding
+from journal.models import Trade
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the derived trade columns (risk_reward, r_multiple, holding_minutes, outcome) '
+        'in primary-key batches. Safe to interrupt and re-run: only rows not yet filled are '
+        'touched unless --all is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows read and updated per transaction')
+        parser.add_argument('--all', action='store_true', help='Recompute every row, not just unfilled ones')
+        parser.add_argument('--after-pk', type=int, default=0, help='Resume --all after this primary key')
+
+    def handle(self, *args, **options):
+        total = 0
+        for alias in sharding.shard_aliases():
+            trades = Trade.objects.using(alias)
+            if not options['all']:
+                # outcome is set for every saved row, so NULL marks "not yet filled"
+                trades = trades.filter(outcome__isnull=True)
+            last_pk = options['after_pk']
+            while True:
+                batch = list(trades.filter(pk__gt=last_pk).order_by('pk')[:options['batch_size']])
+                if not batch:
+                    break
+                for trade in batch:
+                    trade.update_derived_metrics()
+                Trade.objects.using(alias).bulk_update(batch, Trade.DERIVED_FIELDS)
+                last_pk = batch[-1].pk
+                total += len(batch)
+                self.stdout.write(f'{alias}: {len(batch)} trade(s) updated, through pk {last_pk}')
+        self.stdout.write(self.style.SUCCESS(f'{total} trade(s) updated'))
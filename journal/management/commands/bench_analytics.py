@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from journal import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Time Trade analytics classmethods, the dashboard and exports at several data sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,5000', help='Comma-separated trade counts to benchmark')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (after one warm-up)')
+        parser.add_argument('--case', action='append', dest='cases', help='Only run this case (repeatable)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data')
+        parser.add_argument('--output', help='Write JSON results to this file')
+        parser.add_argument('--compare', help='Baseline JSON file to compare median timings against')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers')
+
+        unknown = set(options['cases'] or []) - set(benchmarks.CASES)
+        if unknown:
+            raise CommandError(f"Unknown case(s): {', '.join(sorted(unknown))}. Available: {', '.join(benchmarks.CASES)}")
+
+        report = benchmarks.run(
+            sizes,
+            repeat=options['repeat'],
+            cases=options['cases'],
+            seed_value=options['seed'],
+            log=self.stdout.write,
+        )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            self.stdout.write('\nChange vs baseline (median):')
+            for case, size, before, after, change in benchmarks.compare(baseline, report):
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+                self.stdout.write(style(f"{case:<36} n={size:<7} {before:>10.2f}ms -> {after:>10.2f}ms ({change:+.1f}%)"))
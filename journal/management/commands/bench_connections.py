@@ -0,0 +1,79 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+
+from journal.seed import seed_user
+
+
+USERNAME = '__bench_connections'
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request latency with and without persistent DB connections (CONN_MAX_AGE)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per setting')
+        parser.add_argument('--url', default='/market-conditions/', help='Page to request (a light, DB-backed page)')
+        parser.add_argument('--max-ages', default='0,60', help='Comma-separated CONN_MAX_AGE values to compare')
+
+    def handle(self, *args, **options):
+        try:
+            max_ages = [int(age) for age in options['max_ages'].split(',') if age.strip()]
+        except ValueError:
+            raise CommandError('--max-ages must be a comma-separated list of integers')
+
+        # Requests run outside a transaction so connections can be closed
+        # (or kept) between them as in production
+        user, created = User.objects.get_or_create(username=USERNAME)
+        if created:
+            seed_user(user, 50, random.Random(1))
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(count_connection)
+        results = {}
+        try:
+            client = Client()
+            client.force_login(user)
+            for max_age in max_ages:
+                for conn in connections.all():
+                    conn.close()
+                    conn.settings_dict['CONN_MAX_AGE'] = max_age
+                client.get(options['url'])  # warm-up
+                opened.clear()
+                samples = []
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    # The test client skips the request_started/finished
+                    # close_old_connections hooks; run them as WSGIHandler does
+                    close_old_connections()
+                    response = client.get(options['url'])
+                    close_old_connections()
+                    samples.append((time.perf_counter() - start) * 1000)
+                    if response.status_code != 200:
+                        raise CommandError(f"{options['url']} returned {response.status_code}")
+                samples.sort()
+                results[max_age] = statistics.median(samples)
+                self.stdout.write(
+                    f"CONN_MAX_AGE={max_age:<5} median={results[max_age]:.2f}ms "
+                    f"p95={samples[int(len(samples) * 0.95) - 1]:.2f}ms "
+                    f"connections opened={len(opened)}"
+                )
+        finally:
+            connection_created.disconnect(count_connection)
+            User.objects.filter(username=USERNAME).delete()
+
+        if 0 in results and len(results) > 1:
+            persistent = min(age for age in results if age)
+            saved = results[0] - results[persistent]
+            self.stdout.write(self.style.SUCCESS(
+                f'Persistent connections save {saved:.2f}ms per request ({saved / results[0] * 100:.0f}%)'
+            ))
@@ -0,0 +1,75 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# What a worker imports at boot: the ASGI app and the URLconf (all views)
+BOOT = 'from trading_journal.asgi import application; import trading_journal.urls'
+# What it used to import as well, before the export builders became lazy
+EXPORTS = 'import journal.reports.pdf, journal.reports.excel'
+
+PROBE = '''
+import resource, time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = 'Worker boot time and memory (-X importtime) with the export libraries loaded lazily vs at boot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per configuration')
+        parser.add_argument('--top', type=int, default=10, help='Show the N slowest top-level imports deferred by lazy loading')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        results = {}
+        for label, code in (('lazy exports', BOOT), ('exports at boot', f'{BOOT}; {EXPORTS}')):
+            seconds, rss, imports = [], [], {}
+            for _ in range(options['runs']):
+                proc = subprocess.run(
+                    [sys.executable, '-X', 'importtime', '-c', PROBE.format(code=code)],
+                    env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+                )
+                elapsed, maxrss = proc.stdout.split()[-2:]
+                seconds.append(float(elapsed))
+                rss.append(int(maxrss) / 1024)  # ru_maxrss is in KiB on Linux
+                imports = self._top_level_imports(proc.stderr)
+            results[label] = (statistics.median(seconds), statistics.median(rss), imports)
+            self.stdout.write(
+                f'{label:<16} boot={results[label][0] * 1000:7.1f}ms  max RSS={results[label][1]:6.1f}MiB  '
+                f'modules={len(imports)}'
+            )
+
+        lazy, eager = results['lazy exports'], results['exports at boot']
+        deferred = sorted(
+            ((name, micros) for name, micros in eager[2].items() if name not in lazy[2]),
+            key=lambda item: -item[1],
+        )
+        if deferred:
+            self.stdout.write('Deferred until the first export (cumulative import time):')
+            for name, micros in deferred[:options['top']]:
+                self.stdout.write(f'  {micros / 1000:7.1f}ms  {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Lazy loading saves {(eager[0] - lazy[0]) * 1000:.1f}ms of boot and '
+            f'{eager[1] - lazy[1]:.1f}MiB RSS per worker'
+        ))
+
+    @staticmethod
+    def _top_level_imports(importtime_output):
+        """{module: cumulative microseconds} for modules imported at the top of the tree"""
+        imports = {}
+        for line in importtime_output.splitlines():
+            match = _IMPORTTIME.match(line)
+            if match and not match.group(3):
+                imports[match.group(4)] = int(match.group(2))
+        return imports
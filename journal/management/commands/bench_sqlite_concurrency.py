@@ -0,0 +1,113 @@
+import random
+import statistics
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test import override_settings
+
+from journal.models import Trade
+from journal.seed import build_trades, seed_user
+
+
+# Readers and writers use different users so the read workload stays the
+# same size however many trades the writers manage to insert
+READER = '__bench_sqlite_reader'
+WRITER = '__bench_sqlite_writer'
+
+# SQLite's own defaults, plus the 5s busy timeout Django sets by default
+BASELINE_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'busy_timeout': 5000,
+    'mmap_size': 0,
+    'cache_size': -2000,
+    'temp_store': 'DEFAULT',
+}
+
+
+class Command(BaseCommand):
+    help = 'Concurrent trade writes vs dashboard reads on SQLite, with and without the journal.sqlite pragmas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help='Threads inserting trades')
+        parser.add_argument('--readers', type=int, default=8, help='Threads computing dashboard stats')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per configuration')
+        parser.add_argument('--trades', type=int, default=1000, help='Trades seeded before the run')
+        parser.add_argument('--mode', choices=['both', 'baseline', 'tuned'], default='both')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('bench_sqlite_concurrency only applies to SQLite databases')
+
+        users = {}
+        for username in (READER, WRITER):
+            users[username], created = User.objects.get_or_create(username=username)
+            if created:
+                seed_user(users[username], options['trades'], random.Random(1))
+        modes = ['baseline', 'tuned'] if options['mode'] == 'both' else [options['mode']]
+        try:
+            for mode in modes:
+                overrides = BASELINE_PRAGMAS if mode == 'baseline' else {}
+                with override_settings(SQLITE_PRAGMAS=overrides):
+                    connections.close_all()
+                    result = self.run_mix(users[READER], users[WRITER], options)
+                self.report(mode, result, options['duration'])
+        finally:
+            connections.close_all()
+            User.objects.filter(username__in=[READER, WRITER]).delete()
+
+    def run_mix(self, reader, writer, options):
+        deadline = time.monotonic() + options['duration']
+        result = {'write': [], 'read': [], 'locked': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def worker(kind, index):
+            rng = random.Random(index)
+            latencies, locked, errors = [], 0, 0
+            try:
+                while time.monotonic() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        if kind == 'write':
+                            with transaction.atomic():
+                                Trade.objects.bulk_create(build_trades(writer, 1, rng))
+                        else:
+                            Trade.get_dashboard_stats(reader)
+                    except OperationalError as exc:
+                        if 'locked' in str(exc):
+                            locked += 1
+                        else:
+                            errors += 1
+                        continue
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                connection.close()
+            with lock:
+                result[kind].extend(latencies)
+                result['locked'] += locked
+                result['errors'] += errors
+
+        threads = [threading.Thread(target=worker, args=('write', i)) for i in range(options['writers'])]
+        threads += [threading.Thread(target=worker, args=('read', i)) for i in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return result
+
+    def report(self, mode, result, duration):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{mode}:'))
+        for kind in ('write', 'read'):
+            samples = sorted(result[kind])
+            if not samples:
+                self.stdout.write(f'  {kind:<6} no successful operations')
+                continue
+            p95 = samples[max(int(len(samples) * 0.95) - 1, 0)]
+            self.stdout.write(
+                f'  {kind:<6} {len(samples) / duration:8.1f} ops/s  '
+                f'median={statistics.median(samples):.2f}ms p95={p95:.2f}ms'
+            )
+        self.stdout.write(f"  'database is locked' errors: {result['locked']}, other errors: {result['errors']}")
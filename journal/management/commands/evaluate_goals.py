@@ -0,0 +1,75 @@
+import time
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from journal import goals, sharding
+from journal.models import BatchRun, TradingGoal
+
+
+JOB = 'evaluate_goals'
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute progress of every active PROFIT, WIN_RATE and TRADE_COUNT goal from trades '
+        '(schedule nightly; trade writes keep them current in between). One aggregate query per user; '
+        'an interrupted run is resumed from its checkpoint by the next one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Users evaluated per batch')
+        parser.add_argument('--restart', action='store_true', help='Start over instead of resuming an unfinished run')
+
+    def handle(self, *args, **options):
+        run = BatchRun.objects.filter(job=JOB, finished_at__isnull=True).first()
+        if run is None or options['restart']:
+            run = BatchRun.objects.create(job=JOB)
+        elif run.checkpoint:
+            self.stdout.write(f"Resuming run started {run.started_at:%Y-%m-%d %H:%M} at {run.checkpoint['step']} "
+                              f"after user {run.checkpoint['last_user_id']}")
+
+        aliases = sharding.shard_aliases()
+        resume_step = run.checkpoint.get('step')
+        if resume_step not in aliases:
+            resume_step = None  # fresh run, or the shard list changed since: start over
+
+        started = time.monotonic()
+        for alias in aliases:
+            if resume_step is not None:
+                if alias != resume_step:
+                    continue
+                last_user_id, resume_step = run.checkpoint['last_user_id'], None
+            else:
+                last_user_id = 0
+            active = goals.measured(TradingGoal.objects.using(alias).filter(is_active=True))
+            while True:
+                user_ids = list(
+                    active.filter(user_id__gt=last_user_id).order_by('user_id')
+                    .values_list('user_id', flat=True).distinct()[:options['batch_size']]
+                )
+                if not user_ids:
+                    break
+                batch = active.filter(user_id__in=user_ids).order_by('user_id', 'pk')
+                processed = changed = 0
+                for _, user_goals in groupby(batch, key=lambda goal: goal.user_id):
+                    user_goals = list(user_goals)
+                    processed += len(user_goals)
+                    changed += goals.evaluate(user_goals, using=alias)
+                last_user_id = user_ids[-1]
+                run.rows_processed += processed
+                run.rows_changed += changed
+                run.checkpoint = {'step': alias, 'last_user_id': last_user_id}
+                run.duration += time.monotonic() - started
+                started = time.monotonic()
+                run.save(update_fields=['rows_processed', 'rows_changed', 'checkpoint', 'duration'])
+                self.stdout.write(f'{alias}: {len(user_ids)} user(s), {processed} goal(s) evaluated, {changed} updated')
+
+        run.duration += time.monotonic() - started
+        run.finished_at = timezone.now()
+        run.checkpoint = {}
+        run.save(update_fields=['duration', 'finished_at', 'checkpoint'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{run.rows_processed} goal(s) evaluated, {run.rows_changed} updated in {run.duration:.1f}s'
+        ))
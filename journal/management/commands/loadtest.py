@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from journal import loadtest
+
+
+class Command(BaseCommand):
+    help = 'Seed a database, start the app under gunicorn and drive a concurrent HTTP load against it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=10, help='Concurrent virtual users')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run the load')
+        parser.add_argument('--mix', default=loadtest.DEFAULT_MIX, help='Weighted route mix, e.g. dashboard=5,trade_list=3')
+        parser.add_argument('--seed-users', type=int, default=5, help='Seed this many loadtest users (0 to skip seeding)')
+        parser.add_argument('--seed-trades', type=int, default=1000, help='Trades per seeded user')
+        parser.add_argument('--database-url', help='DATABASE_URL for the server, e.g. sqlite:////tmp/load.sqlite3 or postgres://...')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+        parser.add_argument('--threads', type=int, default=1, help='gunicorn threads per worker (--wsgi only)')
+        parser.add_argument('--wsgi', action='store_true', help='Serve the WSGI app instead of the ASGI app (Procfile)')
+        parser.add_argument('--base-url', help='Target an already running server instead of starting gunicorn')
+        parser.add_argument('--output', help='Write JSON report to this file')
+
+    def handle(self, *args, **options):
+        env = os.environ.copy()
+        if options['database_url']:
+            env['DATABASE_URL'] = options['database_url']
+        manage = [sys.executable, str(settings.BASE_DIR / 'manage.py')]
+
+        if options['seed_users']:
+            self.stdout.write(f"Seeding {options['seed_users']} users x {options['seed_trades']} trades...")
+            subprocess.run(manage + ['migrate', '--verbosity=0'], env=env, check=True)
+            subprocess.run(manage + [
+                'seed_journal', '--users', str(options['seed_users']), '--trades', str(options['seed_trades']),
+                '--prefix', 'loadtest', '--seed', '1',
+            ], env=env, check=True)
+
+        server = None
+        base_url = options['base_url']
+        if not base_url:
+            base_url = f"http://127.0.0.1:{options['port']}"
+            # Other settings (preload, recycling) come from gunicorn.conf.py
+            if options['wsgi']:
+                app = ['trading_journal.wsgi:application', '--worker-class', 'gthread', '--threads', str(options['threads'])]
+            else:
+                app = ['trading_journal.asgi:application']
+            server = subprocess.Popen([
+                sys.executable, '-m', 'gunicorn', *app,
+                '--bind', f"127.0.0.1:{options['port']}",
+                '--workers', str(options['workers']),
+                '--log-level', 'warning',
+            ], env=env, cwd=settings.BASE_DIR)
+            self._wait_for_server(base_url, server)
+
+        try:
+            credentials = [(f'loadtest{i + 1}', 'trader123') for i in range(max(options['seed_users'], 1))]
+            report = loadtest.run(
+                base_url,
+                credentials,
+                concurrency=options['concurrency'],
+                duration=options['duration'],
+                mix=loadtest.parse_mix(options['mix']),
+                seed=1,
+                log=self.stdout.write,
+            )
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=30)
+
+        report['server'] = {'workers': options['workers'], 'threads': options['threads']} if server else {'base_url': base_url}
+        self.stdout.write(loadtest.format_report(report))
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def _wait_for_server(self, base_url, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn exited with code {server.returncode}')
+            try:
+                urllib.request.urlopen(f'{base_url}/test/', timeout=2).read()
+                return
+            except OSError:
+                time.sleep(0.25)
+        server.terminate()
+        raise CommandError(f'gunicorn did not become ready within {timeout}s')
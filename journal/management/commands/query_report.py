@@ -0,0 +1,70 @@
+import random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from journal import urls as journal_urls
+from journal.instrumentation import record_queries
+from journal.seed import seed_user
+
+
+SKIPPED_VIEWS = {'login', 'logout', 'register', 'home', 'test'}
+
+
+class Command(BaseCommand):
+    help = 'Render every journal page for a synthetic user and report query counts, budgets and top query shapes per view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trades', type=int, default=500, help='Trades for the synthetic user')
+        parser.add_argument('--top', type=int, default=5, help='Query shapes to list per view')
+        parser.add_argument('--view', action='append', dest='views', help='Only report this URL name (repeatable)')
+        parser.add_argument('--fail-on-budget', action='store_true', help='Exit non-zero when a view exceeds its budget')
+
+    def handle(self, *args, **options):
+        over_budget = []
+        with transaction.atomic():
+            user = User.objects.create(username='__query_report')
+            seed_user(user, options['trades'], random.Random(1))
+            trade_pk = user.trades.values_list('pk', flat=True).first()
+
+            client = Client()
+            client.force_login(user)
+
+            for pattern in journal_urls.urlpatterns:
+                name = pattern.name
+                if name in SKIPPED_VIEWS or (options['views'] and name not in options['views']):
+                    continue
+                if pattern.pattern.converters:
+                    if 'trade' not in name:
+                        continue
+                    url = reverse(name, kwargs={'pk': trade_pk})
+                else:
+                    url = reverse(name)
+
+                with record_queries() as recorder:
+                    response = client.get(url)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+
+                budget = getattr(pattern.callback, 'query_budget', None)
+                exceeded = budget is not None and recorder.count > budget
+                if exceeded:
+                    over_budget.append(name)
+                status = self.style.ERROR('OVER') if exceeded else 'ok' if budget is not None else '-'
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"{name} ({url}) HTTP {response.status_code}: {recorder.count} queries, "
+                    f"{recorder.total_time * 1000:.1f}ms, budget {budget if budget is not None else 'n/a'} [{status}]"
+                ))
+                for shape, count in recorder.shapes().most_common(options['top']):
+                    self.stdout.write(f"  x{count:<4} {shape[:160]}")
+
+            transaction.set_rollback(True)
+
+        if over_budget:
+            message = f"Views over budget: {', '.join(over_budget)}"
+            if options['fail_on_budget']:
+                raise SystemExit(message)
+            self.stdout.write(self.style.WARNING(message))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from journal import sharding
+
+
+class Command(BaseCommand):
+    help = "Move users' journal rows to the shard their id hashes to (run after adding shards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list the users that would move')
+        parser.add_argument('--limit', type=int, default=0, help='Move at most this many users (0 = all)')
+
+    def handle(self, *args, **options):
+        if not sharding.sharding_enabled():
+            raise CommandError('Sharding is not enabled (set JOURNAL_SHARD_URLS)')
+
+        moves = list(sharding.misplaced_users())
+        if options['limit']:
+            moves = moves[:options['limit']]
+        if not moves:
+            self.stdout.write(self.style.SUCCESS('All users are on their shard'))
+            return
+
+        for user_id, source, target in moves:
+            if options['dry_run']:
+                self.stdout.write(f'user {user_id}: {source} -> {target}')
+                continue
+            rows = sharding.move_user(user_id, source, target)
+            self.stdout.write(f'user {user_id}: moved {rows} rows {source} -> {target}')
+        verb = 'would move' if options['dry_run'] else 'moved'
+        self.stdout.write(self.style.SUCCESS(f'{len(moves)} user(s) {verb}'))
@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from journal import review_stats, sharding
+from journal.models import BatchRun
+
+
+JOB = 'recompute_reviews'
+STALE_JOB = 'recompute_reviews --stale'
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the stored statistics of every weekly and monthly review from current trades '
+        '(schedule nightly). Batches of reviews across all users are refreshed with grouped queries; '
+        'an interrupted run is resumed from its checkpoint by the next one. With --stale, only '
+        'reviews flagged by trade edits are refreshed (schedule frequently).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Reviews refreshed per batch')
+        parser.add_argument('--restart', action='store_true', help='Start over instead of resuming an unfinished run')
+        parser.add_argument('--stale', action='store_true', help='Only refresh reviews whose trades changed')
+
+    def handle(self, *args, **options):
+        job = STALE_JOB if options['stale'] else JOB
+        run = BatchRun.objects.filter(job=job, finished_at__isnull=True).first()
+        if run is None or options['restart']:
+            run = BatchRun.objects.create(job=job)
+        elif run.checkpoint:
+            self.stdout.write(f"Resuming run started {run.started_at:%Y-%m-%d %H:%M} at {run.checkpoint['step']} "
+                              f"after pk {run.checkpoint['last_pk']}")
+
+        steps = [
+            (alias, model)
+            for alias in sharding.shard_aliases()
+            for model in review_stats.STAT_FIELDS
+        ]
+        resume_step = run.checkpoint.get('step')
+        if resume_step not in {f'{alias}:{model._meta.label_lower}' for alias, model in steps}:
+            resume_step = None  # fresh run, or the shard list changed since: start over
+
+        started = time.monotonic()
+        for alias, model in steps:
+            step = f'{alias}:{model._meta.label_lower}'
+            if resume_step is not None:
+                if step != resume_step:
+                    continue
+                last_pk, resume_step = run.checkpoint['last_pk'], None
+            else:
+                last_pk = 0
+            fields = review_stats.STAT_FIELDS[model]
+            reviews = model.objects.using(alias)
+            if options['stale']:
+                reviews = reviews.filter(stale=True)
+            while True:
+                batch = list(
+                    reviews.filter(pk__gt=last_pk).order_by('pk')
+                    .only('pk', 'stale', *fields)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                changed = review_stats.refresh(batch, using=alias)
+                last_pk = batch[-1].pk
+                run.rows_processed += len(batch)
+                run.rows_changed += changed
+                run.checkpoint = {'step': step, 'last_pk': last_pk}
+                run.duration += time.monotonic() - started
+                started = time.monotonic()
+                run.save(update_fields=['rows_processed', 'rows_changed', 'checkpoint', 'duration'])
+                self.stdout.write(f'{step}: {len(batch)} review(s) checked, {changed} updated, through pk {last_pk}')
+
+        run.duration += time.monotonic() - started
+        run.finished_at = timezone.now()
+        run.checkpoint = {}
+        run.save(update_fields=['duration', 'finished_at', 'checkpoint'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{run.rows_processed} review(s) checked, {run.rows_changed} updated in {run.duration:.1f}s'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from journal.seed import seed
+
+
+class Command(BaseCommand):
+    help = 'Seed the database with synthetic users, trades, psychology and market-condition rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5, help='Number of users to create')
+        parser.add_argument('--trades', type=int, default=500, help='Trades per user')
+        parser.add_argument('--prefix', default='trader', help='Username prefix (users are <prefix>1..N)')
+        parser.add_argument('--password', default='trader123', help='Password for newly created users')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"Seeding {options['users']} users x {options['trades']} trades..."
+        )
+        users = seed(
+            options['users'],
+            options['trades'],
+            prefix=options['prefix'],
+            password=options['password'],
+            seed_value=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(users)} users ({users[0].username}..{users[-1].username})" if users else 'Nothing to seed'
+        ))
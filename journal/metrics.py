@@ -0,0 +1,299 @@
+"""
+Prometheus-format metrics.
+
+Every process keeps its own counters and histograms in memory. When
+METRICS_MULTIPROC_DIR is set, each gunicorn worker periodically snapshots
+them to ``<dir>/metrics_<pid>_<start>.json`` (atomic rename), and the
+``/metrics`` view merges all snapshots, so any worker can answer a scrape.
+When a worker exits, the master folds its snapshot into
+``metrics_exited.json`` and deletes it (``absorb_exited``, gunicorn's
+child_exit hook), so counters stay monotonic while the directory holds one
+file per live worker. Keying files by start time as well as pid keeps a
+recycled pid from overwriting an earlier worker's totals.
+
+Gauges are computed at scrape time from callbacks (e.g. job backlog read
+from the database), so they need no cross-process aggregation.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+INF_BUCKET = 'le="+Inf"'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _METRICS[name] = self
+
+    def _key(self, labels):
+        return self.name, tuple(str(labels[label]) for label in self.labelnames)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            _values[key] = _values.get(key, 0) + amount
+        _maybe_flush()
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            # [per-bucket counts..., sum, count]; buckets are cumulated on export
+            state = _values.get(key)
+            if state is None:
+                state = _values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+        _maybe_flush()
+
+
+_METRICS = {}
+_GAUGES = {}
+_values = {}
+_lock = threading.Lock()
+_last_flush = [0.0]
+
+
+def register_gauge(name, documentation, callback, labelnames=()):
+    """
+    Register a gauge evaluated at scrape time. ``callback`` returns a number,
+    or a dict of label-value tuples to numbers when ``labelnames`` is given.
+    """
+    _GAUGES[name] = (documentation, tuple(labelnames), callback)
+
+
+# Metric definitions
+request_latency = Histogram(
+    'journal_http_request_duration_seconds', 'Request latency by route', ['route', 'method'],
+)
+db_queries = Counter(
+    'journal_db_queries_total', 'SQL queries executed by route', ['route'],
+)
+export_duration = Histogram(
+    'journal_export_duration_seconds', 'Time to build an export', ['format'],
+)
+export_size = Histogram(
+    'journal_export_size_bytes', 'Size of generated exports', ['format'], buckets=SIZE_BUCKETS,
+)
+analytics_cache = Counter(
+    'journal_analytics_cache_requests_total', 'Analytics cache lookups', ['result'],
+)
+
+
+# Multiprocess snapshots
+def _multiproc_dir():
+    return getattr(settings, 'METRICS_MULTIPROC_DIR', '') or ''
+
+
+def _snapshot():
+    with _lock:
+        return [[name, list(labels), value] for (name, labels), value in _values.items()]
+
+
+EXITED_FILE = 'metrics_exited.json'
+_own_file = [None, None]  # pid, file name
+
+
+def _own_file_name():
+    """This process's snapshot file, named on first use after any fork"""
+    pid = os.getpid()
+    if _own_file[0] != pid:
+        _own_file[:] = [pid, f'metrics_{pid}_{time.time_ns()}.json']
+    return _own_file[1]
+
+
+def _write_json(path, data):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def flush():
+    """Write this process's metrics to the shared directory"""
+    directory = _multiproc_dir()
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    _write_json(os.path.join(directory, _own_file_name()), _snapshot())
+    _last_flush[0] = time.monotonic()
+
+
+def _maybe_flush():
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+    if _multiproc_dir() and time.monotonic() - _last_flush[0] >= interval:
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+atexit.register(lambda: _multiproc_dir() and flush())
+
+
+def _read_exited(directory):
+    """(absorbed file names, summed values) of exited workers"""
+    try:
+        with open(os.path.join(directory, EXITED_FILE)) as f:
+            exited = json.load(f)
+    except FileNotFoundError:
+        return set(), []
+    return set(exited['absorbed']), exited['values']
+
+
+def _merge_into(merged, rows):
+    for name, labels, value in rows:
+        key = (name, tuple(labels))
+        if isinstance(value, list):
+            current = merged.setdefault(key, [0] * len(value))
+            for i, v in enumerate(value):
+                current[i] += v
+        else:
+            merged[key] = merged.get(key, 0) + value
+
+
+def absorb_exited(pid):
+    """
+    Fold the snapshot of the exited worker ``pid`` into EXITED_FILE and
+    delete it. Runs in the gunicorn master (child_exit), which is the only
+    writer of EXITED_FILE.
+    """
+    directory = _multiproc_dir()
+    if not directory:
+        return
+    paths = glob.glob(os.path.join(directory, f'metrics_{pid}_*.json'))
+    if not paths:
+        return
+    absorbed, values = _read_exited(directory)
+    merged = {}
+    _merge_into(merged, values)
+    names = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                _merge_into(merged, json.load(f))
+        except (OSError, ValueError):
+            pass
+        names.append(os.path.basename(path))
+    # Names absorbed earlier whose files are gone no longer need skipping
+    absorbed = {name for name in absorbed if os.path.exists(os.path.join(directory, name))}
+    _write_json(os.path.join(directory, EXITED_FILE), {
+        'absorbed': sorted(absorbed.union(names)),
+        'values': [[name, list(labels), value] for (name, labels), value in merged.items()],
+    })
+    # Readers already skip these (listed as absorbed), so deleting them
+    # after the atomic write never drops or double-counts their totals
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _merged_values():
+    """Sum the snapshots of every process (this one from memory)"""
+    merged = {}
+    directory = _multiproc_dir()
+    if directory:
+        # Worker files are read before the exited totals: a file absorbed
+        # meanwhile is then either still counted here or listed as absorbed
+        snapshots = {}
+        for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+            name = os.path.basename(path)
+            if name in (EXITED_FILE, _own_file_name()):
+                continue
+            try:
+                with open(path) as f:
+                    snapshots[name] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        try:
+            absorbed, exited = _read_exited(directory)
+        except (OSError, ValueError, KeyError):
+            absorbed, exited = set(), []
+        _merge_into(merged, exited)
+        for name, rows in snapshots.items():
+            if name not in absorbed:
+                _merge_into(merged, rows)
+    _merge_into(merged, _snapshot())
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Render all metrics in the Prometheus text exposition format"""
+    merged = _merged_values()
+    lines = []
+    for metric in _METRICS.values():
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for (name, labels), value in sorted(merged.items()):
+            if name != metric.name:
+                continue
+            if metric.kind == 'counter':
+                lines.append(f'{name}{_labels(metric.labelnames, labels)} {_format_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets, value[:-2]):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f'{name}_bucket{_labels(metric.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(metric.labelnames, labels, INF_BUCKET)} {value[-1]}')
+            lines.append(f'{name}_sum{_labels(metric.labelnames, labels)} {_format_number(value[-2])}')
+            lines.append(f'{name}_count{_labels(metric.labelnames, labels)} {value[-1]}')
+
+    for name, (documentation, labelnames, callback) in _GAUGES.items():
+        try:
+            result = callback()
+        except Exception:
+            continue
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} gauge')
+        if isinstance(result, dict):
+            for labels, value in sorted(result.items()):
+                lines.append(f'{name}{_labels(labelnames, labels)} {_format_number(value)}')
+        else:
+            lines.append(f'{name} {_format_number(result)}')
+    return '\n'.join(lines) + '\n'
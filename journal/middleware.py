@@ -0,0 +1,268 @@
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from . import metrics, profiling, routers, sharding, slow_queries, tracing
+from .instrumentation import QueryRecorder, QueryBudgetExceeded, collect_timings, format_violation, instrument_connections
+
+
+logger = logging.getLogger('journal.queries')
+
+
+class QueryBudgetMiddleware:
+    """
+    Opt-in (QUERY_BUDGET_ENABLED) per-request query recorder.
+
+    Logs a warning when a view exceeds its ``@query_budget`` or repeats one
+    SQL shape QUERY_REPEAT_THRESHOLD times (N+1). With QUERY_BUDGET_STRICT
+    the violation is raised instead, which fails tests and dev requests.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.repeat_threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', 5)
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with instrument_connections(recorder):
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        budget = getattr(match.func, 'query_budget', None) if match else None
+        repeated = recorder.repeated(self.repeat_threshold)
+        if (budget is not None and recorder.count > budget) or repeated:
+            message = format_violation(
+                match.view_name if match else request.path,
+                recorder,
+                budget if budget is not None else 'undeclared',
+                self.repeat_threshold,
+            )
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+request_logger = logging.getLogger('journal.requests')
+
+
+class ServerTimingMiddleware:
+    """
+    Break each sampled request down into DB, template render, report-builder
+    and remaining Python ("app") time. Emitted as a ``Server-Timing`` header
+    and one structured log line on ``journal.requests``.
+
+    Only a SERVER_TIMING_SAMPLE_RATE fraction of requests is instrumented, so
+    unsampled requests pay nothing beyond a random() call.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 1.0)
+
+    def __call__(self, request):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with collect_timings() as timings:
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        phases = dict(timings.phases)
+        app = max(total - timings.db_time - sum(phases.values()), 0)
+        entries = [f'db;dur={timings.db_time * 1000:.1f};desc="{timings.db_queries} queries"']
+        entries += [f'{name};dur={duration * 1000:.1f}' for name, duration in phases.items()]
+        entries += [f'app;dur={app * 1000:.1f}', f'total;dur={total * 1000:.1f}']
+        response['Server-Timing'] = ', '.join(entries)
+
+        match = request.resolver_match
+        request_logger.info(
+            '%s %s %s %.1fms (db %.1fms/%d queries)',
+            request.method, request.path, response.status_code, total * 1000,
+            timings.db_time * 1000, timings.db_queries,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'db_ms': round(timings.db_time * 1000, 2),
+                'db_queries': timings.db_queries,
+                'app_ms': round(app * 1000, 2),
+                **{f'{name}_ms': round(duration * 1000, 2) for name, duration in phases.items()},
+            },
+        )
+        return response
+
+
+class _QueryCounter:
+    """execute_wrapper that only counts queries"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Feed per-route latency, query counts and export sizes into journal.metrics"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with instrument_connections(counter):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        metrics.request_latency.observe(elapsed, route=route, method=request.method)
+        metrics.db_queries.inc(counter.count, route=route)
+        if route.startswith('export_') and response.status_code == 200:
+            export_format = route[len('export_'):]
+            metrics.export_duration.observe(elapsed, format=export_format)
+            if not response.streaming:
+                metrics.export_size.observe(len(response.content), format=export_format)
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Capture statements slower than SLOW_QUERY_THRESHOLD_MS and store them,
+    with their EXPLAIN plan, as SlowQuery rows (see journal.slow_queries).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 500) / 1000
+
+    def __call__(self, request):
+        capture = slow_queries.SlowQueryCapture(self.threshold)
+        with instrument_connections(capture):
+            response = self.get_response(request)
+        if capture.queries:
+            match = request.resolver_match
+            slow_queries.record_all(capture.queries, match.view_name if match else request.path)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request when a staff user asks for it with ``X-Profile: 1|mem``
+    or ``?_profile=1|mem`` (see journal.profiling). Must come after
+    AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = profiling.requested_mode(request)
+        if mode and request.user.is_staff:
+            return profiling.profile_request(self.get_response, request, mode)
+        return self.get_response(request)
+
+
+class TracingMiddleware:
+    """
+    Trace TRACE_SAMPLE_RATE of requests, plus any request whose W3C
+    ``traceparent`` header is marked sampled (see journal.tracing).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'TRACE_SAMPLE_RATE', 0.0)
+
+    def __call__(self, request):
+        parent = tracing.parse_traceparent(request.headers.get('traceparent'))
+        sampled = parent[2] if parent else random.random() < self.sample_rate
+        if not sampled:
+            return self.get_response(request)
+
+        trace_id, parent_span_id = parent[:2] if parent else (None, None)
+        with tracing.start_trace(trace_id, parent_span_id) as trace:
+            with tracing.span(f'{request.method} {request.path}', tracing.SPAN_KIND_SERVER, **{
+                'http.method': request.method,
+                'http.target': request.get_full_path(),
+            }) as root, instrument_connections(tracing.db_span):
+                response = self.get_response(request)
+                match = request.resolver_match
+                if match:
+                    root.name = f'{request.method} {match.route or request.path}'
+                    root.set_attribute('http.route', match.view_name)
+                    root.set_attribute('code.function', match.func.__name__)
+                root.set_attribute('http.status_code', response.status_code)
+                user = getattr(request, 'user', None)
+                if user is not None and user.is_authenticated:
+                    root.set_attribute('enduser.id', user.pk)
+                if response.status_code >= 500:
+                    root.status = tracing.STATUS_ERROR
+        response['X-Trace-Id'] = trace.trace_id
+        return response
+
+
+class _WriteDetector:
+    """execute_wrapper noting whether any statement modified the primary"""
+
+    READ_PREFIXES = ('SELECT', 'WITH', 'EXPLAIN', 'SAVEPOINT', 'RELEASE', 'ROLLBACK')
+
+    def __init__(self):
+        self.wrote = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if (not self.wrote and context['connection'].alias == 'default'
+                and not sql.lstrip().upper().startswith(self.READ_PREFIXES)):
+            self.wrote = True
+        return execute(sql, params, many, context)
+
+
+class ReplicaPinMiddleware:
+    """
+    Read-your-writes for the replica router: once a user's request has
+    written to the primary, serve their reads from the primary for
+    REPLICA_PIN_SECONDS (see journal.routers). Must come after
+    SessionMiddleware and AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not routers.replica_configured():
+            return self.get_response(request)
+
+        detector = _WriteDetector()
+        with routers.pinned_to_primary(routers.session_is_pinned(request.session)), \
+                instrument_connections(detector):
+            response = self.get_response(request)
+        if detector.wrote and request.user.is_authenticated:
+            routers.pin_session(request.session)
+        return response
+
+
+class ShardMiddleware:
+    """
+    Route the signed-in user's journal queries to their shard (see
+    journal.sharding). Installed only when JOURNAL_SHARD_URLS is set; must
+    come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = request.user if request.user.is_authenticated else None
+        with sharding.user_shard(user):
+            return self.get_response(request)
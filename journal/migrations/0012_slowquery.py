@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0011_trade_entry_time_trade_exit_time_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(help_text='SHA-1 of the normalized SQL', max_length=40, unique=True)),
+                ('shape', models.TextField(help_text='SQL with literals replaced by ?')),
+                ('example_sql', models.TextField(help_text='First captured statement (placeholders, no values)')),
+                ('params_shape', models.CharField(blank=True, help_text='Parameter types, e.g. (int, str)', max_length=255)),
+                ('view', models.CharField(blank=True, help_text='View that first ran the query', max_length=100)),
+                ('database', models.CharField(default='default', max_length=50)),
+                ('explain', models.TextField(blank=True, help_text='Query plan captured when the shape was first seen')),
+                ('count', models.PositiveIntegerField(default=1)),
+                ('total_duration', models.FloatField(default=0, help_text='Milliseconds')),
+                ('max_duration', models.FloatField(default=0, help_text='Milliseconds')),
+                ('last_duration', models.FloatField(default=0, help_text='Milliseconds')),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Slow queries',
+                'ordering': ['-max_duration'],
+            },
+        ),
+    ]
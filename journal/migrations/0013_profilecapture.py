@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('journal', '0012_slowquery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileCapture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view', models.CharField(blank=True, max_length=100)),
+                ('path', models.CharField(max_length=500)),
+                ('method', models.CharField(max_length=10)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('duration', models.FloatField(help_text='Milliseconds, including profiler overhead')),
+                ('peak_memory', models.PositiveBigIntegerField(blank=True, help_text='Bytes traced by tracemalloc', null=True)),
+                ('prof_file', models.CharField(help_text='cProfile dump in PROFILE_DIR', max_length=255)),
+                ('summary', models.TextField(help_text='Top functions by cumulative time and top allocation sites')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profile_captures', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0013_profilecapture'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='trade',
+            name='journal_tra_date_2ed0a2_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='trade',
+            name='journal_tra_symbol_53aab0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='trade',
+            name='journal_tra_trade_t_aa9ce4_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='trade',
+            name='journal_tra_setup_t_ebd50e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='trade',
+            name='journal_tra_user_id_4c00ad_idx',
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['user', '-date', '-created_at'], name='trade_user_date_created'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(condition=models.Q(('trade_status', 'CLOSED')), fields=['user', 'date'], name='trade_user_closed_date'),
+        ),
+    ]
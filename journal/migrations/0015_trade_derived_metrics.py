@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0014_trade_index_redesign'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trade',
+            name='holding_minutes',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Minutes from entry to exit', null=True),
+        ),
+        migrations.AddField(
+            model_name='trade',
+            name='outcome',
+            field=models.SmallIntegerField(blank=True, choices=[(1, 'Win'), (0, 'Breakeven'), (-1, 'Loss')], editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='trade',
+            name='r_multiple',
+            field=models.FloatField(blank=True, editable=False, help_text='Realized result in units of initial risk', null=True),
+        ),
+        migrations.AddField(
+            model_name='trade',
+            name='risk_reward',
+            field=models.FloatField(blank=True, editable=False, help_text='Planned reward:risk (target vs stop)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['user', 'outcome'], name='journal_tra_user_id_0ca7a9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['user', 'r_multiple'], name='journal_tra_user_id_ada746_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trade',
+            index=models.Index(fields=['user', 'holding_minutes'], name='journal_tra_user_id_dc769d_idx'),
+        ),
+    ]
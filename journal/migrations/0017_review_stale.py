@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0016_batchrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlyreview',
+            name='stale',
+            field=models.BooleanField(default=False, editable=False, help_text='A trade in this month changed since the metrics were computed'),
+        ),
+        migrations.AddField(
+            model_name='weeklyreview',
+            name='stale',
+            field=models.BooleanField(default=False, editable=False, help_text='A trade in this week changed since the metrics were computed'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlyreview',
+            index=models.Index(condition=models.Q(('stale', True)), fields=['stale'], name='monthlyreview_stale'),
+        ),
+        migrations.AddIndex(
+            model_name='weeklyreview',
+            index=models.Index(condition=models.Q(('stale', True)), fields=['stale'], name='weeklyreview_stale'),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.urls import reverse
 
+from .tracing import traced
+
 
 class Trade(models.Model):
     TRADE_TYPE_CHOICES = [
@@ -64,6 +66,19 @@ class Trade(models.Model):
     profit_loss = models.FloatField(help_text="Actual profit or loss amount")
     percentage_gain_loss = models.FloatField(help_text="Profit or loss in percentage")
     
+    # Derived metrics, kept in sync by save() so they can be filtered, sorted
+    # and aggregated in SQL (existing rows: manage.py backfill_trade_metrics)
+    OUTCOME_CHOICES = [
+        (1, 'Win'),
+        (0, 'Breakeven'),
+        (-1, 'Loss'),
+    ]
+    DERIVED_FIELDS = ('risk_reward', 'r_multiple', 'holding_minutes', 'outcome')
+    risk_reward = models.FloatField(null=True, blank=True, editable=False, help_text="Planned reward:risk (target vs stop)")
+    r_multiple = models.FloatField(null=True, blank=True, editable=False, help_text="Realized result in units of initial risk")
+    holding_minutes = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Minutes from entry to exit")
+    outcome = models.SmallIntegerField(null=True, blank=True, editable=False, choices=OUTCOME_CHOICES)
+    
     # Analysis
     setup_type = models.CharField(max_length=20, choices=SETUP_TYPE_CHOICES, help_text="Type of setup used")
     confidence_level = models.IntegerField(
@@ -113,20 +128,80 @@ class Trade(models.Model):
     
     class Meta:
         ordering = ['-date', '-created_at']
+        # Every query is scoped to one user, so every index leads with user
         indexes = [
-            models.Index(fields=['user', 'date']),  # Most important for dashboard
-            models.Index(fields=['user', 'profit_loss']),  # For win/loss calculations
-            models.Index(fields=['user', 'symbol']),  # For symbol performance
-            models.Index(fields=['user', 'setup_type']),  # For setup analysis
-            models.Index(fields=['date']),
-            models.Index(fields=['symbol']),
-            models.Index(fields=['trade_type']),
-            models.Index(fields=['setup_type']),
+            # Default ordering, date ranges and streak scans
+            models.Index(fields=['user', '-date', '-created_at'], name='trade_user_date_created'),
+            # CLOSED-only analytics (Sharpe, drawdown, heatmap, confidence)
+            models.Index(
+                fields=['user', 'date'], name='trade_user_closed_date',
+                condition=models.Q(trade_status='CLOSED'),
+            ),
+            models.Index(fields=['user', 'profit_loss']),  # Win/loss sign filters
+            models.Index(fields=['user', 'symbol']),  # Symbol performance
+            models.Index(fields=['user', 'setup_type']),  # Setup analysis
+            models.Index(fields=['user', 'outcome']),  # Win/loss counts and filters
+            models.Index(fields=['user', 'r_multiple']),  # R distribution, best/worst by R
+            models.Index(fields=['user', 'holding_minutes']),  # Holding-time buckets
         ]
     
     def __str__(self):
         return f"{self.symbol} - {self.trade_type} - {self.date}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Loaded date and P&L, to tell which periods an edit affects
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values)
+            if name in ('date', 'profit_loss') and value is not models.DEFERRED
+        }
+        return instance
+    
+    def save(self, *args, **kwargs):
+        self.update_derived_metrics()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *self.DERIVED_FIELDS}
+        # Read by post_save receivers (reviews, goals)
+        self.affected_dates = self.get_affected_dates()
+        super().save(*args, **kwargs)
+        self._loaded_values = {'date': self._meta.get_field('date').to_python(self.date), 'profit_loss': self.profit_loss}
+    
+    def get_affected_dates(self):
+        """
+        Dates whose per-period totals saving this trade changes: its date,
+        plus the previous one when an edit moves it; none when neither the
+        date nor the P&L changed (notes, tags, ...)
+        """
+        date = self._meta.get_field('date').to_python(self.date)
+        loaded = getattr(self, '_loaded_values', {})
+        if loaded.get('date') == date and loaded.get('profit_loss') == self.profit_loss:
+            return set()
+        return {date, loaded['date']} if loaded.get('date') else {date}
+    
+    def update_derived_metrics(self):
+        """
+        Recompute the derived columns from prices, times and P&L. save()
+        calls this; call it yourself before bulk_create/bulk_update.
+        """
+        self.risk_reward = self.get_risk_reward_ratio()
+        
+        direction = 1 if self.trade_type == 'LONG' else -1
+        risk = abs(self.entry_price - self.stop_loss) if self.stop_loss and self.entry_price else 0
+        self.r_multiple = round((self.exit_price - self.entry_price) * direction / risk, 2) if risk > 0 else None
+        
+        # Entry and exit share the trade's date: an exit "before" the entry
+        # was held overnight or longer, which cannot be measured here
+        self.holding_minutes = None
+        if self.exit_time:
+            entry = self._meta.get_field('entry_time').to_python(self.entry_time)
+            exit_ = self._meta.get_field('exit_time').to_python(self.exit_time)
+            minutes = (exit_.hour * 60 + exit_.minute) - (entry.hour * 60 + entry.minute)
+            if minutes >= 0:
+                self.holding_minutes = minutes
+        
+        self.outcome = (self.profit_loss > 0) - (self.profit_loss < 0)
+    
     def get_absolute_url(self):
         return reverse('trade_detail', kwargs={'pk': self.pk})
     
@@ -149,6 +224,7 @@ class Trade(models.Model):
         return None
     
     @classmethod
+    @traced()
     def get_current_win_streak(cls, user):
         """Get current winning streak for a user - OPTIMIZED"""
         trades = cls.objects.filter(user=user).order_by('-date', '-created_at')
@@ -162,6 +238,7 @@ class Trade(models.Model):
         return streak
     
     @classmethod
+    @traced()
     def get_current_loss_streak(cls, user):
         """Get current losing streak for a user - OPTIMIZED"""
         trades = cls.objects.filter(user=user).order_by('-date', '-created_at')
@@ -175,6 +252,7 @@ class Trade(models.Model):
         return streak
     
     @classmethod
+    @traced()
     def get_max_win_streak(cls, user):
         """Get maximum winning streak for a user - OPTIMIZED"""
         trades = cls.objects.filter(user=user).order_by('date', 'created_at')
@@ -192,6 +270,7 @@ class Trade(models.Model):
         return max_streak
     
     @classmethod
+    @traced()
     def get_max_loss_streak(cls, user):
         """Get maximum losing streak for a user - OPTIMIZED"""
         trades = cls.objects.filter(user=user).order_by('date', 'created_at')
@@ -209,84 +288,50 @@ class Trade(models.Model):
         return max_streak
     
     @classmethod
+    @traced()
     def get_dashboard_stats(cls, user):
         """Get all dashboard statistics in optimized way"""
-        from django.db.models import Count, Sum, Avg, Q
         from django.utils import timezone
         from datetime import timedelta
+        from . import stats
         
-        user_trades = cls.objects.filter(user=user)
-        
-        # Single query for basic stats
-        basic_stats = user_trades.aggregate(
-            total_trades=Count('id'),
-            winning_trades=Count('id', filter=Q(profit_loss__gt=0)),
-            losing_trades=Count('id', filter=Q(profit_loss__lt=0)),
-            total_pnl=Sum('profit_loss'),
-            avg_profit=Avg('profit_loss', filter=Q(profit_loss__gt=0)),
-            avg_loss=Avg('profit_loss', filter=Q(profit_loss__lt=0))
-        )
+        # One ordered pass over the user's P&L, kept per day: overall, today's
+        # and this week's figures (and the dashboard's months) are merged from it
+        daily = stats.by_day(cls.objects.filter(user=user))
+        overall = stats.merge(daily.values())
         
-        # Today's stats
         today = timezone.now().date()
-        today_stats = user_trades.filter(date=today).aggregate(
-            today_pnl=Sum('profit_loss'),
-            today_trades_count=Count('id')
-        )
-        
-        # This week's stats
+        today_stats = daily.get(today, stats.TradeStats())
         week_start = today - timedelta(days=today.weekday())
-        week_stats = user_trades.filter(date__gte=week_start).aggregate(
-            week_pnl=Sum('profit_loss'),
-            week_trades_count=Count('id'),
-            week_winning_trades=Count('id', filter=Q(profit_loss__gt=0))
-        )
-        
-        # Calculate streaks efficiently
-        trades_ordered = user_trades.order_by('-date', '-created_at')
-        
-        current_win_streak = 0
-        current_loss_streak = 0
-        
-        for trade in trades_ordered:
-            if trade.profit_loss > 0 and current_loss_streak == 0:
-                current_win_streak += 1
-            elif trade.profit_loss < 0 and current_win_streak == 0:
-                current_loss_streak += 1
-            else:
-                break
-        
-        # Calculate max streaks
-        trades_chronological = user_trades.order_by('date', 'created_at')
-        max_win_streak = 0
-        max_loss_streak = 0
-        current_win = 0
-        current_loss = 0
-        
-        for trade in trades_chronological:
-            if trade.profit_loss > 0:
-                current_win += 1
-                current_loss = 0
-                max_win_streak = max(max_win_streak, current_win)
-            elif trade.profit_loss < 0:
-                current_loss += 1
-                current_win = 0
-                max_loss_streak = max(max_loss_streak, current_loss)
-            else:
-                current_win = 0
-                current_loss = 0
+        week_stats = stats.merge(day_stats for day, day_stats in daily.items() if day >= week_start)
         
         return {
-            'basic_stats': basic_stats,
-            'today_stats': today_stats,
-            'week_stats': week_stats,
-            'current_win_streak': current_win_streak,
-            'current_loss_streak': current_loss_streak,
-            'max_win_streak': max_win_streak,
-            'max_loss_streak': max_loss_streak,
+            'daily': daily,
+            'basic_stats': {
+                'total_trades': overall.count,
+                'winning_trades': overall.wins,
+                'losing_trades': overall.losses,
+                'total_pnl': overall.total_pnl,
+                'avg_profit': overall.avg_profit,
+                'avg_loss': overall.avg_loss,
+            },
+            'today_stats': {
+                'today_pnl': today_stats.total_pnl,
+                'today_trades_count': today_stats.count,
+            },
+            'week_stats': {
+                'week_pnl': week_stats.total_pnl,
+                'week_trades_count': week_stats.count,
+                'week_winning_trades': week_stats.wins,
+            },
+            'current_win_streak': overall.current_win_streak,
+            'current_loss_streak': overall.current_loss_streak,
+            'max_win_streak': overall.max_win_streak,
+            'max_loss_streak': overall.max_loss_streak,
         }
     
     @classmethod
+    @traced()
     def get_sharpe_ratio(cls, user, risk_free_rate=0.02):
         """Calculate Sharpe Ratio for risk-adjusted returns"""
         import statistics
@@ -319,6 +364,7 @@ class Trade(models.Model):
         return round(sharpe_ratio, 4)
     
     @classmethod
+    @traced()
     def get_maximum_drawdown(cls, user):
         """Calculate Maximum Drawdown percentage"""
         user_trades = cls.objects.filter(user=user, trade_status='CLOSED').order_by('date')
@@ -353,6 +399,7 @@ class Trade(models.Model):
         return round(max_drawdown, 2)
     
     @classmethod
+    @traced()
     def get_portfolio_heatmap_data(cls, user):
         """Get portfolio heatmap data for symbols and time periods"""
         from django.db.models import Count, Sum, Avg, Q
@@ -407,6 +454,7 @@ class Trade(models.Model):
         return heatmap_data
     
     @classmethod
+    @traced()
     def get_confidence_vs_performance_data(cls, user):
         """Get confidence level vs actual performance analysis"""
         from django.db.models import Count, Sum, Avg, Q
@@ -483,6 +531,7 @@ class WeeklyReview(models.Model):
     winning_trades = models.PositiveIntegerField(default=0)
     losing_trades = models.PositiveIntegerField(default=0)
     total_pnl = models.FloatField(default=0)
+    stale = models.BooleanField(default=False, editable=False, help_text="A trade in this week changed since the metrics were computed")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -490,6 +539,9 @@ class WeeklyReview(models.Model):
     class Meta:
         ordering = ['-week_start_date']
         unique_together = ['user', 'week_start_date']
+        indexes = [
+            models.Index(fields=['stale'], condition=models.Q(stale=True), name='weeklyreview_stale'),
+        ]
     
     def __str__(self):
         return f"Weekly Review - {self.week_start_date} to {self.week_end_date}"
@@ -519,6 +571,7 @@ class MonthlyReview(models.Model):
     losing_trades = models.PositiveIntegerField(default=0)
     total_pnl = models.FloatField(default=0)
     max_drawdown = models.FloatField(default=0)
+    stale = models.BooleanField(default=False, editable=False, help_text="A trade in this month changed since the metrics were computed")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -526,6 +579,9 @@ class MonthlyReview(models.Model):
     class Meta:
         ordering = ['-month']
         unique_together = ['user', 'month']
+        indexes = [
+            models.Index(fields=['stale'], condition=models.Q(stale=True), name='monthlyreview_stale'),
+        ]
     
     def __str__(self):
         return f"Monthly Review - {self.month.strftime('%B %Y')}"
@@ -801,4 +857,80 @@ class RiskManagement(models.Model):
             'trades_today': today_trades.count()
         }
         
-        return status
\ No newline at end of file
+        return status
+
+class SlowQuery(models.Model):
+    """One normalized SQL shape that exceeded SLOW_QUERY_THRESHOLD_MS"""
+    fingerprint = models.CharField(max_length=40, unique=True, help_text="SHA-1 of the normalized SQL")
+    shape = models.TextField(help_text="SQL with literals replaced by ?")
+    example_sql = models.TextField(help_text="First captured statement (placeholders, no values)")
+    params_shape = models.CharField(max_length=255, blank=True, help_text="Parameter types, e.g. (int, str)")
+    view = models.CharField(max_length=100, blank=True, help_text="View that first ran the query")
+    database = models.CharField(max_length=50, default='default')
+    explain = models.TextField(blank=True, help_text="Query plan captured when the shape was first seen")
+
+    count = models.PositiveIntegerField(default=1)
+    total_duration = models.FloatField(default=0, help_text="Milliseconds")
+    max_duration = models.FloatField(default=0, help_text="Milliseconds")
+    last_duration = models.FloatField(default=0, help_text="Milliseconds")
+
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-max_duration']
+        verbose_name_plural = 'Slow queries'
+
+    def __str__(self):
+        return f"{self.shape[:80]} ({self.max_duration:.0f}ms)"
+
+    @property
+    def avg_duration(self):
+        return self.total_duration / self.count if self.count else 0
+
+
+class ProfileCapture(models.Model):
+    """A request profiled on demand by a staff user (see journal.profiling)"""
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='profile_captures')
+    view = models.CharField(max_length=100, blank=True)
+    path = models.CharField(max_length=500)
+    method = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField()
+    duration = models.FloatField(help_text="Milliseconds, including profiler overhead")
+    peak_memory = models.PositiveBigIntegerField(null=True, blank=True, help_text="Bytes traced by tracemalloc")
+    prof_file = models.CharField(max_length=255, help_text="cProfile dump in PROFILE_DIR")
+    summary = models.TextField(help_text="Top functions by cumulative time and top allocation sites")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration:.0f}ms)"
+
+
+class BatchRun(models.Model):
+    """One run of a scheduled batch job, with its checkpoint while unfinished"""
+    job = models.CharField(max_length=100, help_text="Management command name")
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.FloatField(default=0, help_text="Seconds spent running, summed over resumed attempts")
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_changed = models.PositiveIntegerField(default=0)
+    checkpoint = models.JSONField(default=dict, blank=True, help_text="Where an interrupted run resumes")
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['job', '-started_at']),
+        ]
+
+    def __str__(self):
+        state = f"{self.duration:.1f}s" if self.finished_at else "unfinished"
+        return f"{self.job} at {self.started_at:%Y-%m-%d %H:%M} ({state})"
+
+    @classmethod
+    def last_finished(cls):
+        """{(job,): finished_at as a Unix timestamp} of each job's latest completed run"""
+        rows = cls.objects.filter(finished_at__isnull=False).values('job').annotate(last=models.Max('finished_at'))
+        return {(row['job'],): row['last'].timestamp() for row in rows}
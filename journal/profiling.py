@@ -0,0 +1,139 @@
+"""
+On-demand profiling of single requests for staff users.
+
+``ProfilingMiddleware`` runs a request under cProfile when a staff user sends
+``X-Profile: 1`` (or ``?_profile=1``); ``mem`` instead of ``1`` also traces
+allocations with tracemalloc. The raw ``.prof`` file is written to
+PROFILE_DIR and a ``ProfileCapture`` row with a text summary (top functions
+by cumulative time, top allocation sites) is listed in the admin.
+Load the ``.prof`` with ``python -m pstats`` or snakeviz.
+
+cProfile only sees the thread it is enabled on, and async views
+(``dashboard``, ``analytics``) do their queries and stats on the aggregate
+pool (journal.concurrency). While a request is profiled each ``gather`` call
+runs under a profiler of its own and those profiles are merged into the
+capture, so it covers the request thread plus the pool work. Code running
+directly on the event loop between awaits is not included; the views keep
+that to gluing results together.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils import timezone
+
+
+# tracemalloc is process-wide: only one request may trace allocations at a time
+_tracemalloc_lock = threading.Lock()
+
+# Profilers of the aggregate-pool calls made by the request being profiled
+_pool_profilers = ContextVar('journal_pool_profilers', default=None)
+
+
+def requested_mode(request):
+    """'cpu', 'mem' or None, from the X-Profile header or ?_profile= flag"""
+    flag = request.headers.get('X-Profile') or request.GET.get('_profile')
+    if not flag or flag in ('0', 'false'):
+        return None
+    return 'mem' if flag == 'mem' else 'cpu'
+
+
+def run_profiled(call):
+    """``call()``, under a profiler of its own if the current request is being profiled"""
+    profilers = _pool_profilers.get()
+    if profilers is None:
+        return call()
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one active profiler, and the request's
+        # already sees every thread
+        return call()
+    try:
+        return call()
+    finally:
+        profiler.disable()
+        profilers.append(profiler)
+
+
+def _cpu_summary(stats, top):
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats('cumulative').print_stats(top)
+    return out.getvalue()
+
+
+def _memory_summary(snapshot, top):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ])
+    lines = [f'Top {top} allocation sites:']
+    for stat in snapshot.statistics('lineno')[:top]:
+        frame = stat.traceback[0]
+        lines.append(f'{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}')
+    return '\n'.join(lines)
+
+
+def profile_request(get_response, request, mode):
+    """Run ``get_response`` under the profiler(s) and store a ProfileCapture"""
+    from .models import ProfileCapture
+
+    top = getattr(settings, 'PROFILE_TOP_N', 30)
+    trace_memory = mode == 'mem' and _tracemalloc_lock.acquire(blocking=False)
+    profiler = cProfile.Profile()
+    pool_profilers = []
+    token = _pool_profilers.set(pool_profilers)
+    try:
+        if trace_memory:
+            tracemalloc.start(getattr(settings, 'PROFILE_TRACEMALLOC_FRAMES', 1))
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+            duration = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot() if trace_memory else None
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        _pool_profilers.reset(token)
+        if trace_memory:
+            tracemalloc.stop()
+            _tracemalloc_lock.release()
+
+    match = request.resolver_match
+    view = match.view_name if match else ''
+    directory = settings.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    filename = f"{timezone.now():%Y%m%d-%H%M%S}-{view or 'unmatched'}-{request.user.pk}.prof"
+    stats = pstats.Stats(profiler)
+    for pool_profiler in pool_profilers:
+        stats.add(pool_profiler)
+    stats.dump_stats(os.path.join(directory, filename))
+
+    summary = _cpu_summary(stats, top)
+    if snapshot is not None:
+        summary += '\n' + _memory_summary(snapshot, top)
+    elif mode == 'mem':
+        summary += '\nAllocation tracing skipped: another request was being traced.'
+    capture = ProfileCapture.objects.create(
+        user=request.user,
+        view=view,
+        path=request.get_full_path()[:500],
+        method=request.method,
+        status_code=response.status_code,
+        duration=duration * 1000,
+        peak_memory=peak,
+        prof_file=filename,
+        summary=summary,
+    )
+    response['X-Profile-Id'] = str(capture.pk)
+    return response
@@ -0,0 +1,5 @@
+"""
+Export builders with heavy third-party dependencies (reportlab, openpyxl).
+The export views import these modules inside the view, so the libraries
+are only loaded by a worker that actually builds an export.
+"""
@@ -0,0 +1,151 @@
+"""
+Excel trade export (openpyxl). Imported on first use by
+``export_trades_excel`` so workers that never export do not load openpyxl.
+"""
+import openpyxl
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+from django.utils import timezone
+
+
+def build_trades_workbook(user, user_trades, summary):
+    """
+    Workbook with the summary block and every trade in ``user_trades``.
+    ``summary`` holds the totals the view already computed.
+    """
+    total_trades = summary['total_trades']
+    winning_trades = summary['winning_trades']
+    losing_trades = summary['losing_trades']
+    total_pnl = summary['total_pnl']
+    win_rate = summary['win_rate']
+    
+    # Create workbook
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Trading Journal"
+    
+    # Title and header
+    ws.merge_cells('A1:K1')
+    title_cell = ws.cell(row=1, column=1, value="📊 TRADING JOURNAL REPORT")
+    title_cell.font = Font(bold=True, size=20, color="FFFFFF")
+    title_cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    title_cell.alignment = Alignment(horizontal="center", vertical="center")
+    
+    # User info
+    ws.merge_cells('A2:K2')
+    user_cell = ws.cell(row=2, column=1, value=f"👤 Trader: {user.username} | 📅 Generated: {timezone.now().strftime('%B %d, %Y at %I:%M %p')}")
+    user_cell.font = Font(bold=True, size=12, color="366092")
+    user_cell.alignment = Alignment(horizontal="center")
+    
+    # Summary section
+    ws.merge_cells('A4:K4')
+    summary_title = ws.cell(row=4, column=1, value="🎯 PERFORMANCE SUMMARY")
+    summary_title.font = Font(bold=True, size=14, color="FFFFFF")
+    summary_title.fill = PatternFill(start_color="228B22", end_color="228B22", fill_type="solid")
+    summary_title.alignment = Alignment(horizontal="center")
+    
+    # Summary data
+    summary_data = [
+        ['📈 Total Trades', total_trades, '📊 Win Rate', f'{win_rate:.1f}%'],
+        ['🏆 Winning Trades', winning_trades, '💔 Losing Trades', losing_trades],
+        ['💰 Total P&L', f'₹{total_pnl:.2f}', '📊 Avg P&L', f'₹{total_pnl/total_trades:.2f}' if total_trades > 0 else '₹0.00']
+    ]
+    
+    for row_idx, row_data in enumerate(summary_data, 5):
+        for col_idx, value in enumerate(row_data, 1):
+            cell = ws.cell(row=row_idx, column=col_idx, value=value)
+            if col_idx % 2 == 1:  # Label columns
+                cell.font = Font(bold=True, color="366092")
+                cell.fill = PatternFill(start_color="E6F3FF", end_color="E6F3FF", fill_type="solid")
+            else:  # Value columns
+                cell.font = Font(bold=True, color="000000")
+                cell.fill = PatternFill(start_color="F0F8FF", end_color="F0F8FF", fill_type="solid")
+            cell.alignment = Alignment(horizontal="center")
+            cell.border = Border(left=Side(style='thin'), right=Side(style='thin'), 
+                               top=Side(style='thin'), bottom=Side(style='thin'))
+    
+    # Trades section header
+    trades_start_row = 9
+    ws.merge_cells(f'A{trades_start_row}:K{trades_start_row}')
+    trades_title = ws.cell(row=trades_start_row, column=1, value="📋 DETAILED TRADE HISTORY")
+    trades_title.font = Font(bold=True, size=14, color="FFFFFF")
+    trades_title.fill = PatternFill(start_color="8B0000", end_color="8B0000", fill_type="solid")
+    trades_title.alignment = Alignment(horizontal="center")
+    
+    # Headers
+    headers = ['📅 Date', '🏷️ Symbol', '📊 Type', '⬆️ Entry', '⬇️ Exit', '📊 Qty', '💰 P&L', '📈 %', '🎯 Setup', '⭐ Conf', '📝 Exit Reason']
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=trades_start_row+1, column=col, value=header)
+        cell.font = Font(bold=True, color="FFFFFF", size=11)
+        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.border = Border(left=Side(style='thin'), right=Side(style='thin'), 
+                           top=Side(style='thin'), bottom=Side(style='thin'))
+    
+    # Data with enhanced styling
+    for row, trade in enumerate(user_trades, trades_start_row+2):
+        ws.cell(row=row, column=1, value=trade.date.strftime('%d/%m/%Y'))
+        ws.cell(row=row, column=2, value=trade.symbol)
+        ws.cell(row=row, column=3, value=trade.trade_type)
+        ws.cell(row=row, column=4, value=trade.entry_price)
+        ws.cell(row=row, column=5, value=trade.exit_price)
+        ws.cell(row=row, column=6, value=trade.quantity)
+        ws.cell(row=row, column=7, value=trade.profit_loss)
+        ws.cell(row=row, column=8, value=f"{trade.percentage_gain_loss:.2f}%")
+        ws.cell(row=row, column=9, value=trade.setup_type.title())
+        ws.cell(row=row, column=10, value=f"{trade.confidence_level}/10")
+        ws.cell(row=row, column=11, value=trade.exit_reason)
+        
+        # Apply styling to each cell
+        for col in range(1, 12):
+            cell = ws.cell(row=row, column=col)
+            cell.border = Border(left=Side(style='thin'), right=Side(style='thin'), 
+                               top=Side(style='thin'), bottom=Side(style='thin'))
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            
+            # Color code based on content
+            if col == 3:  # Trade type column
+                if trade.trade_type == 'LONG':
+                    cell.fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
+                else:
+                    cell.fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
+            elif col == 7:  # P&L column
+                if trade.profit_loss > 0:
+                    cell.fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
+                    cell.font = Font(bold=True, color="006400")
+                elif trade.profit_loss < 0:
+                    cell.fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
+                    cell.font = Font(bold=True, color="8B0000")
+            elif col == 10:  # Confidence column
+                if trade.confidence_level >= 8:
+                    cell.fill = PatternFill(start_color="98FB98", end_color="98FB98", fill_type="solid")
+                elif trade.confidence_level >= 6:
+                    cell.fill = PatternFill(start_color="FFFF99", end_color="FFFF99", fill_type="solid")
+                else:
+                    cell.fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
+    
+    # Auto-adjust column widths
+    for column in ws.columns:
+        max_length = 0
+        column_letter = get_column_letter(column[0].column)
+        for cell in column:
+            try:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            except:
+                pass
+        adjusted_width = min(max_length + 3, 50)
+        ws.column_dimensions[column_letter].width = adjusted_width
+    
+    # Add summary formulas
+    if user_trades.exists():
+        last_row = trades_start_row + 1 + user_trades.count()
+        
+        # Add totals row
+        ws.cell(row=last_row+2, column=6, value="TOTAL P&L:").font = Font(bold=True, size=12)
+        ws.cell(row=last_row+2, column=7, value=f"₹{total_pnl:.2f}").font = Font(bold=True, size=12, color="006400" if total_pnl > 0 else "8B0000")
+        
+        ws.cell(row=last_row+3, column=6, value="WIN RATE:").font = Font(bold=True, size=12)
+        ws.cell(row=last_row+3, column=7, value=f"{win_rate:.1f}%").font = Font(bold=True, size=12)
+    
+    return wb
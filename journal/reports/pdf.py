@@ -0,0 +1,348 @@
+"""
+PDF trading report (reportlab). Imported on first use by ``export_trades_pdf``
+so workers that never build a PDF do not load reportlab.
+"""
+import io
+
+from django.db.models import Avg, Count, DateField, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from datetime import timedelta
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+
+from ..instrumentation import timed
+
+
+def build_trades_pdf(user, user_trades, summary):
+    """
+    Render the report for ``user_trades`` (newest first) and return the PDF
+    bytes. ``summary`` holds the totals the view already computed.
+    """
+    total_trades = summary['total_trades']
+    winning_trades = summary['winning_trades']
+    losing_trades = summary['losing_trades']
+    total_pnl = summary['total_pnl']
+    win_rate = summary['win_rate']
+    avg_profit = summary['avg_profit']
+    avg_loss = summary['avg_loss']
+    
+    # Create PDF with custom page size
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, 
+                           rightMargin=50, leftMargin=50, 
+                           topMargin=80, bottomMargin=50)
+    styles = getSampleStyleSheet()
+    story = []
+    
+    # Advanced custom styles
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=32,
+        spaceAfter=25,
+        alignment=1,
+        textColor=colors.HexColor('#1E40AF'),
+        fontName='Helvetica-Bold',
+        borderWidth=2,
+        borderColor=colors.HexColor('#3B82F6'),
+        borderPadding=10,
+        backColor=colors.HexColor('#EFF6FF')
+    )
+    
+    subtitle_style = ParagraphStyle(
+        'Subtitle',
+        parent=styles['Heading2'],
+        fontSize=18,
+        spaceAfter=12,
+        alignment=1,
+        textColor=colors.HexColor('#059669'),
+        fontName='Helvetica-Bold',
+        backColor=colors.HexColor('#ECFDF5'),
+        borderWidth=1,
+        borderColor=colors.HexColor('#10B981'),
+        borderPadding=8
+    )
+    
+    # Create professional header with gradient effect
+    header_data = [
+        ['📊 TRADING JOURNAL REPORT'],
+        [f'👤 Trader: {user.username}'],
+        [f'📅 Generated: {timezone.now().strftime("%B %d, %Y at %I:%M %p")}'],
+        [f'📈 Total Trades: {total_trades} | 💰 Total P&L: ₹{total_pnl:.2f}']
+    ]
+    
+    header_table = Table(header_data, colWidths=[500])
+    header_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E40AF')),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#EFF6FF')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#1E40AF')),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, 0), 24),
+        ('FONTSIZE', (0, 1), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 20),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#3B82F6')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+    
+    story.append(header_table)
+    story.append(Spacer(1, 30))
+    
+    # Performance Overview with enhanced styling
+    story.append(Paragraph("🎯 PERFORMANCE OVERVIEW", subtitle_style))
+    story.append(Spacer(1, 20))
+    
+    # Enhanced metrics with better visual design
+    metrics_data = [
+        ['📈 TOTAL TRADES', f'{total_trades}', '📊 WIN RATE', f'{win_rate:.1f}%'],
+        ['🏆 WINNING TRADES', f'{winning_trades}', '💔 LOSING TRADES', f'{losing_trades}'],
+        ['💰 TOTAL P&L', f'₹{total_pnl:.2f}', '📊 AVG PROFIT', f'₹{avg_profit:.2f}'],
+        ['📉 AVG LOSS', f'₹{avg_loss:.2f}', '⚖️ RISK/REWARD', f'{abs(avg_profit/avg_loss):.2f}:1' if avg_loss != 0 else 'N/A']
+    ]
+    
+    metrics_table = Table(metrics_data, colWidths=[140, 100, 140, 100])
+    metrics_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#3B82F6')),
+        ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#EFF6FF')),
+        ('BACKGROUND', (2, 0), (2, -1), colors.HexColor('#10B981')),
+        ('BACKGROUND', (3, 0), (3, -1), colors.HexColor('#ECFDF5')),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.white),
+        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1E40AF')),
+        ('TEXTCOLOR', (2, 0), (2, -1), colors.white),
+        ('TEXTCOLOR', (3, 0), (3, -1), colors.HexColor('#059669')),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('GRID', (0, 0), (-1, -1), 2, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#F8FAFC')]),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+        ('TOPPADDING', (0, 0), (-1, -1), 15),
+    ]))
+    
+    story.append(metrics_table)
+    story.append(Spacer(1, 30))
+    
+    # Performance Analysis with enhanced insights
+    if total_trades > 0:
+        story.append(Paragraph("📊 PERFORMANCE ANALYSIS", subtitle_style))
+        story.append(Spacer(1, 20))
+        
+        # Enhanced insights with better formatting
+        insights_data = []
+        
+        # Win rate analysis
+        if win_rate >= 70:
+            insights_data.append(['🎉 EXCELLENT PERFORMANCE', f'Win Rate: {win_rate:.1f}% - You are trading like a professional!'])
+        elif win_rate >= 50:
+            insights_data.append(['👍 GOOD PERFORMANCE', f'Win Rate: {win_rate:.1f}% - Keep up the consistent performance!'])
+        else:
+            insights_data.append(['💪 IMPROVEMENT OPPORTUNITY', f'Win Rate: {win_rate:.1f}% - Focus on better setups and risk management!'])
+        
+        # P&L analysis
+        if total_pnl > 0:
+            insights_data.append(['💰 PROFITABLE TRADER', f'Total P&L: ₹{total_pnl:.2f} - Your strategy is working excellently!'])
+        else:
+            insights_data.append(['📈 LEARNING PHASE', f'Total P&L: ₹{total_pnl:.2f} - Every loss is a valuable lesson!'])
+        
+        # Risk management analysis
+        if avg_profit > abs(avg_loss) and avg_loss != 0:
+            insights_data.append(['⚖️ EXCELLENT RISK MANAGEMENT', f'Risk/Reward: {abs(avg_profit/avg_loss):.2f}:1 - Your wins are bigger than losses!'])
+        else:
+            insights_data.append(['🎯 RISK MANAGEMENT FOCUS', 'Work on cutting losses quickly and letting profits run!'])
+        
+        # Confidence analysis
+        avg_confidence = user_trades.aggregate(avg=Avg('confidence_level'))['avg'] or 0
+        if avg_confidence >= 8:
+            insights_data.append(['⭐ HIGH CONFIDENCE TRADER', f'Average Confidence: {avg_confidence:.1f}/10 - You trust your analysis!'])
+        elif avg_confidence >= 6:
+            insights_data.append(['📊 MODERATE CONFIDENCE', f'Average Confidence: {avg_confidence:.1f}/10 - Good balance of caution and confidence!'])
+        else:
+            insights_data.append(['🤔 LOW CONFIDENCE', f'Average Confidence: {avg_confidence:.1f}/10 - Work on building confidence through better analysis!'])
+        
+        insights_table = Table(insights_data, colWidths=[200, 300])
+        insights_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#F59E0B')),
+            ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#FEF3C7')),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.white),
+            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#92400E')),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#F59E0B')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+        ]))
+        
+        story.append(insights_table)
+        story.append(Spacer(1, 30))
+    
+    # Page break for detailed trades
+    story.append(PageBreak())
+    
+    # Detailed Trades Section with enhanced styling
+    if total_trades > 0:
+        story.append(Paragraph("📋 DETAILED TRADE HISTORY", subtitle_style))
+        story.append(Spacer(1, 20))
+        
+        trades_data = [['📅 DATE', '🏷️ SYMBOL', '📊 TYPE', '⬆️ ENTRY', '⬇️ EXIT', '💰 P&L', '🎯 SETUP', '⭐ CONF']]
+        
+        for trade in user_trades[:25]:  # Show last 25 trades
+            trades_data.append([
+                trade.date.strftime('%d/%m/%Y'),
+                trade.symbol,
+                trade.trade_type,
+                f"₹{trade.entry_price:.2f}",
+                f"₹{trade.exit_price:.2f}",
+                f"₹{trade.profit_loss:.2f}",
+                trade.setup_type.title(),
+                f"{trade.confidence_level}/10"
+            ])
+        
+        trades_table = Table(trades_data, colWidths=[70, 60, 50, 70, 70, 80, 80, 50])
+        trades_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E40AF')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#3B82F6')),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8FAFC')]),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
+            ('TOPPADDING', (0, 1), (-1, -1), 10),
+        ]))
+        
+        story.append(trades_table)
+        story.append(Spacer(1, 30))
+    
+    # Setup Performance Analysis with enhanced design
+    if total_trades > 0:
+        story.append(Paragraph("🎯 SETUP PERFORMANCE ANALYSIS", subtitle_style))
+        story.append(Spacer(1, 20))
+        
+        setup_stats = user_trades.values('setup_type').annotate(
+            count=Count('id'),
+            wins=Count('id', filter=Q(profit_loss__gt=0)),
+            total_pnl=Sum('profit_loss'),
+            avg_pnl=Avg('profit_loss')
+        ).order_by('-total_pnl')[:8]
+        
+        if setup_stats:
+            setup_data = [['🎯 SETUP TYPE', '📊 TRADES', '💰 TOTAL P&L', '📈 AVG P&L', '📊 SUCCESS RATE']]
+            
+            for setup in setup_stats:
+                setup_success_rate = (setup['wins'] / setup['count'] * 100) if setup['count'] > 0 else 0
+                
+                setup_data.append([
+                    setup['setup_type'].title(),
+                    str(setup['count']),
+                    f"₹{setup['total_pnl']:.2f}",
+                    f"₹{setup['avg_pnl']:.2f}",
+                    f"{setup_success_rate:.1f}%"
+                ])
+            
+            setup_table = Table(setup_data, colWidths=[100, 60, 90, 90, 80])
+            setup_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#059669')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#10B981')),
+                ('FONTSIZE', (0, 1), (-1, -1), 9),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F0FDF4')]),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('BOTTOMPADDING', (0, 1), (-1, -1), 12),
+                ('TOPPADDING', (0, 1), (-1, -1), 12),
+            ]))
+            
+            story.append(setup_table)
+            story.append(Spacer(1, 30))
+    
+    # Monthly Performance Summary
+    if total_trades > 0:
+        story.append(Paragraph("📅 MONTHLY PERFORMANCE", subtitle_style))
+        story.append(Spacer(1, 20))
+        
+        # Calculate monthly performance: one grouped query over the last 6 months
+        monthly_data = []
+        current_month = timezone.now().date().replace(day=1)
+        first_month = current_month
+        for _ in range(5):
+            first_month = (first_month - timedelta(days=1)).replace(day=1)
+        month_stats = user_trades.filter(date__gte=first_month).annotate(
+            month=TruncMonth('date', output_field=DateField())
+        ).values('month').annotate(
+            count=Count('id'),
+            wins=Count('id', filter=Q(profit_loss__gt=0)),
+            total_pnl=Sum('profit_loss'),
+        ).order_by('-month')
+        
+        for month in month_stats:
+            monthly_data.append([
+                month['month'].strftime('%B %Y'),
+                str(month['count']),
+                f"₹{month['total_pnl']:.2f}",
+                f"{(month['wins'] / month['count'] * 100):.1f}%"
+            ])
+        
+        if monthly_data:
+            monthly_data.insert(0, ['📅 MONTH', '📊 TRADES', '💰 P&L', '📈 WIN RATE'])
+            
+            monthly_table = Table(monthly_data, colWidths=[120, 80, 100, 80])
+            monthly_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7C3AED')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#8B5CF6')),
+                ('FONTSIZE', (0, 1), (-1, -1), 9),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FAF5FF')]),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('BOTTOMPADDING', (0, 1), (-1, -1), 12),
+                ('TOPPADDING', (0, 1), (-1, -1), 12),
+            ]))
+            
+            story.append(monthly_table)
+            story.append(Spacer(1, 30))
+    
+    # Professional Footer
+    footer_style = ParagraphStyle(
+        'Footer',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceBefore=30,
+        alignment=1,
+        textColor=colors.HexColor('#6B7280'),
+        fontName='Helvetica-Oblique',
+        backColor=colors.HexColor('#F9FAFB'),
+        borderWidth=1,
+        borderColor=colors.HexColor('#E5E7EB'),
+        borderPadding=15
+    )
+    
+    story.append(Paragraph("📊 Generated by Trading Journal - Your Professional Trading Companion", footer_style))
+    story.append(Paragraph(f"🕒 Report generated on {timezone.now().strftime('%B %d, %Y at %I:%M %p')}", footer_style))
+    story.append(Paragraph("💡 Keep trading, keep learning, keep growing!", footer_style))
+    
+    with timed('pdf'):
+        doc.build(story)
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
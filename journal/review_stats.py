@@ -0,0 +1,143 @@
+"""
+Trade statistics stored on weekly and monthly reviews.
+
+``refresh(reviews)`` recomputes the counts, P&L and (monthly) max drawdown
+of any number of reviews of one model, for any mix of users, from their
+trades: one ordered scan of the trades joined to the review periods they
+fall in, accumulated per review with ``stats.TradeStats``. Only reviews whose
+numbers changed are written, with a single bulk_update, so refreshing is
+idempotent and cheap when nothing moved.
+
+Trade writes mark just the reviews whose period contains the trade's date
+(old and new date on an edit) as stale, in the same transaction. The review
+pages refresh stale rows before showing them, and ``recompute_reviews
+--stale`` sweeps the rest.
+"""
+from datetime import timedelta
+
+from django.db.models import DateField, ExpressionWrapper, F, Q
+from django.db.models.functions import ExtractMonth, ExtractYear, TruncMonth
+
+from . import sharding, stats
+from .models import MonthlyReview, Trade, WeeklyReview
+
+
+STAT_FIELDS = {
+    WeeklyReview: ('total_trades', 'winning_trades', 'losing_trades', 'total_pnl'),
+    MonthlyReview: ('total_trades', 'winning_trades', 'losing_trades', 'total_pnl', 'max_drawdown'),
+}
+
+
+def _period_trades(model, pks, using):
+    """(review relation, trades inside each review's period), one row per pair"""
+    trades = Trade.objects.using(using) if using else Trade.objects
+    if model is WeeklyReview:
+        review = 'user__weekly_reviews'
+        return review, trades.filter(**{
+            f'{review}__in': pks,
+            'date__gte': F(f'{review}__week_start_date'),
+            'date__lte': F(f'{review}__week_end_date'),
+        })
+    # Reviews are meant to store the first of the month, but older rows may
+    # not. Bound the dates from the month's first day so the (user, date)
+    # index does the work, then match the month exactly within that window
+    review = 'user__monthly_reviews'
+    month_start = TruncMonth(f'{review}__month', output_field=DateField())
+    return review, trades.filter(**{
+        f'{review}__in': pks,
+        'date__gte': month_start,
+        'date__lt': ExpressionWrapper(month_start + timedelta(days=31), output_field=DateField()),
+        'date__year': ExtractYear(f'{review}__month'),
+        'date__month': ExtractMonth(f'{review}__month'),
+    })
+
+
+def compute(model, pks, using=None):
+    """{review pk: {stat field: value}} for the given review pks"""
+    review, trades = _period_trades(model, pks, using)
+    rows = trades.values_list(review, 'profit_loss').order_by(f'{review}__id', 'date', 'created_at')
+    per_review = stats.by_key(rows.iterator(chunk_size=2000))
+    computed = {}
+    for pk in pks:
+        summary = per_review.get(pk, stats.TradeStats())
+        values = {
+            'total_trades': summary.count,
+            'winning_trades': summary.wins,
+            'losing_trades': summary.losses,
+            'total_pnl': round(summary.total_pnl, 2),
+            'max_drawdown': round(summary.max_drawdown, 2),
+        }
+        computed[pk] = {field: values[field] for field in STAT_FIELDS[model]}
+    return computed
+
+
+def refresh(reviews, using=None):
+    """
+    Recompute the stored statistics of ``reviews`` (saved instances of one
+    model) and write those that changed. Returns the number written.
+    """
+    if not reviews:
+        return 0
+    model = type(reviews[0])
+    manager = model.objects.using(using) if using else model.objects
+    fields = STAT_FIELDS[model]
+    # Clear the flags before computing: a trade write that lands meanwhile
+    # marks the review again instead of being lost
+    stale_pks = [review.pk for review in reviews if review.stale]
+    if stale_pks:
+        manager.filter(pk__in=stale_pks, stale=True).update(stale=False)
+        for review in reviews:
+            review.stale = False
+    computed = compute(model, [review.pk for review in reviews], using=using)
+    changed = []
+    for review in reviews:
+        values = computed[review.pk]
+        if any(getattr(review, field) != values[field] for field in fields):
+            for field in fields:
+                setattr(review, field, values[field])
+            changed.append(review)
+    if changed:
+        manager.bulk_update(changed, fields)
+    return len(changed)
+
+
+def refresh_stale(reviews, using=None):
+    """
+    Refresh the stale ones among ``reviews`` (e.g. a page about to be
+    shown) in place; no queries when none are stale
+    """
+    reviews = list(reviews)
+    stale = [review for review in reviews if review.stale]
+    if stale:
+        refresh(stale, using=using)
+    return reviews
+
+
+def mark_stale(user_id, dates, using=None):
+    """Flag the user's reviews whose period contains any of ``dates``"""
+    in_week, in_month = Q(), Q()
+    for day in dates:
+        in_week |= Q(week_start_date__lte=day, week_end_date__gte=day)
+        in_month |= Q(month__year=day.year, month__month=day.month)
+    for model, in_period in ((WeeklyReview, in_week), (MonthlyReview, in_month)):
+        manager = model.objects.using(using) if using else model.objects
+        manager.filter(in_period, user_id=user_id, stale=False).update(stale=True)
+
+
+def stale_backlog():
+    """{(period,): reviews waiting for a refresh}, summed over shards"""
+    backlog = {}
+    for alias in sharding.shard_aliases():
+        for model, period in ((WeeklyReview, 'weekly'), (MonthlyReview, 'monthly')):
+            backlog[(period,)] = backlog.get((period,), 0) + model.objects.using(alias).filter(stale=True).count()
+    return backlog
+
+
+# Signal receivers, connected in JournalConfig.ready()
+def trade_saved(sender, instance, raw=False, using=None, **kwargs):
+    if not raw and instance.affected_dates:
+        mark_stale(instance.user_id, instance.affected_dates, using=using)
+
+
+def trade_deleted(sender, instance, using, **kwargs):
+    mark_stale(instance.user_id, {Trade._meta.get_field('date').to_python(instance.date)}, using=using)
@@ -0,0 +1,96 @@
+"""
+Read-replica routing for analytics and exports.
+
+Views decorated with ``@use_replica`` read from the ``replica`` database
+alias when one is configured (REPLICA_DATABASE_URL). Everything else, and
+every write, goes to ``default``. After a user's own write request
+``ReplicaPinMiddleware`` pins them to the primary for REPLICA_PIN_SECONDS, so
+they never see a report that is missing the trade they just saved while the
+replica catches up.
+"""
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+REPLICA_ALIAS = 'replica'
+PIN_SESSION_KEY = '_replica_pinned_until'
+
+_read_from_replica = ContextVar('journal_read_from_replica', default=False)
+_pinned_to_primary = ContextVar('journal_pinned_to_primary', default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def replica_reads():
+    """Route reads inside the block to the replica (unless pinned or unconfigured)"""
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def use_replica(view):
+    """View decorator: the view only reads, so it may be served from the replica"""
+    if asyncio.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def pinned_to_primary(pinned=True):
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def pin_session(session):
+    """Keep this session on the primary for REPLICA_PIN_SECONDS (read-your-writes)"""
+    session[PIN_SESSION_KEY] = time.time() + getattr(settings, 'REPLICA_PIN_SECONDS', 15)
+
+
+def session_is_pinned(session):
+    return session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and not _pinned_to_primary.get() and replica_configured():
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The primary and its replica hold the same data; other databases
+        # (shards) are left to their own routers
+        aliases = {'default', REPLICA_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary through replication
+        if db == REPLICA_ALIAS:
+            return False
+        return None
@@ -0,0 +1,159 @@
+"""
+Synthetic journal data.
+
+Generates trades, psychology and market-condition rows with roughly realistic
+distributions so analytics and exports can be exercised and benchmarked on
+data volumes we do not have locally.
+"""
+import random
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+
+from . import sharding
+from .models import Trade, TradingPsychology, MarketCondition
+
+
+SYMBOLS = [
+    # (symbol, base price, relative weight)
+    ('NIFTY', 22000, 20), ('BANKNIFTY', 48000, 15), ('RELIANCE', 2900, 10),
+    ('TCS', 3900, 8), ('INFY', 1500, 8), ('HDFCBANK', 1600, 8),
+    ('ICICIBANK', 1100, 6), ('SBIN', 800, 6), ('TATAMOTORS', 950, 5),
+    ('ADANIENT', 3100, 4), ('EURUSD', 1.08, 5), ('BTCUSD', 65000, 5),
+]
+
+SETUPS = [choice for choice, _ in Trade.SETUP_TYPE_CHOICES]
+EMOTIONS = [choice for choice, _ in TradingPsychology.EMOTION_CHOICES]
+CONDITIONS = [choice for choice, _ in MarketCondition.CONDITION_CHOICES]
+
+
+def _trading_days(rng, start, days):
+    """Weekdays in [start, start + days), with the odd holiday skipped"""
+    return [
+        start + timedelta(days=offset)
+        for offset in range(days)
+        if (start + timedelta(days=offset)).weekday() < 5 and rng.random() > 0.03
+    ]
+
+
+def build_trades(user, count, rng, start=None, days=None):
+    """Build (unsaved) Trade instances for ``user``"""
+    days = days or max(30, count // 3)
+    start = start or date.today() - timedelta(days=days)
+    trading_days = _trading_days(rng, start, days) or [start]
+    symbols, _, weights = zip(*SYMBOLS)
+    prices = {symbol: base for symbol, base, _ in SYMBOLS}
+    trades = []
+
+    for _ in range(count):
+        symbol = rng.choices(symbols, weights=weights)[0]
+        trade_type = 'LONG' if rng.random() < 0.6 else 'SHORT'
+        confidence = max(1, min(10, int(rng.gauss(6, 2))))
+        entry_price = round(prices[symbol] * rng.uniform(0.97, 1.03), 2)
+        risk = entry_price * rng.uniform(0.003, 0.015)
+        direction = 1 if trade_type == 'LONG' else -1
+        stop_loss = round(entry_price - direction * risk, 2)
+        target_price = round(entry_price + direction * risk * rng.choice([1, 1.5, 2, 3]), 2)
+
+        # Slight edge for high-confidence trades; winners run further than losers
+        win = rng.random() < 0.42 + confidence * 0.015
+        move = risk * (rng.uniform(0.5, 3.0) if win else -rng.uniform(0.2, 1.1))
+        exit_price = round(max(entry_price + direction * move, 0.01), 2)
+        quantity = rng.choice([1, 5, 10, 25, 50, 75, 100])
+        profit_loss = round((exit_price - entry_price) * direction * quantity, 2)
+
+        entry_minutes = rng.randint(9 * 60 + 15, 15 * 60)
+        exit_minutes = min(entry_minutes + int(rng.expovariate(1 / 45)) + 1, 15 * 60 + 29)
+        status = rng.choices(['CLOSED', 'OPEN', 'CANCELLED'], weights=[90, 7, 3])[0]
+
+        trades.append(Trade(
+            user=user,
+            date=rng.choice(trading_days),
+            symbol=symbol,
+            trade_type=trade_type,
+            trade_status=status,
+            entry_time=time(entry_minutes // 60, entry_minutes % 60),
+            exit_time=time(exit_minutes // 60, exit_minutes % 60) if status == 'CLOSED' else None,
+            entry_price=entry_price,
+            exit_price=exit_price,
+            quantity=quantity,
+            stop_loss=max(stop_loss, 0),
+            target_price=max(target_price, 0),
+            risk_per_trade=round(rng.uniform(0.5, 2.5), 1),
+            exit_reason=rng.choice(['Target hit', 'Stop loss hit', 'Trailing stop', 'Time exit', 'Manual exit']),
+            profit_loss=profit_loss,
+            percentage_gain_loss=round((exit_price - entry_price) * direction / entry_price * 100, 2),
+            setup_type=rng.choice(SETUPS),
+            confidence_level=confidence,
+            emotion_notes=rng.choice(['', 'Felt calm', 'Chased the move', 'Hesitated on entry']),
+            learning_notes=rng.choice(['', 'Respect the stop', 'Wait for confirmation']),
+        ))
+        trades[-1].update_derived_metrics()  # bulk_create bypasses save()
+    return trades
+
+
+def build_daily_context(user, rng, days):
+    """Build one TradingPsychology and one MarketCondition row per day in ``days``"""
+    psychology, conditions = [], []
+    for day in days:
+        stress = rng.randint(1, 10)
+        psychology.append(TradingPsychology(
+            user=user,
+            date=day,
+            pre_trade_emotion=rng.choice(EMOTIONS),
+            pre_trade_confidence=rng.randint(1, 10),
+            pre_trade_stress_level=stress,
+            post_trade_emotion=rng.choice(EMOTIONS),
+            post_trade_confidence=rng.randint(1, 10),
+            post_trade_satisfaction=rng.randint(1, 10),
+            sleep_quality=rng.randint(3, 10),
+            stress_level=stress,
+            focus_level=rng.randint(1, 10),
+        ))
+        conditions.append(MarketCondition(
+            user=user,
+            date=day,
+            market_condition=rng.choice(CONDITIONS),
+            volatility_level=rng.randint(1, 10),
+            sentiment=rng.choice(EMOTIONS),
+            market_index='NIFTY',
+            index_value=round(rng.uniform(21000, 23000), 2),
+        ))
+    return psychology, conditions
+
+
+def seed_user(user, trades, rng=None, context_ratio=0.6, batch_size=1000):
+    """Insert ``trades`` synthetic trades plus daily context rows for ``user``"""
+    rng = rng or random.Random()
+    if sharding.sharding_enabled():
+        # bulk_create sends no pre_save, so anchor the user on their shard here
+        sharding.ensure_user(sharding.shard_for_user(user), user.pk)
+    with sharding.user_shard(user):
+        rows = build_trades(user, trades, rng)
+        Trade.objects.bulk_create(rows, batch_size=batch_size)
+
+        taken = set(
+            TradingPsychology.objects.filter(user=user).values_list('date', flat=True)
+        ) | set(
+            MarketCondition.objects.filter(user=user).values_list('date', flat=True)
+        )
+        trade_days = sorted({trade.date for trade in rows} - taken)
+        context_days = [day for day in trade_days if rng.random() < context_ratio]
+        psychology, conditions = build_daily_context(user, rng, context_days)
+        TradingPsychology.objects.bulk_create(psychology, batch_size=batch_size)
+        MarketCondition.objects.bulk_create(conditions, batch_size=batch_size)
+    return len(rows)
+
+
+def seed(users, trades_per_user, prefix='trader', password='trader123', seed_value=None):
+    """Create ``users`` users with ``trades_per_user`` trades each; returns the users"""
+    rng = random.Random(seed_value)
+    created = []
+    for i in range(users):
+        user, new = User.objects.get_or_create(username=f'{prefix}{i + 1}')
+        if new:
+            user.set_password(password)
+            user.save()
+        seed_user(user, trades_per_user, rng)
+        created.append(user)
+    return created
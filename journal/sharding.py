@@ -0,0 +1,172 @@
+"""
+Optional user-hash sharding of journal data.
+
+With JOURNAL_SHARD_URLS set, each user's journal rows (trades, reviews,
+psychology, goals, market conditions, habits, risk settings) live on one of
+the shard aliases ``default``, ``shard_1`` ... ``shard_N``, chosen by a
+stable hash of the user id. Accounts, sessions and operational models stay
+on ``default``.
+
+``ShardMiddleware`` pins every request to the signed-in user's shard, so
+the existing ``filter(user=request.user)`` queries need no changes. Outside
+a request, saves are routed by the instance's ``user_id`` and reads need
+``user_shard(user)`` or an explicit ``.using(shard_for_user(user))``.
+
+Every shard carries the full schema (``migrate --database shard_N``). Before
+a user's first row is written to a shard their ``auth_user`` row is copied
+there so foreign keys hold; that copy is only an FK anchor, the account on
+``default`` stays authoritative. ``rebalance_shards`` moves users after
+the number of shards changes.
+"""
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+
+
+SHARDED_MODELS = {
+    'journal.trade',
+    'journal.weeklyreview',
+    'journal.monthlyreview',
+    'journal.tradingpsychology',
+    'journal.tradinggoal',
+    'journal.marketcondition',
+    'journal.tradinghabit',
+    'journal.riskmanagement',
+}
+
+_current_shard = ContextVar('journal_shard', default=None)
+_users_on_shard = set()  # (alias, user_id) known to exist, per process
+
+
+def shard_aliases():
+    """``default`` followed by shard_1..shard_N, in order"""
+    return ['default'] + sorted(
+        (alias for alias in settings.DATABASES if alias.startswith('shard_')),
+        key=lambda alias: int(alias.split('_', 1)[1]),
+    )
+
+
+def sharding_enabled():
+    return len(shard_aliases()) > 1
+
+
+def shard_for_user(user_or_id):
+    user_id = getattr(user_or_id, 'pk', user_or_id)
+    aliases = shard_aliases()
+    return aliases[zlib.crc32(str(user_id).encode()) % len(aliases)]
+
+
+def is_sharded(model):
+    return model._meta.label_lower in SHARDED_MODELS
+
+
+def sharded_models():
+    from django.apps import apps
+    return [model for model in apps.get_app_config('journal').get_models() if is_sharded(model)]
+
+
+@contextmanager
+def user_shard(user):
+    """Route sharded-model queries inside the block to ``user``'s shard"""
+    token = _current_shard.set(shard_for_user(user) if user is not None and user.pk else None)
+    try:
+        yield
+    finally:
+        _current_shard.reset(token)
+
+
+def move_user(user_id, source, target):
+    """
+    Copy a user's journal rows from ``source`` to ``target`` (new primary
+    keys, timestamps preserved), then delete them from ``source``. The two
+    databases cannot share a transaction: if the delete fails the copy is
+    already committed, so check the target before re-running.
+    """
+    ensure_user(target, user_id)
+    moved = 0
+    with transaction.atomic(using=target):
+        for model in sharded_models():
+            for row in model._base_manager.using(source).filter(user_id=user_id):
+                row.pk = None
+                row._state.adding = True
+                # raw=True keeps auto_now/auto_now_add values, like loaddata
+                row.save_base(raw=True, using=target)
+                moved += 1
+    with transaction.atomic(using=source):
+        for model in sharded_models():
+            model._base_manager.using(source).filter(user_id=user_id).delete()
+        if source != 'default':
+            User.objects.using(source).filter(pk=user_id).delete()
+    _users_on_shard.discard((source, user_id))
+    return moved
+
+
+def misplaced_users():
+    """(user_id, current alias, target alias) for every user whose rows are on the wrong shard"""
+    for alias in shard_aliases():
+        user_ids = set()
+        for model in sharded_models():
+            user_ids.update(model._base_manager.using(alias).values_list('user_id', flat=True).distinct())
+        for user_id in sorted(user_ids):
+            target = shard_for_user(user_id)
+            if target != alias:
+                yield user_id, alias, target
+
+
+def ensure_user(alias, user_id):
+    """Copy the auth_user row to ``alias`` so journal rows there can reference it"""
+    if alias == 'default' or (alias, user_id) in _users_on_shard:
+        return
+    if not User.objects.using(alias).filter(pk=user_id).exists():
+        user = User.objects.using('default').get(pk=user_id)
+        user.save(using=alias, force_insert=True)
+    _users_on_shard.add((alias, user_id))
+
+
+class ShardRouter:
+    """Sends sharded journal models to the current user's shard; no opinion otherwise"""
+
+    def _db(self, model, hints):
+        if not is_sharded(model):
+            return None
+        # The row's own user decides (admin edits of other users' trades,
+        # user.trades related managers); otherwise the request's user does
+        instance = hints.get('instance')
+        user_id = instance.pk if isinstance(instance, User) else getattr(instance, 'user_id', None)
+        if user_id:
+            return shard_for_user(user_id)
+        return _current_shard.get()
+
+    def db_for_read(self, model, **hints):
+        return self._db(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._db(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # A shard's journal rows point at the user's copy of the auth_user row
+        labels = {obj1._meta.label_lower, obj2._meta.label_lower}
+        if labels & SHARDED_MODELS and User._meta.label_lower in labels:
+            return True
+        return None
+
+
+# Signal receivers, connected in JournalConfig.ready() when sharding is enabled
+def ensure_user_before_save(sender, instance, using, **kwargs):
+    if is_sharded(sender) and instance.user_id:
+        ensure_user(using, instance.user_id)
+
+
+def delete_user_shard_data(sender, instance, using, **kwargs):
+    """Deleting a user on default also removes their rows and FK anchor on their shard"""
+    alias = shard_for_user(instance)
+    if using != 'default' or alias == 'default':
+        return
+    for model in sharded_models():
+        model._base_manager.using(alias).filter(user_id=instance.pk).delete()
+    User.objects.using(alias).filter(pk=instance.pk).delete()
+    _users_on_shard.discard((alias, instance.pk))
@@ -0,0 +1,135 @@
+"""
+Slow-query log.
+
+``SlowQueryMiddleware`` installs a ``SlowQueryCapture`` on every connection
+for the duration of a request. Statements slower than SLOW_QUERY_THRESHOLD_MS
+are persisted after the response is built, aggregated per normalized SQL
+shape into ``SlowQuery`` rows. The first time a shape is seen its plan is
+captured with ``EXPLAIN`` (``EXPLAIN QUERY PLAN`` on SQLite) using the
+original parameters, which are otherwise never stored.
+"""
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .instrumentation import sql_shape
+
+
+logger = logging.getLogger('journal.queries')
+
+EXPLAINABLE = ('SELECT', 'WITH')
+
+
+@dataclass
+class CapturedQuery:
+    sql: str
+    params: object
+    many: bool
+    duration: float  # seconds
+    alias: str
+
+
+class SlowQueryCapture:
+    """execute_wrapper keeping only statements slower than ``threshold`` seconds"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                self.queries.append(CapturedQuery(sql, params, many, duration, context['connection'].alias))
+
+
+def params_shape(params, many=False):
+    """Describe parameters by type only, e.g. ``(int, str)`` or ``executemany x3 (int, str)``"""
+    if many:
+        params = list(params or [])
+        first = params[0] if params else ()
+        return f'executemany x{len(params)} {params_shape(first)}'
+    if params is None:
+        return ''
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in params.items()) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in params) + ')'
+
+
+def explain(alias, sql, params):
+    """Return the query plan for a read statement as text, or '' when not applicable"""
+    if not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return ''
+    connection = connections[alias]
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail): indent children under their parent
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return '\n'.join(lines)
+    return '\n'.join(' '.join(str(column) for column in row) for row in rows)
+
+
+def record(query, view=''):
+    """Aggregate one captured query into its SlowQuery row"""
+    from .models import SlowQuery
+
+    shape = sql_shape(query.sql)
+    fingerprint = hashlib.sha1(shape.encode()).hexdigest()
+    duration_ms = query.duration * 1000
+    updated = SlowQuery.objects.filter(fingerprint=fingerprint).update(
+        count=F('count') + 1,
+        total_duration=F('total_duration') + duration_ms,
+        max_duration=Greatest('max_duration', duration_ms),
+        last_duration=duration_ms,
+    )
+    if updated:
+        return
+
+    plan = ''
+    if not query.many:
+        try:
+            plan = explain(query.alias, query.sql, query.params)
+        except DatabaseError as exc:
+            plan = f'EXPLAIN failed: {exc}'
+    try:
+        with transaction.atomic():
+            SlowQuery.objects.create(
+                fingerprint=fingerprint,
+                shape=shape,
+                example_sql=query.sql,
+                params_shape=params_shape(query.params, query.many)[:255],
+                view=view[:100],
+                database=query.alias,
+                explain=plan,
+                count=1,
+                total_duration=duration_ms,
+                max_duration=duration_ms,
+                last_duration=duration_ms,
+            )
+    except IntegrityError:
+        # Another worker recorded the same shape first
+        record(query, view)
+
+
+def record_all(queries, view=''):
+    for query in queries:
+        logger.warning('Slow query %.1fms in %s: %s', query.duration * 1000, view or '-', sql_shape(query.sql)[:300])
+        try:
+            record(query, view)
+        except DatabaseError:
+            logger.exception('Could not store slow query')
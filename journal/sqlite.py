@@ -0,0 +1,70 @@
+"""
+SQLite production tuning.
+
+``configure_connection`` runs on every new SQLite connection
+(``connection_created``) and applies SQLITE_PRAGMAS: WAL journaling so
+readers no longer block the writer, ``synchronous=NORMAL`` (safe with WAL),
+memory-mapped I/O, a larger page cache, an in-memory temp store and a busy
+timeout so a writer waits for the lock instead of failing with "database is
+locked". ``optimize_if_due`` runs ``PRAGMA optimize`` at most every
+SQLITE_OPTIMIZE_INTERVAL seconds per process, after a request has finished.
+Other database vendors are left untouched.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+logger = logging.getLogger('journal.sqlite')
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,          # ms
+    'mmap_size': 134217728,        # 128 MiB
+    'cache_size': -20000,          # negative = KiB, i.e. ~20 MB
+    'temp_store': 'MEMORY',
+}
+
+_optimize_lock = threading.Lock()
+_last_optimize = [time.monotonic()]
+
+
+def pragmas():
+    """DEFAULT_PRAGMAS updated with any overrides from settings.SQLITE_PRAGMAS"""
+    return {**DEFAULT_PRAGMAS, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created receiver"""
+    if connection.vendor != 'sqlite':
+        return
+    # On the DB-API connection, not a Django cursor: connection setup is not
+    # the request's work, so the execute_wrappers (query budget, metrics,
+    # slow-query log, tracing) must not see these statements
+    with connection.wrap_database_errors:
+        for name, value in pragmas().items():
+            connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def optimize_if_due(**kwargs):
+    """request_finished receiver: periodic PRAGMA optimize on open SQLite connections"""
+    interval = getattr(settings, 'SQLITE_OPTIMIZE_INTERVAL', 3600)
+    if not interval or time.monotonic() - _last_optimize[0] < interval:
+        return
+    if not _optimize_lock.acquire(blocking=False):
+        return
+    try:
+        _last_optimize[0] = time.monotonic()
+        for connection in connections.all(initialized_only=True):
+            if connection.vendor == 'sqlite' and connection.connection is not None:
+                try:
+                    with connection.wrap_database_errors:
+                        connection.connection.execute('PRAGMA optimize')
+                except DatabaseError:
+                    logger.exception('PRAGMA optimize failed on %s', connection.alias)
+    finally:
+        _optimize_lock.release()
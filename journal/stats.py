@@ -0,0 +1,218 @@
+"""
+Summary statistics of a trade sequence, computed in one pass and mergeable.
+
+``TradeStats`` consumes P&L values in trade order (date, then creation) and
+keeps counts, wins/losses, totals, running mean and variance (Welford),
+win/loss streaks and max drawdown. Two results for consecutive stretches of
+trades combine with ``+`` exactly as if the trades had been scanned
+together, so per-day partials can be rolled up into weeks, months or the
+whole journal without another query or scan (``by_day`` / ``merge``).
+
+Streaks follow the dashboard's rules: a breakeven trade ends both a win
+and a loss streak. Drawdown is the largest fall of cumulative P&L from its
+running peak, starting from zero, as on monthly reviews.
+"""
+import math
+from dataclasses import dataclass, field, replace
+from itertools import groupby
+from operator import itemgetter
+
+
+def _sign(profit_loss):
+    return (profit_loss > 0) - (profit_loss < 0)
+
+
+@dataclass
+class TradeStats:
+    count: int = 0
+    wins: int = 0
+    losses: int = 0
+    total_pnl: float = 0
+    gross_profit: float = 0
+    gross_loss: float = 0
+    # Welford: running mean and sum of squared deviations
+    mean: float = 0
+    m2: float = 0
+    # Cumulative P&L path relative to the first trade: highest and lowest
+    # point (both counting the start, 0) and largest peak-to-trough fall
+    peak: float = 0
+    trough: float = 0
+    max_drawdown: float = 0
+    # Runs of same-sign results at the start and end: (sign, length)
+    leading_run: tuple = field(default=(0, 0))
+    trailing_run: tuple = field(default=(0, 0))
+    max_win_streak: int = 0
+    max_loss_streak: int = 0
+
+    def add(self, profit_loss):
+        """Account for the next trade's P&L"""
+        self.count += 1
+        if profit_loss > 0:
+            self.wins += 1
+            self.gross_profit += profit_loss
+        elif profit_loss < 0:
+            self.losses += 1
+            self.gross_loss += profit_loss
+
+        delta = profit_loss - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (profit_loss - self.mean)
+
+        self.total_pnl += profit_loss
+        self.peak = max(self.peak, self.total_pnl)
+        self.trough = min(self.trough, self.total_pnl)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.total_pnl)
+
+        sign = _sign(profit_loss)
+        run_sign, run_length = self.trailing_run
+        self.trailing_run = (sign, run_length + 1 if sign and sign == run_sign else int(bool(sign)))
+        if self.leading_run[1] == self.count - 1 and (self.count == 1 or sign == self.leading_run[0]):
+            self.leading_run = (sign, self.count if sign else 0)
+        self._note_streak(*self.trailing_run)
+        return self
+
+    def _note_streak(self, sign, length):
+        if sign > 0:
+            self.max_win_streak = max(self.max_win_streak, length)
+        elif sign < 0:
+            self.max_loss_streak = max(self.max_loss_streak, length)
+
+    def __add__(self, later):
+        """Stats of this stretch of trades followed by ``later``"""
+        if not self.count:
+            return replace(later)
+        if not later.count:
+            return replace(self)
+        count = self.count + later.count
+        delta = later.mean - self.mean
+        merged = TradeStats(
+            count=count,
+            wins=self.wins + later.wins,
+            losses=self.losses + later.losses,
+            total_pnl=self.total_pnl + later.total_pnl,
+            gross_profit=self.gross_profit + later.gross_profit,
+            gross_loss=self.gross_loss + later.gross_loss,
+            mean=self.mean + delta * later.count / count,
+            m2=self.m2 + later.m2 + delta * delta * self.count * later.count / count,
+            peak=max(self.peak, self.total_pnl + later.peak),
+            trough=min(self.trough, self.total_pnl + later.trough),
+            max_drawdown=max(self.max_drawdown, later.max_drawdown, self.peak - (self.total_pnl + later.trough)),
+            leading_run=self.leading_run,
+            trailing_run=later.trailing_run,
+            max_win_streak=max(self.max_win_streak, later.max_win_streak),
+            max_loss_streak=max(self.max_loss_streak, later.max_loss_streak),
+        )
+        # Runs that continue across the boundary
+        (end_sign, end_length), (start_sign, start_length) = self.trailing_run, later.leading_run
+        if end_sign and end_sign == start_sign:
+            merged._note_streak(end_sign, end_length + start_length)
+            if self.leading_run[1] == self.count:
+                merged.leading_run = (end_sign, self.count + start_length)
+            if later.trailing_run[1] == later.count:
+                merged.trailing_run = (end_sign, end_length + later.count)
+        return merged
+
+    # Derived figures
+    @property
+    def win_rate(self):
+        return self.wins / self.count * 100 if self.count else 0
+
+    @property
+    def avg_profit(self):
+        return self.gross_profit / self.wins if self.wins else 0
+
+    @property
+    def avg_loss(self):
+        return self.gross_loss / self.losses if self.losses else 0
+
+    @property
+    def variance(self):
+        """Sample variance of per-trade P&L"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def current_win_streak(self):
+        """Consecutive wins up to the latest trade"""
+        sign, length = self.trailing_run
+        return length if sign > 0 else 0
+
+    @property
+    def current_loss_streak(self):
+        sign, length = self.trailing_run
+        return length if sign < 0 else 0
+
+    def summary(self):
+        """The headline figures as a dict (templates, exports)"""
+        return {
+            'total_trades': self.count,
+            'winning_trades': self.wins,
+            'losing_trades': self.losses,
+            'total_pnl': self.total_pnl,
+            'win_rate': self.win_rate,
+            'avg_profit': self.avg_profit,
+            'avg_loss': self.avg_loss,
+            'pnl_stddev': self.stddev,
+            'max_drawdown': self.max_drawdown,
+            'max_win_streak': self.max_win_streak,
+            'max_loss_streak': self.max_loss_streak,
+        }
+
+    @classmethod
+    def from_pnl(cls, pnl_in_order):
+        stats = cls()
+        for profit_loss in pnl_in_order:
+            stats.add(profit_loss)
+        return stats
+
+
+def merge(partials):
+    """Combine stats of consecutive stretches, given in trade order"""
+    total = TradeStats()
+    for partial in partials:
+        total = total + partial
+    return total
+
+
+def _in_trade_order(trades):
+    return trades.order_by('date', 'created_at')
+
+
+def of(trades):
+    """TradeStats of a Trade queryset: one query, P&L column only"""
+    return TradeStats.from_pnl(_in_trade_order(trades).values_list('profit_loss', flat=True).iterator(chunk_size=2000))
+
+
+def latest_run(trades):
+    """
+    TradeStats of the most recent trades of a Trade queryset, back to the one
+    before the current streak: enough for ``current_win_streak`` /
+    ``current_loss_streak`` while reading only those rows, in small chunks
+    """
+    newest_first = trades.order_by('-date', '-created_at').values_list('profit_loss', flat=True)
+    tail = []
+    for profit_loss in newest_first.iterator(chunk_size=50):
+        tail.append(profit_loss)
+        if not _sign(profit_loss) or _sign(profit_loss) != _sign(tail[0]):
+            break
+    return TradeStats.from_pnl(reversed(tail))
+
+
+def by_day(trades):
+    """{date: TradeStats} of a Trade queryset in one ordered pass, oldest day first"""
+    rows = _in_trade_order(trades).values_list('date', 'profit_loss').iterator(chunk_size=2000)
+    return {
+        day: TradeStats.from_pnl(profit_loss for _, profit_loss in group)
+        for day, group in groupby(rows, key=itemgetter(0))
+    }
+
+
+def by_key(rows):
+    """{key: TradeStats} from (key, profit_loss) rows sorted by key, then trade order"""
+    return {
+        key: TradeStats.from_pnl(profit_loss for _, profit_loss in group)
+        for key, group in groupby(rows, key=itemgetter(0))
+    }
@@ -0,0 +1,23 @@
+"""
+Django template backend that reports render time to Server-Timing.
+"""
+from django.template.backends.django import DjangoTemplates, Template
+
+from .instrumentation import timed
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('render'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates whose templates time their own rendering"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
@@ -0,0 +1,115 @@
+import os
+import pstats
+import random
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from . import stats
+from .instrumentation import assert_view_query_budget
+from .models import ProfileCapture
+from .seed import seed_user
+
+
+class QueryBudgetTests(TransactionTestCase):
+    """Views rewritten around ``journal.stats`` stay within their ``@query_budget``"""
+
+    urls = [
+        'dashboard',
+        'trade_list',
+        'weekly_reviews',
+        'monthly_reviews',
+        'monthly_summary',
+        'tax_report',
+        'export_pdf',
+        'export_excel',
+    ]
+
+    def setUp(self):
+        # The dashboard's aggregate pool reads on its own connections, so the
+        # seeded trades have to be committed rather than held in a test transaction
+        self.user = User.objects.create(username='budget')
+        seed_user(self.user, 200, random.Random(1))
+        self.client.force_login(self.user)
+
+    def test_views_within_budget(self):
+        for name in self.urls:
+            with self.subTest(view=name):
+                response = assert_view_query_budget(self.client, reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+
+class ProfilingTests(TransactionTestCase):
+    """A staff ``?_profile=1`` capture covers the aggregate pool, not only the request thread"""
+
+    def setUp(self):
+        # Committed rows, for the aggregate pool's connections
+        self.user = User.objects.create(username='staff', is_staff=True)
+        seed_user(self.user, 300, random.Random(1))
+        self.client.force_login(self.user)
+
+    def test_dashboard_profile_includes_pool_work(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(PROFILE_DIR=directory):
+            response = self.client.get(reverse('dashboard'), {'_profile': '1'})
+            self.assertEqual(response.status_code, 200)
+            capture = ProfileCapture.objects.get(pk=response['X-Profile-Id'])
+            profile = pstats.Stats(os.path.join(directory, capture.prof_file))
+
+        files = {filename for filename, _, _ in profile.stats}
+        self.assertTrue(any(filename.endswith(os.path.join('journal', 'stats.py')) for filename in files))
+        self.assertTrue(any(name == 'execute' and 'sqlite3' in filename for filename, _, name in profile.stats))
+
+
+class TradeStatsMergeTests(SimpleTestCase):
+    """Merging the stats of consecutive stretches equals one scan of the whole sequence"""
+
+    FIELDS = ['count', 'wins', 'losses', 'leading_run', 'trailing_run', 'max_win_streak', 'max_loss_streak']
+    FLOAT_FIELDS = ['total_pnl', 'gross_profit', 'gross_loss', 'mean', 'm2', 'peak', 'trough', 'max_drawdown']
+
+    def _sequence(self, rng):
+        """P&L in runs of one sign (breakevens included), so streaks cross split points"""
+        pnl, length = [], rng.randint(0, 60)
+        while len(pnl) < length:
+            sign = rng.choice([-1, 0, 1])
+            pnl += [sign * round(rng.uniform(1, 500), 2) for _ in range(rng.randint(1, 6))]
+        return pnl
+
+    def _split(self, pnl, rng):
+        """Consecutive stretches of ``pnl``, empty ones included"""
+        cuts = sorted(rng.randint(0, len(pnl)) for _ in range(rng.randint(0, 6)))
+        return [pnl[start:end] for start, end in zip([0] + cuts, cuts + [len(pnl)])]
+
+    def assertSameStats(self, merged, whole):
+        for name in self.FIELDS:
+            self.assertEqual(getattr(merged, name), getattr(whole, name), name)
+        for name in self.FLOAT_FIELDS:
+            self.assertAlmostEqual(getattr(merged, name), getattr(whole, name), places=6, msg=name)
+        self.assertAlmostEqual(merged.variance, whole.variance, places=6)
+        self.assertEqual(merged.current_win_streak, whole.current_win_streak)
+        self.assertEqual(merged.current_loss_streak, whole.current_loss_streak)
+
+    def test_merge_matches_single_scan(self):
+        rng = random.Random(50)
+        for case in range(500):
+            pnl = self._sequence(rng)
+            stretches = self._split(pnl, rng)
+            with self.subTest(case=case, stretches=stretches):
+                whole = stats.TradeStats.from_pnl(pnl)
+                self.assertSameStats(stats.merge(stats.TradeStats.from_pnl(part) for part in stretches), whole)
+
+    def test_streak_spanning_stretches(self):
+        parts = [[-1, 2], [3], [4, 5], [0, -1], [-2], [-3, 1]]
+        merged = stats.merge(stats.TradeStats.from_pnl(part) for part in parts)
+        self.assertEqual(merged.max_win_streak, 4)
+        self.assertEqual(merged.max_loss_streak, 3)
+        self.assertEqual(merged.current_win_streak, 1)
+
+    def test_drawdown_across_stretches(self):
+        # Peak of 10 in the first stretch, trough of -5 in the last
+        parts = [[4, 6], [-3, 2], [-8, -6]]
+        merged = stats.merge(stats.TradeStats.from_pnl(part) for part in parts)
+        self.assertEqual(merged.max_drawdown, 15)
+        self.assertEqual(merged.peak, 10)
+        self.assertEqual(merged.trough, -5)
@@ -0,0 +1,178 @@
+"""
+Request-scoped span tracing without an external collector.
+
+``TracingMiddleware`` opens a root span for a sampled request (or one that
+arrives with a sampled W3C ``traceparent`` header). Inside it, ``span()``
+blocks, ``@traced`` functions (the analytics classmethods on ``Trade``),
+every ORM query and every ``instrumentation.timed`` phase (template render,
+PDF/Excel build) become nested child spans. When the request finishes its
+spans are appended to TRACE_FILE as JSON lines, one span per line, using the
+OTLP/JSON field names (``traceId``, ``spanId``, ``parentSpanId``,
+``startTimeUnixNano``, ...), so they can be grepped by trace ID or replayed
+into any OTLP-compatible backend later.
+"""
+import functools
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+_current_trace = ContextVar('journal_trace', default=None)
+_current_span = ContextVar('journal_span', default=None)
+_write_lock = threading.Lock()
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+class Span:
+    __slots__ = ('trace_id', 'span_id', 'parent_span_id', 'name', 'kind', 'start', 'end', 'attributes', 'status')
+
+    def __init__(self, trace_id, parent_span_id, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_UNSET
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_otlp(self):
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_span_id or '',
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end),
+            'attributes': [_attribute(key, value) for key, value in self.attributes.items()],
+            'status': {'code': self.status},
+            'resource': {'service.name': getattr(settings, 'TRACE_SERVICE_NAME', 'trading-journal')},
+        }
+
+
+class Trace:
+    """All finished spans of one request"""
+
+    def __init__(self, trace_id=None, parent_span_id=None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.parent_span_id = parent_span_id  # remote parent from traceparent
+        self.spans = []
+
+
+def current_span():
+    return _current_span.get()
+
+
+@contextmanager
+def span(name, kind=SPAN_KIND_INTERNAL, **attributes):
+    """Record the block as a child of the current span; no-op outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(trace.trace_id, parent.span_id if parent else trace.parent_span_id, name, kind, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.status = STATUS_ERROR
+        current.set_attribute('exception.type', type(exc).__name__)
+        raise
+    finally:
+        current.end = time.time_ns()
+        _current_span.reset(token)
+        trace.spans.append(current)
+
+
+def traced(name=None):
+    """Decorator: run the function inside a span named ``name`` (default: qualname)"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name, **{'code.function': func.__qualname__}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def db_span(execute, sql, params, many, context):
+    """execute_wrapper recording each query as a client span"""
+    connection = context['connection']
+    with span('db.query', SPAN_KIND_CLIENT, **{
+        'db.system': connection.vendor,
+        'db.name': connection.alias,
+        'db.statement': sql[:2000],
+        'db.operation': sql.lstrip().split(' ', 1)[0].upper(),
+    }):
+        return execute(sql, params, many, context)
+
+
+def parse_traceparent(header):
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None"""
+    match = _TRACEPARENT.match((header or '').strip().lower())
+    if not match:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+@contextmanager
+def start_trace(trace_id=None, parent_span_id=None):
+    """Activate a new trace for the block and write its spans when it ends"""
+    trace = Trace(trace_id, parent_span_id)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        write(trace)
+
+
+def write(trace):
+    """Append the trace's spans to TRACE_FILE, one JSON object per line"""
+    if not trace.spans:
+        return
+    path = settings.TRACE_FILE
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    payload = ''.join(json.dumps(s.to_otlp(), separators=(',', ':')) + '\n' for s in trace.spans)
+    with _write_lock, open(path, 'a') as f:
+        f.write(payload)
@@ -9,6 +9,12 @@ urlpatterns = [
     # Main pages
     path('', views.home_view, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
+
+    # Chart data and live updates (loaded by the dashboard)
+    path('api/charts/equity/', views.chart_equity_curve, name='chart_equity_curve'),
+    path('api/charts/drawdown/', views.chart_drawdown_curve, name='chart_drawdown_curve'),
+    path('api/charts/daily-pnl/', views.chart_daily_pnl, name='chart_daily_pnl'),
+    path('api/live/dashboard/', views.live_dashboard, name='live_dashboard'),
     
     # Trade management
     path('trades/', views.trade_list, name='trade_list'),
@@ -58,6 +64,9 @@ urlpatterns = [
     path('analytics/portfolio-heatmap/', views.portfolio_heatmap, name='portfolio_heatmap'),
     path('analytics/confidence-performance/', views.confidence_performance, name='confidence_performance'),
     
+    # Monitoring
+    path('metrics', views.metrics_view, name='metrics'),
+
     # Test view
     path('test/', views.test_view, name='test'),
 ]
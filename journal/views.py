@@ -2,21 +2,24 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, authenticate, logout
 from django.contrib import messages
+from django.conf import settings
 from django.db.models import Q, Count, Avg, Sum
 from django.core.paginator import Paginator
-from django.http import JsonResponse, HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
+from functools import partial
+from asgiref.sync import sync_to_async
 from .models import Trade, WeeklyReview, MonthlyReview, TradingPsychology, TradingGoal, MarketCondition, TradingHabit, RiskManagement
 from .forms import TradeForm, WeeklyReviewForm, MonthlyReviewForm, TradeFilterForm, CustomUserCreationForm, TradingPsychologyForm, TradingGoalForm, MarketConditionForm, TradingHabitForm, RiskManagementForm
+from . import caching, charts, daily_context, goals, intraday, live, metrics, review_stats
+from . import stats as trade_stats
+from .concurrency import async_login_required, gather
+from .instrumentation import query_budget, timed
+from .routers import use_replica
 import json
 import csv
-import io
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.units import inch
 
 
 def login_view(request):
@@ -61,11 +64,55 @@ def home_view(request):
 
 
 
-@login_required
-def dashboard(request):
-    """Main dashboard with analytics and performance metrics - OPTIMIZED"""
-    # Get all stats in one optimized call
-    stats = Trade.get_dashboard_stats(request.user)
+@async_login_required
+@query_budget(9)
+async def dashboard(request):
+    """Main dashboard with analytics and performance metrics - independent aggregates run concurrently"""
+    user_trades = Trade.objects.filter(user=request.user)
+    
+    # Best/Worst performing symbols - OPTIMIZED
+    symbol_performance = user_trades.values('symbol').annotate(
+        count=Count('id'),
+        total_pnl=Sum('profit_loss'),
+        avg_pnl=Avg('profit_loss'),
+        win_rate=Count('id', filter=Q(profit_loss__gt=0)) * 100.0 / Count('id')
+    ).order_by('-total_pnl')
+    
+    # Favorite symbols (most traded) - OPTIMIZED
+    favorite_symbols = user_trades.values('symbol').annotate(
+        trade_count=Count('id')
+    ).order_by('-trade_count')[:10]
+    
+    # Recent trades - OPTIMIZED with select_related
+    recent_trades = user_trades.select_related('user').order_by('-date', '-created_at')[:5]
+    
+    # Setup performance - OPTIMIZED
+    setup_performance = user_trades.values('setup_type').annotate(
+        count=Count('id'),
+        total_pnl=Sum('profit_loss'),
+        avg_pnl=Avg('profit_loss')
+    ).order_by('-total_pnl')
+    
+    # Monthly performance data for charts - last 6 months
+    months = []
+    today = timezone.now().date()
+    for i in range(6):
+        month_start = today.replace(day=1) - timedelta(days=30*i)
+        month_end = month_start.replace(day=28) + timedelta(days=4)
+        month_end = month_end - timedelta(days=month_end.day)
+        months.append((month_start, month_end))
+    
+    # None of these depend on each other: run them concurrently
+    (stats, best_symbols, worst_symbols, favorite_symbols, recent_trades, setup_performance,
+     avg_risk_reward) = await gather(
+        partial(Trade.get_dashboard_stats, request.user),
+        partial(list, symbol_performance[:5]),
+        partial(list, symbol_performance.filter(total_pnl__lt=0).order_by('total_pnl')[:5]),
+        partial(list, favorite_symbols),
+        partial(list, recent_trades),
+        partial(list, setup_performance),
+        partial(_average_risk_reward, user_trades),
+    )
     
     # Extract stats
     basic_stats = stats['basic_stats']
@@ -99,69 +146,19 @@ def dashboard(request):
     week_winning_trades = week_stats['week_winning_trades']
     week_win_rate = (week_winning_trades / week_trades_count * 100) if week_trades_count > 0 else 0
     
-    # Get user trades for additional queries (optimized)
-    user_trades = Trade.objects.filter(user=request.user)
-    
-    # Best/Worst performing symbols - OPTIMIZED
-    symbol_performance = user_trades.values('symbol').annotate(
-        count=Count('id'),
-        total_pnl=Sum('profit_loss'),
-        avg_pnl=Avg('profit_loss'),
-        win_rate=Count('id', filter=Q(profit_loss__gt=0)) * 100.0 / Count('id')
-    ).order_by('-total_pnl')
-    
-    best_symbols = symbol_performance[:5]
-    worst_symbols = symbol_performance.filter(total_pnl__lt=0).order_by('total_pnl')[:5]
-    
-    # Favorite symbols (most traded) - OPTIMIZED
-    favorite_symbols = user_trades.values('symbol').annotate(
-        trade_count=Count('id')
-    ).order_by('-trade_count')[:10]
-    
-    # Recent trades - OPTIMIZED with select_related
-    recent_trades = user_trades.select_related('user').order_by('-date', '-created_at')[:5]
-    
-    # Monthly performance data for charts - OPTIMIZED
+    # Months are merged from the per-day stats the pass above already built
     monthly_data = []
-    today = timezone.now().date()
-    for i in range(6):  # Last 6 months
-        month_start = today.replace(day=1) - timedelta(days=30*i)
-        month_end = month_start.replace(day=28) + timedelta(days=4)
-        month_end = month_end - timedelta(days=month_end.day)
-        
-        month_stats = user_trades.filter(date__gte=month_start, date__lte=month_end).aggregate(
-            total_pnl=Sum('profit_loss'),
-            trade_count=Count('id')
+    for month_start, month_end in months:
+        month = trade_stats.merge(
+            day_stats for day, day_stats in stats['daily'].items() if month_start <= day <= month_end
         )
-        
         monthly_data.append({
             'month': month_start.strftime('%b %Y'),
-            'pnl': month_stats['total_pnl'] or 0,
-            'trades': month_stats['trade_count']
+            'pnl': month.total_pnl,
+            'trades': month.count,
         })
-    
     monthly_data.reverse()
     
-    # Setup performance - OPTIMIZED
-    setup_performance = user_trades.values('setup_type').annotate(
-        count=Count('id'),
-        total_pnl=Sum('profit_loss'),
-        avg_pnl=Avg('profit_loss')
-    ).order_by('-total_pnl')
-    
-    # Risk-reward analysis - OPTIMIZED
-    trades_with_rr = user_trades.exclude(stop_loss=0).exclude(target_price=0)
-    avg_risk_reward = 0
-    if trades_with_rr.exists():
-        # Limit to recent trades for performance
-        recent_rr_trades = trades_with_rr.order_by('-date')[:100]
-        rr_ratios = []
-        for trade in recent_rr_trades:
-            rr = trade.get_risk_reward_ratio()
-            if rr:
-                rr_ratios.append(rr)
-        avg_risk_reward = sum(rr_ratios) / len(rr_ratios) if rr_ratios else 0
-    
     context = {
         'total_trades': total_trades,
         'winning_trades': winning_trades,
@@ -189,10 +186,59 @@ def dashboard(request):
         'favorite_symbols': favorite_symbols,
     }
     
-    return render(request, 'journal/dashboard.html', context)
+    return await sync_to_async(render)(request, 'journal/dashboard.html', context)
+
+
+def _average_risk_reward(user_trades):
+    """Average planned R:R over the user's 100 most recent trades with a stop and target"""
+    # Stored risk_reward column: one narrow query, no model instances
+    recent_rr = user_trades.exclude(stop_loss=0).exclude(target_price=0).order_by('-date').values_list(
+        'risk_reward', flat=True
+    )[:100]
+    rr_ratios = [rr for rr in recent_rr if rr]
+    return sum(rr_ratios) / len(rr_ratios) if rr_ratios else 0
+
+
+# Chart data endpoints (fetched by the dashboard after page load)
+@login_required
+@query_budget(3)
+def chart_equity_curve(request):
+    """Trade-by-trade equity curve, LTTB-downsampled to the requested point budget"""
+    points = charts.parse_point_budget(request.GET.get('points'))
+    return JsonResponse(charts.equity_curve(request.user, points))
+
+
+@login_required
+@query_budget(3)
+def chart_drawdown_curve(request):
+    """Drawdown-from-peak curve, LTTB-downsampled to the requested point budget"""
+    points = charts.parse_point_budget(request.GET.get('points'))
+    return JsonResponse(charts.drawdown_curve(request.user, points))
+
+
+@login_required
+@query_budget(3)
+def chart_daily_pnl(request):
+    """Daily P&L bars, LTTB-downsampled to the requested point budget"""
+    points = charts.parse_point_budget(request.GET.get('points'))
+    return JsonResponse(charts.daily_pnl(request.user, points))
+
+
+@async_login_required
+async def live_dashboard(request):
+    """Server-Sent Events stream of dashboard figures, pushed when the user's trades change"""
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the open stream would tie up a worker thread; 204 tells
+        # EventSource not to reconnect, leaving the dashboard static
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(live.stream(request.user), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # no proxy buffering (nginx)
+    return response
 
 
 @login_required
+@query_budget(4)
 def trade_list(request):
     """List all trades with filtering and pagination"""
     trades = Trade.objects.filter(user=request.user)
@@ -215,32 +261,30 @@ def trade_list(request):
         if filter_form.cleaned_data['loss_only']:
             trades = trades.filter(profit_loss__lt=0)
     
-    # Calculate total P&L for filtered trades
-    total_pnl = trades.aggregate(total=Sum('profit_loss'))['total'] or 0
-    total_trades = trades.count()
-    winning_trades = trades.filter(profit_loss__gt=0).count()
-    losing_trades = trades.filter(profit_loss__lt=0).count()
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+    # Totals for the filtered trades, in one pass
+    summary = trade_stats.of(trades)
     
     # Pagination
     paginator = Paginator(trades, 20)
+    paginator.count = summary.count  # already known, skip the COUNT query
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     context = {
         'page_obj': page_obj,
         'filter_form': filter_form,
-        'total_pnl': total_pnl,
-        'total_trades': total_trades,
-        'winning_trades': winning_trades,
-        'losing_trades': losing_trades,
-        'win_rate': win_rate,
+        'total_pnl': summary.total_pnl,
+        'total_trades': summary.count,
+        'winning_trades': summary.wins,
+        'losing_trades': summary.losses,
+        'win_rate': summary.win_rate,
     }
     
     return render(request, 'journal/trade_list.html', context)
 
 
 @login_required
+@query_budget(3)
 def trade_detail(request, pk):
     """View individual trade details"""
     trade = get_object_or_404(Trade, pk=pk, user=request.user)
@@ -306,9 +350,11 @@ def trade_delete(request, pk):
 
 
 @login_required
+@query_budget(6)
 def weekly_reviews(request):
     """List weekly reviews"""
-    reviews = WeeklyReview.objects.filter(user=request.user)
+    # Reviews whose trades changed since they were computed are refreshed first
+    reviews = review_stats.refresh_stale(WeeklyReview.objects.filter(user=request.user))
     return render(request, 'journal/weekly_reviews.html', {'reviews': reviews})
 
 
@@ -320,19 +366,10 @@ def weekly_review_create(request):
         if form.is_valid():
             review = form.save(commit=False)
             review.user = request.user
-            
-            # Calculate weekly statistics
-            week_trades = Trade.objects.filter(
-                user=request.user,
-                date__gte=review.week_start_date,
-                date__lte=review.week_end_date
-            )
-            review.total_trades = week_trades.count()
-            review.winning_trades = week_trades.filter(profit_loss__gt=0).count()
-            review.losing_trades = week_trades.filter(profit_loss__lt=0).count()
-            review.total_pnl = week_trades.aggregate(total=Sum('profit_loss'))['total'] or 0
-            
             review.save()
+            
+            # Weekly statistics (refreshed when its trades change)
+            review_stats.refresh([review])
             messages.success(request, 'Weekly review created successfully!')
             return redirect('weekly_reviews')
     else:
@@ -345,9 +382,11 @@ def weekly_review_create(request):
 
 
 @login_required
+@query_budget(7)
 def monthly_reviews(request):
     """List monthly reviews"""
-    reviews = MonthlyReview.objects.filter(user=request.user)
+    # Reviews whose trades changed since they were computed are refreshed first
+    reviews = review_stats.refresh_stale(MonthlyReview.objects.filter(user=request.user))
     return render(request, 'journal/monthly_reviews.html', {'reviews': reviews})
 
 
@@ -359,37 +398,10 @@ def monthly_review_create(request):
         if form.is_valid():
             review = form.save(commit=False)
             review.user = request.user
-            
-            # Calculate monthly statistics
-            month_start = review.month.replace(day=1)
-            if month_start.month == 12:
-                month_end = month_start.replace(year=month_start.year + 1, month=1) - timedelta(days=1)
-            else:
-                month_end = month_start.replace(month=month_start.month + 1) - timedelta(days=1)
-            
-            month_trades = Trade.objects.filter(
-                user=request.user,
-                date__gte=month_start,
-                date__lte=month_end
-            )
-            review.total_trades = month_trades.count()
-            review.winning_trades = month_trades.filter(profit_loss__gt=0).count()
-            review.losing_trades = month_trades.filter(profit_loss__lt=0).count()
-            review.total_pnl = month_trades.aggregate(total=Sum('profit_loss'))['total'] or 0
-            
-            # Calculate max drawdown (simplified)
-            running_pnl = 0
-            max_pnl = 0
-            max_drawdown = 0
-            
-            for trade in month_trades.order_by('date'):
-                running_pnl += trade.profit_loss
-                max_pnl = max(max_pnl, running_pnl)
-                drawdown = max_pnl - running_pnl
-                max_drawdown = max(max_drawdown, drawdown)
-            
-            review.max_drawdown = max_drawdown
             review.save()
+            
+            # Monthly statistics and max drawdown (refreshed when its trades change)
+            review_stats.refresh([review])
             messages.success(request, 'Monthly review created successfully!')
             return redirect('monthly_reviews')
     else:
@@ -401,8 +413,10 @@ def monthly_review_create(request):
     })
 
 
-@login_required
-def analytics(request):
+@async_login_required
+@use_replica
+@query_budget(9)
+async def analytics(request):
     """Advanced analytics page"""
     user_trades = Trade.objects.filter(user=request.user)
     
@@ -434,17 +448,41 @@ def analytics(request):
         avg_pnl=Avg('profit_loss')
     ).order_by('confidence_level')
     
+    # Time-of-day, weekday and holding-time breakdowns (cached until the user's trades change)
+    user_id = request.user.pk
+    
+    (
+        setup_stats, symbol_stats, daily_stats, confidence_stats,
+        entry_time_stats, weekday_stats, holding_time_stats,
+    ) = await gather(
+        partial(list, setup_stats),
+        partial(list, symbol_stats),
+        partial(list, daily_stats),
+        partial(list, confidence_stats),
+        partial(caching.cached, user_id, 'intraday.entry_time', partial(intraday.by_entry_time, user_trades)),
+        partial(caching.cached, user_id, 'intraday.weekday', partial(intraday.by_weekday, user_trades)),
+        partial(caching.cached, user_id, 'intraday.holding_time', partial(intraday.by_holding_time, user_trades)),
+    )
+    
     context = {
         'setup_stats': setup_stats,
         'symbol_stats': symbol_stats,
         'daily_stats': daily_stats,
         'confidence_stats': confidence_stats,
+        'timing_sections': [
+            ('Performance by Entry Hour', 'Entry Hour', intraday.by_entry_hour(entry_time_stats)),
+            ('Performance by Entry Time (30 min)', 'Entry Time', entry_time_stats),
+            ('Performance by Weekday', 'Weekday', weekday_stats),
+            ('Performance by Holding Time', 'Holding Time', holding_time_stats),
+        ],
     }
     
-    return render(request, 'journal/analytics.html', context)
+    return await sync_to_async(render)(request, 'journal/analytics.html', context)
 
 
 @login_required
+@use_replica
+@query_budget(3)
 def export_trades_csv(request):
     """Export trades to CSV"""
     user_trades = Trade.objects.filter(user=request.user).order_by('-date')
@@ -475,18 +513,14 @@ def export_trades_csv(request):
 
 
 @login_required
+@use_replica
+@query_budget(7)
 def export_trades_pdf(request):
     """Export trades to PDF with advanced professional styling and charts"""
     user_trades = Trade.objects.filter(user=request.user).order_by('-date')
     
     # Calculate comprehensive stats
-    total_trades = user_trades.count()
-    winning_trades = user_trades.filter(profit_loss__gt=0).count()
-    losing_trades = user_trades.filter(profit_loss__lt=0).count()
-    total_pnl = user_trades.aggregate(total=Sum('profit_loss'))['total'] or 0
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-    avg_profit = user_trades.filter(profit_loss__gt=0).aggregate(avg=Avg('profit_loss'))['avg'] or 0
-    avg_loss = user_trades.filter(profit_loss__lt=0).aggregate(avg=Avg('profit_loss'))['avg'] or 0
+    summary = trade_stats.of(user_trades).summary()
     
     # Create PDF response with proper headers for browser compatibility
     response = HttpResponse(content_type='application/pdf')
@@ -502,322 +536,9 @@ def export_trades_pdf(request):
     response['Expires'] = '0'
     response['X-Content-Type-Options'] = 'nosniff'
     
-    # Create PDF with custom page size
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, 
-                           rightMargin=50, leftMargin=50, 
-                           topMargin=80, bottomMargin=50)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Advanced custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=32,
-        spaceAfter=25,
-        alignment=1,
-        textColor=colors.HexColor('#1E40AF'),
-        fontName='Helvetica-Bold',
-        borderWidth=2,
-        borderColor=colors.HexColor('#3B82F6'),
-        borderPadding=10,
-        backColor=colors.HexColor('#EFF6FF')
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Heading2'],
-        fontSize=18,
-        spaceAfter=12,
-        alignment=1,
-        textColor=colors.HexColor('#059669'),
-        fontName='Helvetica-Bold',
-        backColor=colors.HexColor('#ECFDF5'),
-        borderWidth=1,
-        borderColor=colors.HexColor('#10B981'),
-        borderPadding=8
-    )
-    
-    # Create professional header with gradient effect
-    header_data = [
-        ['📊 TRADING JOURNAL REPORT'],
-        [f'👤 Trader: {request.user.username}'],
-        [f'📅 Generated: {timezone.now().strftime("%B %d, %Y at %I:%M %p")}'],
-        [f'📈 Total Trades: {total_trades} | 💰 Total P&L: ₹{total_pnl:.2f}']
-    ]
-    
-    header_table = Table(header_data, colWidths=[500])
-    header_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E40AF')),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#EFF6FF')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#1E40AF')),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, 0), 24),
-        ('FONTSIZE', (0, 1), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 20),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#3B82F6')),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
-    
-    story.append(header_table)
-    story.append(Spacer(1, 30))
-    
-    # Performance Overview with enhanced styling
-    story.append(Paragraph("🎯 PERFORMANCE OVERVIEW", subtitle_style))
-    story.append(Spacer(1, 20))
-    
-    # Enhanced metrics with better visual design
-    metrics_data = [
-        ['📈 TOTAL TRADES', f'{total_trades}', '📊 WIN RATE', f'{win_rate:.1f}%'],
-        ['🏆 WINNING TRADES', f'{winning_trades}', '💔 LOSING TRADES', f'{losing_trades}'],
-        ['💰 TOTAL P&L', f'₹{total_pnl:.2f}', '📊 AVG PROFIT', f'₹{avg_profit:.2f}'],
-        ['📉 AVG LOSS', f'₹{avg_loss:.2f}', '⚖️ RISK/REWARD', f'{abs(avg_profit/avg_loss):.2f}:1' if avg_loss != 0 else 'N/A']
-    ]
-    
-    metrics_table = Table(metrics_data, colWidths=[140, 100, 140, 100])
-    metrics_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#3B82F6')),
-        ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#EFF6FF')),
-        ('BACKGROUND', (2, 0), (2, -1), colors.HexColor('#10B981')),
-        ('BACKGROUND', (3, 0), (3, -1), colors.HexColor('#ECFDF5')),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.white),
-        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1E40AF')),
-        ('TEXTCOLOR', (2, 0), (2, -1), colors.white),
-        ('TEXTCOLOR', (3, 0), (3, -1), colors.HexColor('#059669')),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('GRID', (0, 0), (-1, -1), 2, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#F8FAFC')]),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
-        ('TOPPADDING', (0, 0), (-1, -1), 15),
-    ]))
-    
-    story.append(metrics_table)
-    story.append(Spacer(1, 30))
-    
-    # Performance Analysis with enhanced insights
-    if total_trades > 0:
-        story.append(Paragraph("📊 PERFORMANCE ANALYSIS", subtitle_style))
-        story.append(Spacer(1, 20))
-        
-        # Enhanced insights with better formatting
-        insights_data = []
-        
-        # Win rate analysis
-        if win_rate >= 70:
-            insights_data.append(['🎉 EXCELLENT PERFORMANCE', f'Win Rate: {win_rate:.1f}% - You are trading like a professional!'])
-        elif win_rate >= 50:
-            insights_data.append(['👍 GOOD PERFORMANCE', f'Win Rate: {win_rate:.1f}% - Keep up the consistent performance!'])
-        else:
-            insights_data.append(['💪 IMPROVEMENT OPPORTUNITY', f'Win Rate: {win_rate:.1f}% - Focus on better setups and risk management!'])
-        
-        # P&L analysis
-        if total_pnl > 0:
-            insights_data.append(['💰 PROFITABLE TRADER', f'Total P&L: ₹{total_pnl:.2f} - Your strategy is working excellently!'])
-        else:
-            insights_data.append(['📈 LEARNING PHASE', f'Total P&L: ₹{total_pnl:.2f} - Every loss is a valuable lesson!'])
-        
-        # Risk management analysis
-        if avg_profit > abs(avg_loss) and avg_loss != 0:
-            insights_data.append(['⚖️ EXCELLENT RISK MANAGEMENT', f'Risk/Reward: {abs(avg_profit/avg_loss):.2f}:1 - Your wins are bigger than losses!'])
-        else:
-            insights_data.append(['🎯 RISK MANAGEMENT FOCUS', 'Work on cutting losses quickly and letting profits run!'])
-        
-        # Confidence analysis
-        avg_confidence = user_trades.aggregate(avg=Avg('confidence_level'))['avg'] or 0
-        if avg_confidence >= 8:
-            insights_data.append(['⭐ HIGH CONFIDENCE TRADER', f'Average Confidence: {avg_confidence:.1f}/10 - You trust your analysis!'])
-        elif avg_confidence >= 6:
-            insights_data.append(['📊 MODERATE CONFIDENCE', f'Average Confidence: {avg_confidence:.1f}/10 - Good balance of caution and confidence!'])
-        else:
-            insights_data.append(['🤔 LOW CONFIDENCE', f'Average Confidence: {avg_confidence:.1f}/10 - Work on building confidence through better analysis!'])
-        
-        insights_table = Table(insights_data, colWidths=[200, 300])
-        insights_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#F59E0B')),
-            ('BACKGROUND', (1, 0), (1, -1), colors.HexColor('#FEF3C7')),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.white),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#92400E')),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#F59E0B')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('TOPPADDING', (0, 0), (-1, -1), 12),
-        ]))
-        
-        story.append(insights_table)
-        story.append(Spacer(1, 30))
-    
-    # Page break for detailed trades
-    story.append(PageBreak())
-    
-    # Detailed Trades Section with enhanced styling
-    if user_trades.exists():
-        story.append(Paragraph("📋 DETAILED TRADE HISTORY", subtitle_style))
-        story.append(Spacer(1, 20))
-        
-        trades_data = [['📅 DATE', '🏷️ SYMBOL', '📊 TYPE', '⬆️ ENTRY', '⬇️ EXIT', '💰 P&L', '🎯 SETUP', '⭐ CONF']]
-        
-        for trade in user_trades[:25]:  # Show last 25 trades
-            trades_data.append([
-                trade.date.strftime('%d/%m/%Y'),
-                trade.symbol,
-                trade.trade_type,
-                f"₹{trade.entry_price:.2f}",
-                f"₹{trade.exit_price:.2f}",
-                f"₹{trade.profit_loss:.2f}",
-                trade.setup_type.title(),
-                f"{trade.confidence_level}/10"
-            ])
-        
-        trades_table = Table(trades_data, colWidths=[70, 60, 50, 70, 70, 80, 80, 50])
-        trades_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1E40AF')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#3B82F6')),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8FAFC')]),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
-            ('TOPPADDING', (0, 1), (-1, -1), 10),
-        ]))
-        
-        story.append(trades_table)
-        story.append(Spacer(1, 30))
-    
-    # Setup Performance Analysis with enhanced design
-    if user_trades.exists():
-        story.append(Paragraph("🎯 SETUP PERFORMANCE ANALYSIS", subtitle_style))
-        story.append(Spacer(1, 20))
-        
-        setup_stats = user_trades.values('setup_type').annotate(
-            count=Count('id'),
-            total_pnl=Sum('profit_loss'),
-            avg_pnl=Avg('profit_loss')
-        ).order_by('-total_pnl')
-        
-        if setup_stats:
-            setup_data = [['🎯 SETUP TYPE', '📊 TRADES', '💰 TOTAL P&L', '📈 AVG P&L', '📊 SUCCESS RATE']]
-            
-            for setup in setup_stats[:8]:
-                setup_trades = user_trades.filter(setup_type=setup['setup_type'])
-                setup_wins = setup_trades.filter(profit_loss__gt=0).count()
-                setup_success_rate = (setup_wins / setup['count'] * 100) if setup['count'] > 0 else 0
-                
-                setup_data.append([
-                    setup['setup_type'].title(),
-                    str(setup['count']),
-                    f"₹{setup['total_pnl']:.2f}",
-                    f"₹{setup['avg_pnl']:.2f}",
-                    f"{setup_success_rate:.1f}%"
-                ])
-            
-            setup_table = Table(setup_data, colWidths=[100, 60, 90, 90, 80])
-            setup_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#059669')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#10B981')),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F0FDF4')]),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 12),
-                ('TOPPADDING', (0, 1), (-1, -1), 12),
-            ]))
-            
-            story.append(setup_table)
-            story.append(Spacer(1, 30))
-    
-    # Monthly Performance Summary
-    if user_trades.exists():
-        story.append(Paragraph("📅 MONTHLY PERFORMANCE", subtitle_style))
-        story.append(Spacer(1, 20))
-        
-        # Calculate monthly performance
-        monthly_data = []
-        current_month = timezone.now().replace(day=1)
-        
-        for i in range(6):  # Last 6 months
-            month_start = current_month - timedelta(days=30*i)
-            month_end = month_start.replace(day=28) + timedelta(days=4)
-            month_end = month_end - timedelta(days=month_end.day)
-            
-            month_trades = user_trades.filter(date__gte=month_start, date__lte=month_end)
-            month_pnl = month_trades.aggregate(total=Sum('profit_loss'))['total'] or 0
-            month_count = month_trades.count()
-            
-            if month_count > 0:
-                monthly_data.append([
-                    month_start.strftime('%B %Y'),
-                    str(month_count),
-                    f"₹{month_pnl:.2f}",
-                    f"{(month_trades.filter(profit_loss__gt=0).count() / month_count * 100):.1f}%"
-                ])
-        
-        if monthly_data:
-            monthly_data.insert(0, ['📅 MONTH', '📊 TRADES', '💰 P&L', '📈 WIN RATE'])
-            
-            monthly_table = Table(monthly_data, colWidths=[120, 80, 100, 80])
-            monthly_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7C3AED')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#8B5CF6')),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FAF5FF')]),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 12),
-                ('TOPPADDING', (0, 1), (-1, -1), 12),
-            ]))
-            
-            story.append(monthly_table)
-            story.append(Spacer(1, 30))
-    
-    # Professional Footer
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=12,
-        spaceBefore=30,
-        alignment=1,
-        textColor=colors.HexColor('#6B7280'),
-        fontName='Helvetica-Oblique',
-        backColor=colors.HexColor('#F9FAFB'),
-        borderWidth=1,
-        borderColor=colors.HexColor('#E5E7EB'),
-        borderPadding=15
-    )
-    
-    story.append(Paragraph("📊 Generated by Trading Journal - Your Professional Trading Companion", footer_style))
-    story.append(Paragraph(f"🕒 Report generated on {timezone.now().strftime('%B %d, %Y at %I:%M %p')}", footer_style))
-    story.append(Paragraph("💡 Keep trading, keep learning, keep growing!", footer_style))
-    
     try:
-        doc.build(story)
-        pdf = buffer.getvalue()
-        buffer.close()
+        from .reports.pdf import build_trades_pdf
+        pdf = build_trades_pdf(request.user, user_trades, summary)
         
         # Ensure PDF has content
         if len(pdf) < 1000:  # PDF should be at least 1KB
@@ -828,7 +549,6 @@ def export_trades_pdf(request):
         response.write(pdf)
         return response
     except Exception as e:
-        buffer.close()
         # Return error response
         error_response = HttpResponse(f"Error generating PDF: {str(e)}", content_type='text/plain')
         error_response.status_code = 500
@@ -837,155 +557,24 @@ def export_trades_pdf(request):
 
 
 @login_required
+@use_replica
+@query_budget(4)
 def export_trades_excel(request):
     """Export trades to Excel with professional styling"""
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    from openpyxl.utils import get_column_letter
-    
     user_trades = Trade.objects.filter(user=request.user).order_by('-date')
     
     # Calculate summary stats
-    total_trades = user_trades.count()
-    winning_trades = user_trades.filter(profit_loss__gt=0).count()
-    losing_trades = user_trades.filter(profit_loss__lt=0).count()
-    total_pnl = user_trades.aggregate(total=Sum('profit_loss'))['total'] or 0
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+    summary = trade_stats.of(user_trades).summary()
     
-    # Create workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Trading Journal"
-    
-    # Title and header
-    ws.merge_cells('A1:K1')
-    title_cell = ws.cell(row=1, column=1, value="📊 TRADING JOURNAL REPORT")
-    title_cell.font = Font(bold=True, size=20, color="FFFFFF")
-    title_cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    title_cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    # User info
-    ws.merge_cells('A2:K2')
-    user_cell = ws.cell(row=2, column=1, value=f"👤 Trader: {request.user.username} | 📅 Generated: {timezone.now().strftime('%B %d, %Y at %I:%M %p')}")
-    user_cell.font = Font(bold=True, size=12, color="366092")
-    user_cell.alignment = Alignment(horizontal="center")
-    
-    # Summary section
-    ws.merge_cells('A4:K4')
-    summary_title = ws.cell(row=4, column=1, value="🎯 PERFORMANCE SUMMARY")
-    summary_title.font = Font(bold=True, size=14, color="FFFFFF")
-    summary_title.fill = PatternFill(start_color="228B22", end_color="228B22", fill_type="solid")
-    summary_title.alignment = Alignment(horizontal="center")
-    
-    # Summary data
-    summary_data = [
-        ['📈 Total Trades', total_trades, '📊 Win Rate', f'{win_rate:.1f}%'],
-        ['🏆 Winning Trades', winning_trades, '💔 Losing Trades', losing_trades],
-        ['💰 Total P&L', f'₹{total_pnl:.2f}', '📊 Avg P&L', f'₹{total_pnl/total_trades:.2f}' if total_trades > 0 else '₹0.00']
-    ]
-    
-    for row_idx, row_data in enumerate(summary_data, 5):
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            if col_idx % 2 == 1:  # Label columns
-                cell.font = Font(bold=True, color="366092")
-                cell.fill = PatternFill(start_color="E6F3FF", end_color="E6F3FF", fill_type="solid")
-            else:  # Value columns
-                cell.font = Font(bold=True, color="000000")
-                cell.fill = PatternFill(start_color="F0F8FF", end_color="F0F8FF", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center")
-            cell.border = Border(left=Side(style='thin'), right=Side(style='thin'), 
-                               top=Side(style='thin'), bottom=Side(style='thin'))
-    
-    # Trades section header
-    trades_start_row = 9
-    ws.merge_cells(f'A{trades_start_row}:K{trades_start_row}')
-    trades_title = ws.cell(row=trades_start_row, column=1, value="📋 DETAILED TRADE HISTORY")
-    trades_title.font = Font(bold=True, size=14, color="FFFFFF")
-    trades_title.fill = PatternFill(start_color="8B0000", end_color="8B0000", fill_type="solid")
-    trades_title.alignment = Alignment(horizontal="center")
-    
-    # Headers
-    headers = ['📅 Date', '🏷️ Symbol', '📊 Type', '⬆️ Entry', '⬇️ Exit', '📊 Qty', '💰 P&L', '📈 %', '🎯 Setup', '⭐ Conf', '📝 Exit Reason']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=trades_start_row+1, column=col, value=header)
-        cell.font = Font(bold=True, color="FFFFFF", size=11)
-        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = Border(left=Side(style='thin'), right=Side(style='thin'), 
-                           top=Side(style='thin'), bottom=Side(style='thin'))
-    
-    # Data with enhanced styling
-    for row, trade in enumerate(user_trades, trades_start_row+2):
-        ws.cell(row=row, column=1, value=trade.date.strftime('%d/%m/%Y'))
-        ws.cell(row=row, column=2, value=trade.symbol)
-        ws.cell(row=row, column=3, value=trade.trade_type)
-        ws.cell(row=row, column=4, value=trade.entry_price)
-        ws.cell(row=row, column=5, value=trade.exit_price)
-        ws.cell(row=row, column=6, value=trade.quantity)
-        ws.cell(row=row, column=7, value=trade.profit_loss)
-        ws.cell(row=row, column=8, value=f"{trade.percentage_gain_loss:.2f}%")
-        ws.cell(row=row, column=9, value=trade.setup_type.title())
-        ws.cell(row=row, column=10, value=f"{trade.confidence_level}/10")
-        ws.cell(row=row, column=11, value=trade.exit_reason)
-        
-        # Apply styling to each cell
-        for col in range(1, 12):
-            cell = ws.cell(row=row, column=col)
-            cell.border = Border(left=Side(style='thin'), right=Side(style='thin'), 
-                               top=Side(style='thin'), bottom=Side(style='thin'))
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            # Color code based on content
-            if col == 3:  # Trade type column
-                if trade.trade_type == 'LONG':
-                    cell.fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
-                else:
-                    cell.fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
-            elif col == 7:  # P&L column
-                if trade.profit_loss > 0:
-                    cell.fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
-                    cell.font = Font(bold=True, color="006400")
-                elif trade.profit_loss < 0:
-                    cell.fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
-                    cell.font = Font(bold=True, color="8B0000")
-            elif col == 10:  # Confidence column
-                if trade.confidence_level >= 8:
-                    cell.fill = PatternFill(start_color="98FB98", end_color="98FB98", fill_type="solid")
-                elif trade.confidence_level >= 6:
-                    cell.fill = PatternFill(start_color="FFFF99", end_color="FFFF99", fill_type="solid")
-                else:
-                    cell.fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
-    
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 3, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Add summary formulas
-    if user_trades.exists():
-        last_row = trades_start_row + 1 + user_trades.count()
-        
-        # Add totals row
-        ws.cell(row=last_row+2, column=6, value="TOTAL P&L:").font = Font(bold=True, size=12)
-        ws.cell(row=last_row+2, column=7, value=f"₹{total_pnl:.2f}").font = Font(bold=True, size=12, color="006400" if total_pnl > 0 else "8B0000")
-        
-        ws.cell(row=last_row+3, column=6, value="WIN RATE:").font = Font(bold=True, size=12)
-        ws.cell(row=last_row+3, column=7, value=f"{win_rate:.1f}%").font = Font(bold=True, size=12)
+    from .reports.excel import build_trades_workbook
+    wb = build_trades_workbook(request.user, user_trades, summary)
     
     # Create response
     response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
     response['Content-Disposition'] = f'attachment; filename="trading_journal_{request.user.username}_{timezone.now().strftime("%Y%m%d")}.xlsx"'
     
-    wb.save(response)
+    with timed('xlsx'):
+        wb.save(response)
     return response
 
 
@@ -993,6 +582,7 @@ def export_trades_excel(request):
 
 # Psychology Views
 @login_required
+@query_budget(10)
 def psychology_dashboard(request):
     """Trading psychology dashboard"""
     psychology_records = TradingPsychology.objects.filter(user=request.user).order_by('-date')[:10]
@@ -1012,6 +602,7 @@ def psychology_dashboard(request):
         'avg_stress': avg_stress,
         'avg_sleep': avg_sleep,
         'avg_focus': avg_focus,
+        'context_stats': daily_context.analyze(request.user)['psychology'],
     })
 
 
@@ -1051,11 +642,15 @@ def psychology_edit(request, pk):
 
 # Goals Views
 @login_required
+@query_budget(3)
 def goals_dashboard(request):
     """Trading goals dashboard"""
-    active_goals = TradingGoal.objects.filter(user=request.user, is_active=True).order_by('-created_at')
-    achieved_goals = TradingGoal.objects.filter(user=request.user, is_achieved=True).order_by('-updated_at')[:5]
-    overdue_goals = TradingGoal.objects.filter(user=request.user, is_active=True, end_date__lt=timezone.now().date(), is_achieved=False)
+    # One query; progress of measured goals is kept current by journal.goals
+    user_goals = list(TradingGoal.objects.filter(Q(is_active=True) | Q(is_achieved=True), user=request.user))
+    today = timezone.now().date()
+    active_goals = [goal for goal in user_goals if goal.is_active]
+    achieved_goals = sorted((goal for goal in user_goals if goal.is_achieved), key=lambda goal: goal.updated_at, reverse=True)[:5]
+    overdue_goals = [goal for goal in active_goals if goal.end_date < today and not goal.is_achieved]
     
     return render(request, 'journal/goals_dashboard.html', {
         'active_goals': active_goals,
@@ -1073,6 +668,7 @@ def goal_create(request):
             goal = form.save(commit=False)
             goal.user = request.user
             goal.save()
+            goals.evaluate([goal])
             messages.success(request, 'Trading goal created successfully!')
             return redirect('goals_dashboard')
     else:
@@ -1089,7 +685,7 @@ def goal_edit(request, pk):
     if request.method == 'POST':
         form = TradingGoalForm(request.POST, instance=goal)
         if form.is_valid():
-            form.save()
+            goals.evaluate([form.save()])
             messages.success(request, 'Trading goal updated successfully!')
             return redirect('goals_dashboard')
     else:
@@ -1100,12 +696,14 @@ def goal_edit(request, pk):
 
 # Market Conditions Views
 @login_required
+@query_budget(6)
 def market_conditions(request):
     """Market conditions tracking"""
     conditions = MarketCondition.objects.filter(user=request.user).order_by('-date')[:20]
     
     return render(request, 'journal/market_conditions.html', {
         'conditions': conditions,
+        'context_stats': daily_context.analyze(request.user)['market'],
     })
 
 
@@ -1128,6 +726,7 @@ def market_condition_create(request):
 
 # Habits Views
 @login_required
+@query_budget(4)
 def habits_dashboard(request):
     """Trading habits dashboard"""
     good_habits = TradingHabit.objects.filter(user=request.user, habit_type='GOOD', is_active=True)
@@ -1174,6 +773,7 @@ def habit_edit(request, pk):
 
 
 @login_required
+@query_budget(5)
 def monthly_summary(request):
     """Monthly summary report"""
     user_trades = Trade.objects.filter(user=request.user)
@@ -1183,16 +783,7 @@ def monthly_summary(request):
     month_trades = user_trades.filter(date__gte=current_month)
     
     # Calculate monthly stats
-    monthly_stats = {
-        'total_trades': month_trades.count(),
-        'winning_trades': month_trades.filter(profit_loss__gt=0).count(),
-        'losing_trades': month_trades.filter(profit_loss__lt=0).count(),
-        'total_pnl': month_trades.aggregate(total=Sum('profit_loss'))['total'] or 0,
-        'avg_profit': month_trades.filter(profit_loss__gt=0).aggregate(avg=Avg('profit_loss'))['avg'] or 0,
-        'avg_loss': month_trades.filter(profit_loss__lt=0).aggregate(avg=Avg('profit_loss'))['avg'] or 0,
-    }
-    
-    monthly_stats['win_rate'] = (monthly_stats['winning_trades'] / monthly_stats['total_trades'] * 100) if monthly_stats['total_trades'] > 0 else 0
+    monthly_stats = trade_stats.of(month_trades).summary()
     
     # Best performing symbols this month
     monthly_symbols = month_trades.values('symbol').annotate(
@@ -1219,6 +810,8 @@ def monthly_summary(request):
 
 
 @login_required
+@use_replica
+@query_budget(4)
 def tax_report(request):
     """Tax calculation report"""
     user_trades = Trade.objects.filter(user=request.user, trade_status='CLOSED')
@@ -1235,35 +828,32 @@ def tax_report(request):
     fy_trades = user_trades.filter(date__gte=fy_start, date__lte=fy_end)
     
     # Calculate tax metrics
-    total_profit = fy_trades.filter(profit_loss__gt=0).aggregate(total=Sum('profit_loss'))['total'] or 0
-    total_loss = abs(fy_trades.filter(profit_loss__lt=0).aggregate(total=Sum('profit_loss'))['total'] or 0)
+    totals = fy_trades.aggregate(
+        total_profit=Sum('profit_loss', filter=Q(profit_loss__gt=0)),
+        total_loss=Sum('profit_loss', filter=Q(profit_loss__lt=0)),
+        total_trades=Count('id'),
+    )
+    total_profit = totals['total_profit'] or 0
+    total_loss = abs(totals['total_loss'] or 0)
     net_profit = total_profit - total_loss
     
     # Tax calculation (assuming 15% STCG tax for equity)
     stcg_tax_rate = 0.15
     tax_payable = net_profit * stcg_tax_rate if net_profit > 0 else 0
     
-    # Monthly breakdown
+    # Monthly breakdown: one grouped query (a financial year has each month once)
+    by_month = {
+        row['date__month']: row
+        for row in fy_trades.values('date__month').annotate(pnl=Sum('profit_loss'), trades=Count('id')).order_by()
+    }
     monthly_breakdown = []
     for month in range(1, 13):
-        if month >= 4:
-            year = current_year if timezone.now().month >= 4 else current_year - 1
-        else:
-            year = current_year if timezone.now().month >= 4 else current_year - 1
-        
-        month_start = timezone.datetime(year, month, 1).date()
-        if month == 12:
-            month_end = timezone.datetime(year + 1, 1, 1).date() - timedelta(days=1)
-        else:
-            month_end = timezone.datetime(year, month + 1, 1).date() - timedelta(days=1)
-        
-        month_trades = fy_trades.filter(date__gte=month_start, date__lte=month_end)
-        month_pnl = month_trades.aggregate(total=Sum('profit_loss'))['total'] or 0
-        
+        year = fy_start.year if month >= 4 else fy_end.year
+        row = by_month.get(month, {})
         monthly_breakdown.append({
-            'month': month_start.strftime('%B'),
-            'pnl': month_pnl,
-            'trades': month_trades.count()
+            'month': timezone.datetime(year, month, 1).strftime('%B'),
+            'pnl': row.get('pnl') or 0,
+            'trades': row.get('trades', 0),
         })
     
     context = {
@@ -1275,13 +865,15 @@ def tax_report(request):
         'tax_payable': round(tax_payable, 2),
         'tax_rate': stcg_tax_rate * 100,
         'monthly_breakdown': monthly_breakdown,
-        'total_trades': fy_trades.count(),
+        'total_trades': totals['total_trades'],
     }
     
     return render(request, 'journal/tax_report.html', context)
 
 
 @login_required
+@use_replica
+@query_budget(3)
 def portfolio_heatmap(request):
     """Portfolio heatmap view showing symbol performance"""
     heatmap_data = Trade.get_portfolio_heatmap_data(request.user)
@@ -1295,6 +887,8 @@ def portfolio_heatmap(request):
 
 
 @login_required
+@use_replica
+@query_budget(3)
 def confidence_performance(request):
     """Confidence vs Performance analysis view"""
     performance_data = Trade.get_confidence_vs_performance_data(request.user)
@@ -1314,6 +908,14 @@ def confidence_performance(request):
     
     return render(request, 'journal/confidence_performance.html', context)
 
+
+def metrics_view(request):
+    """Prometheus metrics, aggregated across all worker processes"""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponse(status=404)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 def test_view(request):
     """Simple test view without database"""
     return HttpResponse("Test view working! Database connection not required.")
@@ -40,16 +40,73 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'journal.middleware.MetricsMiddleware',
+    'journal.middleware.ServerTimingMiddleware',
+    'journal.middleware.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'journal.middleware.ReplicaPinMiddleware',
+    'journal.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-view SQL query budgets (see journal.instrumentation.query_budget)
+QUERY_BUDGET_ENABLED = config('QUERY_BUDGET_ENABLED', default=False, cast=bool)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)  # raise instead of logging
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=5, cast=int)  # same SQL shape N times = N+1
+if QUERY_BUDGET_ENABLED:
+    MIDDLEWARE.append('journal.middleware.QueryBudgetMiddleware')
+
+# Slow-query log (journal.SlowQuery, visible in the admin); 0 disables it. Off by
+# default: each slow statement costs an EXPLAIN and a write inside the request
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=0, cast=float)
+if SLOW_QUERY_THRESHOLD_MS > 0:
+    # Outermost, so storing slow queries is not attributed to the view's metrics
+    MIDDLEWARE.insert(0, 'journal.middleware.SlowQueryMiddleware')
+
+# Server-Timing header + per-request timing log line (fraction of requests instrumented)
+SERVER_TIMING_SAMPLE_RATE = config('SERVER_TIMING_SAMPLE_RATE', default=1.0 if DEBUG else 0.1, cast=float)
+
+# Prometheus /metrics endpoint; set METRICS_MULTIPROC_DIR to aggregate across gunicorn workers
+METRICS_MULTIPROC_DIR = config('METRICS_MULTIPROC_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=float)  # seconds between worker snapshots
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1').split(',')
+
+# Span tracing to a local JSON-lines file (OTLP field names); requests with a
+# sampled W3C traceparent header are always traced
+TRACE_SAMPLE_RATE = config('TRACE_SAMPLE_RATE', default=0.0, cast=float)
+TRACE_FILE = config('TRACE_FILE', default=str(BASE_DIR / 'traces' / 'spans.jsonl'))
+TRACE_SERVICE_NAME = config('TRACE_SERVICE_NAME', default='trading-journal')
+
+# Staff-only request profiling (X-Profile: 1|mem); captures are listed in the admin
+PROFILE_DIR = config('PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILE_TOP_N = config('PROFILE_TOP_N', default=30, cast=int)
+PROFILE_TRACEMALLOC_FRAMES = config('PROFILE_TRACEMALLOC_FRAMES', default=1, cast=int)
+
+# Live dashboard updates over Server-Sent Events (journal.live, ASGI only):
+# how often an open stream re-checks for trades written by other worker
+# processes, and how long a stream lasts before the browser reconnects
+LIVE_POLL_SECONDS = config('LIVE_POLL_SECONDS', default=15, cast=float)
+LIVE_STREAM_SECONDS = config('LIVE_STREAM_SECONDS', default=300, cast=float)
+
+# Per-user analytics cache (journal.caching). The default local-memory cache
+# is per process; with several workers use a shared backend so a trade
+# written through one worker invalidates the others, e.g.
+# CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache
+# CACHE_LOCATION=journal_cache (then run `manage.py createcachetable`).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='journal'),
+    }
+}
+ANALYTICS_CACHE_SECONDS = config('ANALYTICS_CACHE_SECONDS', default=300, cast=int)
+
 # Basic Security Headers
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -59,7 +116,7 @@ ROOT_URLCONF = 'trading_journal.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'journal.templating.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -77,12 +134,48 @@ WSGI_APPLICATION = 'trading_journal.wsgi.application'
 
 # Database configuration
 # Use PostgreSQL for production, SQLite for local development
+#
+# Connections are kept open for DB_CONN_MAX_AGE seconds and reused across
+# requests (checked before reuse when DB_CONN_HEALTH_CHECKS is on). Each
+# gunicorn worker thread (and aggregate-pool thread) holds at most one
+# connection per database, so an instance needs WEB_CONCURRENCY x
+# (GUNICORN_THREADS + AGGREGATE_WORKERS) connections; keep that below DB_MAX_CONNECTIONS (checked by `manage.py check`). Behind a
+# transaction-mode pooler (PgBouncer, Supabase port 6543) set
+# DB_POOLER=transaction.
+#
+# Trade-off under ASGI (the Procfile default, for the async dashboard and
+# live updates): Django 4.2 runs each request's sync code on its own
+# thread, so request connections cannot be reused and are closed when the
+# request finishes (journal.concurrency.close_request_connections); every
+# request connects once per database it uses. DB_CONN_MAX_AGE still applies
+# to the aggregate pool, management commands and WSGI workers. Where connect
+# latency matters, put a pooler in front (DB_POOLER) or serve WSGI
+# (`gunicorn trading_journal.wsgi:application -k gthread`), which keeps
+# persistent connections on every page but turns off live updates.
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)  # gunicorn workers
+GUNICORN_THREADS = config('GUNICORN_THREADS', default=1, cast=int)
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)  # 0 = close after each request
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+DB_MAX_CONNECTIONS = config('DB_MAX_CONNECTIONS', default=0, cast=int)  # 0 = unknown, skip the check
+DB_POOLER = config('DB_POOLER', default='')  # '' or 'transaction'
+# Async views (dashboard, analytics) run their independent aggregates on a
+# per-process pool of this many threads, each holding its own connections
+AGGREGATE_WORKERS = config('AGGREGATE_WORKERS', default=4, cast=int)
+
 if config('DATABASE_URL', default=''):
     # Production - PostgreSQL (Render/Supabase)
     import dj_database_url
     DATABASES = {
-        'default': dj_database_url.parse(config('DATABASE_URL'))
+        'default': dj_database_url.parse(
+            config('DATABASE_URL'),
+            conn_max_age=DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
+        )
     }
+    if DB_POOLER == 'transaction':
+        # Server-side cursors (.iterator()) and session state do not survive
+        # the pooler handing each transaction to a different backend
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
 else:
     # Local development - SQLite
     DATABASES = {
@@ -92,6 +185,45 @@ else:
         }
     }
 
+# SQLite tuning (journal.sqlite): WAL, synchronous=NORMAL, mmap, cache,
+# busy timeout and temp_store pragmas on each connection, plus a periodic
+# PRAGMA optimize. Override individual pragmas with SQLITE_PRAGMAS.
+SQLITE_TUNING = config('SQLITE_TUNING', default=True, cast=bool)
+SQLITE_OPTIMIZE_INTERVAL = config('SQLITE_OPTIMIZE_INTERVAL', default=3600, cast=int)  # seconds, 0 = never
+
+# Optional read replica for analytics and exports (views marked @use_replica).
+# Any dj-database-url URL works, e.g. sqlite:////path/replica.sqlite3 locally.
+REPLICA_DATABASE_URL = config('REPLICA_DATABASE_URL', default='')
+if REPLICA_DATABASE_URL:
+    import dj_database_url
+    DATABASES['replica'] = dj_database_url.parse(
+        REPLICA_DATABASE_URL,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['journal.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=15, cast=int)  # read-your-writes window
+
+# Optional user-hash sharding of journal data (journal.sharding): one
+# dj-database-url per extra shard; `default` is always shard 0. Run
+# `migrate --database shard_N` for each and `rebalance_shards` after
+# changing the list.
+JOURNAL_SHARD_URLS = [url for url in config('JOURNAL_SHARD_URLS', default='').split(',') if url.strip()]
+if JOURNAL_SHARD_URLS:
+    import dj_database_url
+    for index, url in enumerate(JOURNAL_SHARD_URLS, start=1):
+        DATABASES[f'shard_{index}'] = dj_database_url.parse(
+            url.strip(),
+            conn_max_age=DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
+        )
+    DATABASE_ROUTERS.insert(0, 'journal.sharding.ShardRouter')
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.auth.middleware.AuthenticationMiddleware') + 1,
+        'journal.middleware.ShardMiddleware',
+    )
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -154,24 +286,53 @@ SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
 
 # Logging Configuration
+# Records are queued on the request thread and written by a background
+# listener (journal.log). Per-logger levels and sampling come from the
+# environment, e.g. LOG_LEVELS="django.db.backends=DEBUG,journal.requests=INFO"
+# and LOG_SAMPLE_RATES="django.db.backends=0.01".
+from journal.log import parse_levels  # noqa: E402
+
+LOG_LEVEL = config('LOG_LEVEL', default='INFO').upper()
+LOG_FORMAT = config('LOG_FORMAT', default='text' if DEBUG else 'json')
+LOG_LEVELS = {'django.db.backends': 'INFO', **parse_levels(config('LOG_LEVELS', default=''))}
+LOG_SAMPLE_RATES = {name: float(rate) for name, rate in parse_levels(config('LOG_SAMPLE_RATES', default='')).items()}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'journal.log.JsonFormatter',
+        },
+        'text': {
+            'format': '%(asctime)s %(levelname)s %(name)s: %(message)s',
+        },
+    },
+    'filters': {
+        f'sample_{name}': {'()': 'journal.log.SamplingFilter', 'rate': rate}
+        for name, rate in LOG_SAMPLE_RATES.items()
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
+            'formatter': LOG_FORMAT,
+        },
+        'queue': {
+            '()': 'journal.log.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console'],
+            'queue_size': config('LOG_QUEUE_SIZE', default=10000, cast=int),
         },
     },
     'root': {
-        'handlers': ['console'],
-        'level': 'DEBUG',
+        'handlers': ['queue'],
+        'level': LOG_LEVEL,
     },
     'loggers': {
-        'django': {
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': False,
-        },
+        name: {
+            'level': LOG_LEVELS.get(name, LOG_LEVEL),
+            'filters': [f'sample_{name}'] if name in LOG_SAMPLE_RATES else [],
+        }
+        for name in {'django', *LOG_LEVELS, *LOG_SAMPLE_RATES}
     },
 }
 